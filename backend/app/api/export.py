@@ -1,26 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
+import asyncio
+import io
+import os
+from typing import BinaryIO, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.database.session import get_db
 from app.models.user import User
 from app.models.project import Project
 from app.core.security import get_current_user
-from app.services.document_service import document_service
+from app.services.document_service import ProjectSnapshot
+from app.services.export_cache import export_cache, lookups_total, snapshot_digest
+from app.services.export_pool import export_pool, ExportOverloadedError
 
 router = APIRouter(prefix="/export", tags=["export"])
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+def _iter_chunks(file_stream: BinaryIO):
+    """Read an export in fixed-size chunks."""
+    while chunk := file_stream.read(settings.EXPORT_STREAM_CHUNK_KB * 1024):
+        yield chunk
+
+
+def _close_export(file_stream: Optional[BinaryIO], remove: Optional[str] = None):
+    """Close a streamed export and remove its temporary file, if any."""
+    if file_stream is not None:
+        file_stream.close()
+    if remove is not None:
+        try:
+            os.unlink(remove)
+        except FileNotFoundError:
+            pass
+
+
+def _export_response(
+    file_stream: BinaryIO, size: int, media_type: str, headers: dict, remove: Optional[str] = None
+) -> StreamingResponse:
+    """Stream an open export, closing it (and removing ``remove``) even if the client disconnects early."""
+    return StreamingResponse(
+        _iter_chunks(file_stream),
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(size)},
+        background=BackgroundTask(_close_export, file_stream, remove),
+    )
+
+
 @router.get("/{project_id}")
 async def export_document(
     project_id: int,
     preview: bool = Query(False, description="If true, inline display for preview; if false, download"),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Export project as a document (DOCX or PPTX)."""
+    """Export project as a document (DOCX or PPTX).
+
+    The ETag is a digest of the exported content, so an unchanged project
+    answers ``If-None-Match`` with 304 and repeat exports come from the
+    export cache.
+    """
     # Get project with sections
     result = await db.execute(
         select(Project)
@@ -35,25 +87,74 @@ async def export_document(
             detail="Project not found"
         )
     
+    snapshot = ProjectSnapshot.from_project(project)
+    digest = snapshot_digest(snapshot)
+    extension = project.document_type.value
+    if extension == "docx":
+        media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    else:  # pptx
+        media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+    filename = f"{project.title.replace(' ', '_')}.{extension}"
+    
+    # Set Content-Disposition based on preview parameter
+    disposition = "inline" if preview else "attachment"
+    headers = {
+        "Content-Disposition": f"{disposition}; filename={filename}",
+        "ETag": f'"{digest}"',
+        # Let browsers keep the file but revalidate it on every export
+        "Cache-Control": "private, no-cache",
+    }
+    
+    if _etag_matches(if_none_match, headers["ETag"]):
+        lookups_total.inc(result="not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if settings.EXPORT_CACHE_ENABLED:
+        path = await export_cache.get(digest, extension)
+        file_stream = None
+        if path is not None:
+            try:
+                # Opened here, so an eviction before the response is sent cannot pull the file away
+                file_stream = await asyncio.to_thread(open, path, "rb")
+            except FileNotFoundError:
+                pass  # Evicted since the lookup; render it again
+        if file_stream is not None:
+            lookups_total.inc(result="hit")
+            try:
+                return _export_response(file_stream, os.fstat(file_stream.fileno()).st_size, media_type, headers)
+            except BaseException:
+                _close_export(file_stream)
+                raise
+        lookups_total.inc(result="miss")
+    
     try:
-        if project.document_type.value == "docx":
-            file_stream = document_service.create_docx(project, project.sections)
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            filename = f"{project.title.replace(' ', '_')}.docx"
-        else:  # pptx
-            file_stream = document_service.create_pptx(project, project.sections)
-            media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-            filename = f"{project.title.replace(' ', '_')}.pptx"
-        
-        # Set Content-Disposition based on preview parameter
-        disposition = "inline" if preview else "attachment"
-        
-        return StreamingResponse(
-            file_stream,
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f"{disposition}; filename={filename}"
-            }
+        # Rendered in a worker process, which gets a plain copy of the project
+        rendered = await export_pool.render(snapshot)
+        file_stream, remove = None, None
+        try:
+            if isinstance(rendered, bytes):
+                if settings.EXPORT_CACHE_ENABLED:
+                    await export_cache.put(digest, extension, rendered)
+                file_stream, size = io.BytesIO(rendered), len(rendered)
+            else:
+                # Too large to keep in memory: stream the spooled file. It is
+                # opened before moving into the cache so eviction cannot pull it away.
+                remove = rendered
+                file_stream = await asyncio.to_thread(open, rendered, "rb")
+                size = os.fstat(file_stream.fileno()).st_size
+                if settings.EXPORT_CACHE_ENABLED:
+                    await export_cache.put_file(digest, extension, rendered)
+                    remove = None
+            
+            return _export_response(file_stream, size, media_type, headers, remove)
+        except BaseException:
+            _close_export(file_stream, remove)
+            raise
+    except ExportOverloadedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
         )
     except Exception as e:
         raise HTTPException(
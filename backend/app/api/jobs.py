@@ -0,0 +1,127 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.api.sse import SSE_HEADERS, sse_event
+from app.core.config import settings
+from app.database.session import get_db, async_session_maker
+from app.models.user import User
+from app.models.job import Job, JobKind, JobStatus
+from app.models.project import Project, Section
+from app.schemas.job import JobCreate, JobResponse
+from app.core.security import get_current_user
+from app.services.job_queue import job_queue
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a generate, refine or outline job and return its id immediately."""
+    if job_data.kind == JobKind.OUTLINE:
+        if not job_data.topic or job_data.document_type is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Outline jobs require a topic and document_type"
+            )
+        payload = {
+            "topic": job_data.topic,
+            "document_type": job_data.document_type.value,
+            "num_sections": job_data.num_sections or 5,
+            "regenerate": bool(job_data.regenerate)
+        }
+    else:
+        if job_data.section_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Section jobs require a section_id"
+            )
+        result = await db.execute(
+            select(Section)
+            .join(Project)
+            .where(Section.id == job_data.section_id, Project.user_id == current_user.id)
+        )
+        section = result.scalar_one_or_none()
+        
+        if not section:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Section not found"
+            )
+        
+        if job_data.kind == JobKind.REFINE_SECTION:
+            if not job_data.prompt:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Refine jobs require a prompt"
+                )
+            if not section.content:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cannot refine section without content. Generate content first."
+                )
+        payload = {
+            "section_id": section.id,
+            "prompt": job_data.prompt,
+            "regenerate": bool(job_data.regenerate)
+        }
+    
+    return await job_queue.enqueue(db, current_user.id, job_data.kind, payload)
+
+
+async def _get_user_job(db: AsyncSession, job_id: int, user_id: int) -> Job:
+    result = await db.execute(
+        select(Job).where(Job.id == job_id, Job.user_id == user_id)
+    )
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the status and, once finished, the result of a job."""
+    return await _get_user_job(db, job_id, current_user.id)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream job status changes as Server-Sent Events until the job finishes."""
+    await _get_user_job(db, job_id, current_user.id)
+    
+    async def events():
+        last_state = None
+        while True:
+            async with async_session_maker() as session:
+                job = await session.get(Job, job_id)
+            data = JobResponse.model_validate(job).model_dump(mode="json")
+            state = (job.status, job.attempts)
+            if state != last_state:
+                last_state = state
+                yield sse_event("status", data)
+            if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                yield sse_event("done", data)
+                return
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.services.gemini_service import gemini_service
+from app.services.metrics import metrics_registry
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    """Get all counters and histograms in Prometheus text format."""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """Get hit/miss counters and sizes for the LLM response cache."""
+    if gemini_service.cache is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="LLM response cache is disabled"
+        )
+    return await gemini_service.cache.stats()
+
+
+@router.get("/llm-single-flight")
+async def get_llm_single_flight_stats():
+    """Get counters for coalesced in-flight LLM calls."""
+    single_flight = gemini_service.single_flight
+    return {
+        "executions": single_flight.executions,
+        "coalesced": single_flight.coalesced,
+        "in_flight": single_flight.in_flight,
+    }
@@ -1,20 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import base64
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import List
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import noload, selectinload
+from typing import List, Optional, Tuple, Union
 
-from app.database.session import get_db
+from app.api.disconnect import cancel_on_disconnect
+from app.api.sse import SSE_HEADERS, sse_event
+from app.core.config import settings
+from app.database.session import get_db, async_session_maker
 from app.models.user import User
-from app.models.project import Project, Section
+from app.models.project import Project, Section, Refinement
 from app.schemas.project import (
     ProjectCreate,
     ProjectUpdate,
     ProjectResponse,
-    GenerateOutlineRequest
+    ProjectSummary,
+    ProjectPage,
+    SectionResponse,
+    SectionFeedbackResponse,
+    GenerateOutlineRequest,
+    OutlineResponse,
+    DraftProjectRequest,
+    GenerateAllResponse,
+    SectionGenerationResult
 )
 from app.core.security import get_current_user
 from app.services.gemini_service import gemini_service
+from app.services.outline_index import outline_index
+from app.services.prompt_budget import build_project_context
+from app.services.refinement_history import refinement_history
+from app.services.scheduler import Priority, SchedulerOverloadedError
+from app.services.speculation import speculative_generator, promote_draft, discard_drafts
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -57,23 +78,77 @@ async def create_project(
     )
     project = result.scalar_one()
     
+    if project_data.speculate:
+        speculative_generator.start(project.id)
+    
     return project
 
 
-@router.get("", response_model=List[ProjectResponse])
+def _encode_cursor(project: Project) -> str:
+    raw = f"{project.updated_at.isoformat()}|{project.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        updated_at, project_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), int(project_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("", response_model=ProjectPage)
 async def get_projects(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    include: Optional[str] = Query(None, description="'sections' to list section titles"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all projects for current user."""
-    result = await db.execute(
-        select(Project)
-        .options(selectinload(Project.sections))
+    """List the current user's projects, most recently updated first.
+
+    Returns summaries with a section count; section content is never
+    loaded. Pages are keyed on (updated_at, id), so they stay stable while
+    projects are edited.
+    """
+    include_sections = "sections" in (include or "").split(",")
+    section_count = (
+        select(func.count(Section.id))
+        .where(Section.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    query = (
+        select(Project, section_count)
         .where(Project.user_id == current_user.id)
-        .order_by(Project.updated_at.desc())
+        .order_by(Project.updated_at.desc(), Project.id.desc())
+        .limit(limit + 1)
     )
-    projects = result.scalars().all()
-    return projects
+    if include_sections:
+        query = query.options(
+            selectinload(Project.sections).load_only(Section.id, Section.title, Section.order, Section.updated_at)
+        )
+    else:
+        query = query.options(noload(Project.sections))
+    if cursor:
+        updated_at, project_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            Project.updated_at < updated_at,
+            and_(Project.updated_at == updated_at, Project.id < project_id)
+        ))
+    
+    rows = (await db.execute(query)).all()
+    items = []
+    for project, count in rows[:limit]:
+        summary = ProjectSummary.model_validate(project)
+        summary.section_count = count
+        summary.sections = sorted(summary.sections, key=lambda x: x.order) if include_sections else None
+        items.append(summary)
+    next_cursor = _encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return ProjectPage(items=items, next_cursor=next_cursor)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -99,6 +174,56 @@ async def get_project(
     return project
 
 
+@router.get("/{project_id}/feedback", response_model=List[SectionFeedbackResponse])
+async def get_project_feedback(
+    project_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the latest refinement's feedback for every section of a project.
+
+    Sections without refinements are left out.
+    """
+    latest = (
+        select(
+            Refinement.id,
+            Refinement.section_id,
+            Refinement.feedback,
+            Refinement.comment,
+            Refinement.created_at,
+            func.row_number().over(
+                partition_by=Refinement.section_id,
+                order_by=(Refinement.created_at.desc(), Refinement.id.desc())
+            ).label("position")
+        )
+        .join(Section, Section.id == Refinement.section_id)
+        .where(Section.project_id == project_id, Refinement.is_draft.is_(False))
+        .subquery()
+    )
+    # Outer join so an owned project without refinements still returns a row
+    result = await db.execute(
+        select(
+            Project.id.label("project_id"),
+            latest.c.id.label("refinement_id"),
+            latest.c.section_id,
+            latest.c.feedback,
+            latest.c.comment,
+            latest.c.created_at
+        )
+        .outerjoin(latest, latest.c.position == 1)
+        .where(Project.id == project_id, Project.user_id == current_user.id)
+    )
+    rows = result.all()
+    
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    return [SectionFeedbackResponse.model_validate(row) for row in rows if row.section_id is not None]
+
+
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: int,
@@ -119,6 +244,16 @@ async def update_project(
             detail="Project not found"
         )
     
+    # Drafts were generated from the old title, description and topic
+    prompt_changed = any(
+        value is not None and value != getattr(project, field)
+        for field, value in (
+            ("title", project_data.title),
+            ("description", project_data.description),
+            ("topic", project_data.topic)
+        )
+    )
+    
     # Update fields
     if project_data.title is not None:
         project.title = project_data.title
@@ -129,9 +264,19 @@ async def update_project(
     if project_data.color_theme is not None:
         project.color_theme = project_data.color_theme
     
+    speculating = False
+    if prompt_changed:
+        speculating = speculative_generator.cancel(project.id)
+        await discard_drafts(db, (await db.execute(
+            select(Section.id).where(Section.project_id == project.id)
+        )).scalars())
+    
     await db.commit()
     await db.refresh(project)
     
+    if speculating:
+        speculative_generator.start(project.id)
+    
     # Load sections
     result = await db.execute(
         select(Project)
@@ -162,25 +307,297 @@ async def delete_project(
             detail="Project not found"
         )
     
+    speculative_generator.cancel(project.id)
     await db.delete(project)
     await db.commit()
 
 
-@router.post("/generate-outline")
+@router.post("/generate-outline", response_model=OutlineResponse)
 async def generate_outline(
-    request: GenerateOutlineRequest,
+    outline_request: GenerateOutlineRequest,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Generate document outline using AI."""
+    """Generate document outline using AI.
+
+    An outline generated earlier for a near-identical topic is returned
+    without a model call and marked ``reused``; ``regenerate`` always asks
+    the model.
+    """
+    document_type = outline_request.document_type.value
+    num_sections = outline_request.num_sections or 5
+    reuse = settings.OUTLINE_REUSE_ENABLED and not outline_request.regenerate
     try:
-        sections = await gemini_service.generate_outline(
-            topic=request.topic,
-            document_type=request.document_type,
-            num_sections=request.num_sections or 5
-        )
-        return {"sections": sections}
+        if reuse:
+            match = await outline_index.find(
+                outline_request.topic, document_type, num_sections, user_id=current_user.id
+            )
+            if match:
+                return OutlineResponse(
+                    sections=match.sections,
+                    reused=True,
+                    reused_topic=match.topic,
+                    similarity=round(match.similarity, 3)
+                )
+        
+        sections = await cancel_on_disconnect(request, gemini_service.generate_outline(
+            topic=outline_request.topic,
+            document_type=document_type,
+            num_sections=num_sections,
+            use_cache=not outline_request.regenerate,
+            user_id=current_user.id
+        ))
+        if settings.OUTLINE_REUSE_ENABLED and sections:
+            await outline_index.add(
+                outline_request.topic, document_type, num_sections, sections, user_id=current_user.id
+            )
+        return OutlineResponse(sections=sections)
+    except (HTTPException, SchedulerOverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate outline: {str(e)}"
         )
+
+
+@router.post("/{project_id}/generate-all", response_model=GenerateAllResponse)
+async def generate_all_sections(
+    project_id: int,
+    request: Request,
+    regenerate: bool = Query(False, description="If true, skip the response cache"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate content for every section of a project in a single request."""
+    result = await db.execute(
+        select(Project)
+        .options(selectinload(Project.sections))
+        .where(Project.id == project_id, Project.user_id == current_user.id)
+    )
+    project = result.scalar_one_or_none()
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    sections = sorted(project.sections, key=lambda x: x.order)
+    project_context = build_project_context(project.title, project.description)
+    
+    # Use speculative drafts where they exist; a regeneration throws them away
+    speculating = speculative_generator.cancel(project.id)
+    try:
+        promoted = set()
+        if regenerate:
+            await discard_drafts(db, [section.id for section in sections])
+        else:
+            for section in sections:
+                if await promote_draft(db, section):
+                    promoted.add(section.id)
+        pending = [section for section in sections if section.id not in promoted]
+        
+        async def generate(group: List[Section], use_cache: bool):
+            return await gemini_service.generate_sections(
+                topic=project.topic,
+                section_titles=[section.title for section in group],
+                document_type=project.document_type.value,
+                project_context=project_context,
+                use_cache=use_cache,
+                max_concurrency=settings.GENERATE_ALL_CONCURRENCY,
+                user_id=current_user.id
+            )
+        
+        # Sections that already have content are being regenerated, so skip the cache for them
+        empty = [section for section in pending if not section.content]
+        filled = [section for section in pending if section.content]
+        empty_outcomes, filled_outcomes = await cancel_on_disconnect(request, asyncio.gather(
+            generate(empty, not regenerate),
+            generate(filled, False)
+        ))
+        outcome_by_id = {
+            section.id: outcome
+            for section, outcome in zip(empty + filled, empty_outcomes + filled_outcomes)
+        }
+        
+        # Write every successful generation in one transaction
+        results = []
+        for section in sections:
+            if section.id in promoted:
+                results.append(SectionGenerationResult(section_id=section.id, status="generated"))
+                continue
+            
+            outcome = outcome_by_id[section.id]
+            if isinstance(outcome, Exception):
+                results.append(SectionGenerationResult(
+                    section_id=section.id,
+                    status="failed",
+                    error=str(outcome)
+                ))
+                continue
+            
+            await refinement_history.record(
+                db,
+                section_id=section.id,
+                prompt="Initial content generation",
+                previous_content=section.content,
+                refined_content=outcome
+            )
+            section.content = outcome
+            results.append(SectionGenerationResult(section_id=section.id, status="generated"))
+        
+        await db.commit()
+    except BaseException:
+        # Promotions and discards roll back, so the drafts are intact; let speculation finish the rest
+        await db.rollback()
+        if speculating:
+            speculative_generator.start(project_id)
+        raise
+    
+    result = await db.execute(
+        select(Project)
+        .options(selectinload(Project.sections))
+        .where(Project.id == project.id)
+        .execution_options(populate_existing=True)
+    )
+    project = result.scalar_one()
+    
+    return GenerateAllResponse(project=project, results=results)
+
+
+@router.post("/draft")
+async def draft_project(
+    draft_data: DraftProjectRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Create a project with an AI outline and content, streaming progress as Server-Sent Events.
+
+    Uses one outline call plus one call per batch of sections. Emits an
+    ``outline`` event with the section titles, a ``project`` event once the
+    project and its sections are saved, a ``section`` event as each section's
+    content is saved (``section_error`` if one fails), then ``done`` with the
+    complete project, or ``error`` if the pipeline cannot continue.
+    """
+    user_id = current_user.id
+    document_type = draft_data.document_type.value
+    title = draft_data.title or draft_data.topic
+    # Reject before streaming starts so the client gets a 429
+    gemini_service.scheduler.check_budget(Priority.BULK)
+    
+    async def events():
+        generation = None
+        try:
+            titles = await gemini_service.generate_outline(
+                topic=draft_data.topic,
+                document_type=document_type,
+                num_sections=draft_data.num_sections or 5,
+                use_cache=not draft_data.regenerate,
+                user_id=user_id,
+                priority=Priority.BULK
+            )
+            if not titles:
+                yield sse_event("error", {"detail": "The model returned an empty outline"})
+                return
+            yield sse_event("outline", {"sections": titles})
+            
+            # The request's session is closed once streaming starts
+            async with async_session_maker() as session:
+                project = Project(
+                    user_id=user_id,
+                    title=title,
+                    description=draft_data.description,
+                    document_type=draft_data.document_type,
+                    topic=draft_data.topic,
+                    color_theme=draft_data.color_theme
+                )
+                session.add(project)
+                await session.flush()
+                sections = [
+                    Section(project_id=project.id, title=section_title, order=order)
+                    for order, section_title in enumerate(titles)
+                ]
+                session.add_all(sections)
+                await session.commit()
+                
+                result = await session.execute(
+                    select(Project)
+                    .options(selectinload(Project.sections))
+                    .where(Project.id == project.id)
+                )
+                project = result.scalar_one()
+                yield sse_event("project", ProjectResponse.model_validate(project).model_dump(mode="json"))
+                
+                # Save and report each section as soon as its content lands
+                settled: asyncio.Queue = asyncio.Queue()
+                
+                def on_result(index: int, outcome: Union[str, Exception]):
+                    settled.put_nowait((index, outcome))
+                
+                generation = asyncio.create_task(gemini_service.generate_sections(
+                    topic=draft_data.topic,
+                    section_titles=titles,
+                    document_type=document_type,
+                    project_context=build_project_context(title, draft_data.description),
+                    use_cache=not draft_data.regenerate,
+                    max_concurrency=settings.GENERATE_ALL_CONCURRENCY,
+                    on_result=on_result,
+                    user_id=user_id
+                ))
+
+                async def next_outcome():
+                    """Next settled section; raises if generation ends before reporting one."""
+                    if settled.empty():
+                        waiter = asyncio.ensure_future(settled.get())
+                        try:
+                            await asyncio.wait({waiter, generation}, return_when=asyncio.FIRST_COMPLETED)
+                        finally:
+                            if not waiter.done():
+                                waiter.cancel()
+                        if waiter.done() and not waiter.cancelled():
+                            return waiter.result()
+                    if settled.empty():
+                        # Re-raise why generation stopped, e.g. the scheduler rejecting the batch
+                        generation.result()
+                        raise RuntimeError("Section generation stopped before every section was reported")
+                    return settled.get_nowait()
+
+                for _ in range(len(sections)):
+                    index, outcome = await next_outcome()
+                    section = sections[index]
+                    if isinstance(outcome, Exception):
+                        yield sse_event("section_error", {
+                            "section_id": section.id,
+                            "detail": f"Failed to generate content: {str(outcome)}"
+                        })
+                        continue
+                    
+                    await refinement_history.record(
+                        session,
+                        section_id=section.id,
+                        prompt="Initial content generation",
+                        previous_content=None,
+                        refined_content=outcome
+                    )
+                    section.content = outcome
+                    await session.commit()
+                    await session.refresh(section)
+                    yield sse_event("section", SectionResponse.model_validate(section).model_dump(mode="json"))
+                await generation
+                
+                result = await session.execute(
+                    select(Project)
+                    .options(selectinload(Project.sections))
+                    .where(Project.id == project.id)
+                    .execution_options(populate_existing=True)
+                )
+                project = result.scalar_one()
+                yield sse_event("done", ProjectResponse.model_validate(project).model_dump(mode="json"))
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Failed to draft project: {str(e)}"})
+        finally:
+            # Stop model work if the client went away mid-stream
+            if generation is not None and not generation.done():
+                generation.cancel()
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import defer, selectinload
+from typing import Optional
 
-from app.database.session import get_db
+from app.api.disconnect import cancel_on_disconnect
+from app.api.sse import SSE_HEADERS, sse_event
+from app.database.session import get_db, async_session_maker
 from app.models.user import User
 from app.models.project import Project, Section, Refinement
 from app.schemas.project import (
@@ -15,6 +19,10 @@ from app.schemas.project import (
 )
 from app.core.security import get_current_user
 from app.services.gemini_service import gemini_service
+from app.services.prompt_budget import build_project_context
+from app.services.refinement_history import refinement_history
+from app.services.scheduler import Priority, SchedulerOverloadedError
+from app.services.speculation import speculative_generator, promote_draft, discard_drafts
 
 router = APIRouter(prefix="/sections", tags=["sections"])
 
@@ -22,6 +30,8 @@ router = APIRouter(prefix="/sections", tags=["sections"])
 @router.post("/{section_id}/generate", response_model=SectionResponse)
 async def generate_section_content(
     section_id: int,
+    request: Request,
+    regenerate: bool = Query(False, description="If true, skip the response cache"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -40,36 +50,49 @@ async def generate_section_content(
             detail="Section not found"
         )
     
+    # A speculative draft makes generation a database read
+    if regenerate:
+        await discard_drafts(db, [section.id])
+    elif await promote_draft(db, section):
+        await db.commit()
+        await db.refresh(section)
+        return section
+    
     # Get project for context
     result = await db.execute(select(Project).where(Project.id == section.project_id))
     project = result.scalar_one()
     
     try:
         # Generate content
-        content = await gemini_service.generate_section_content(
+        content = await cancel_on_disconnect(request, gemini_service.generate_section_content(
             topic=project.topic,
             section_title=section.title,
             document_type=project.document_type.value,
-            project_context=f"Project: {project.title}. {project.description or ''}"
-        )
+            project_context=build_project_context(project.title, project.description),
+            # Generating over existing content is a regeneration
+            use_cache=not (regenerate or section.content),
+            user_id=current_user.id
+        ))
         
         # Store previous content before updating
         previous_content = section.content
         section.content = content
         
         # Create a refinement record to track this generation (for feedback)
-        refinement = Refinement(
+        await refinement_history.record(
+            db,
             section_id=section.id,
             prompt="Initial content generation",
             previous_content=previous_content,
             refined_content=content
         )
-        db.add(refinement)
         
         await db.commit()
         await db.refresh(section)
         
         return section
+    except (HTTPException, SchedulerOverloadedError):
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -80,6 +103,92 @@ async def generate_section_content(
         )
 
 
+@router.post("/{section_id}/generate/stream")
+async def stream_section_content(
+    section_id: int,
+    regenerate: bool = Query(False, description="If true, skip the response cache"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream generated content for a section as Server-Sent Events.
+
+    Emits ``chunk`` events with partial text, then a ``done`` event carrying
+    the saved section, or an ``error`` event if generation fails.
+    """
+    result = await db.execute(
+        select(Section)
+        .join(Project)
+        .where(Section.id == section_id, Project.user_id == current_user.id)
+    )
+    section = result.scalar_one_or_none()
+    
+    if not section:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Section not found"
+        )
+    
+    if regenerate:
+        await discard_drafts(db, [section.id])
+        await db.commit()
+    elif await promote_draft(db, section):
+        await db.commit()
+        await db.refresh(section)
+        promoted = SectionResponse.model_validate(section).model_dump(mode="json")
+        
+        async def promoted_events():
+            yield sse_event("chunk", {"text": promoted["content"]})
+            yield sse_event("done", promoted)
+        
+        return StreamingResponse(promoted_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    result = await db.execute(select(Project).where(Project.id == section.project_id))
+    project = result.scalar_one()
+    
+    # Reject before streaming starts so the client gets a 429
+    gemini_service.scheduler.check_budget(Priority.GENERATE)
+    stream = gemini_service.stream_section_content(
+        topic=project.topic,
+        section_title=section.title,
+        document_type=project.document_type.value,
+        project_context=build_project_context(project.title, project.description),
+        # Generating over existing content is a regeneration
+        use_cache=not (regenerate or section.content),
+        user_id=current_user.id
+    )
+    
+    async def events():
+        chunks = []
+        try:
+            async for delta in stream:
+                chunks.append(delta)
+                yield sse_event("chunk", {"text": delta})
+            content = "".join(chunks).strip()
+            
+            # The request's session is closed once streaming starts
+            async with async_session_maker() as session:
+                saved_section = await session.get(Section, section_id)
+                await refinement_history.record(
+                    session,
+                    section_id=section_id,
+                    prompt="Initial content generation",
+                    previous_content=saved_section.content,
+                    refined_content=content
+                )
+                saved_section.content = content
+                await session.commit()
+                await session.refresh(saved_section)
+            
+            yield sse_event(
+                "done",
+                SectionResponse.model_validate(saved_section).model_dump(mode="json")
+            )
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Failed to generate content: {str(e)}"})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.put("/{section_id}", response_model=SectionResponse)
 async def update_section(
     section_id: int,
@@ -101,6 +210,7 @@ async def update_section(
             detail="Section not found"
         )
     
+    renamed = section_data.title is not None and section_data.title != section.title
     if section_data.title is not None:
         section.title = section_data.title
     if section_data.content is not None:
@@ -108,9 +218,16 @@ async def update_section(
     if section_data.order is not None:
         section.order = section_data.order
     
+    # Drafts for the old title, or for a section the user has written, are stale
+    if renamed or section_data.content is not None:
+        await discard_drafts(db, [section.id])
+    
     await db.commit()
     await db.refresh(section)
     
+    if renamed:
+        speculative_generator.restart(section.project_id)
+    
     return section
 
 
@@ -118,6 +235,7 @@ async def update_section(
 async def refine_section_content(
     section_id: int,
     refinement_data: RefinementCreate,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -141,22 +259,26 @@ async def refine_section_content(
             detail="Cannot refine section without content. Generate content first."
         )
     
+    document_type = await db.scalar(select(Project.document_type).where(Project.id == section.project_id))
+    
     try:
         # Refine content
-        refined_content = await gemini_service.refine_content(
+        refined_content = await cancel_on_disconnect(request, gemini_service.refine_content(
             original_content=section.content,
             refinement_prompt=refinement_data.prompt,
-            section_title=section.title
-        )
+            section_title=section.title,
+            document_type=document_type.value,
+            user_id=current_user.id
+        ))
         
         # Create refinement record
-        refinement = Refinement(
+        refinement = await refinement_history.record(
+            db,
             section_id=section.id,
             prompt=refinement_data.prompt,
             previous_content=section.content,
             refined_content=refined_content
         )
-        db.add(refinement)
         
         # Update section content
         section.content = refined_content
@@ -165,6 +287,8 @@ async def refine_section_content(
         await db.refresh(refinement)
         
         return refinement
+    except (HTTPException, SchedulerOverloadedError):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -172,13 +296,93 @@ async def refine_section_content(
         )
 
 
+@router.post("/{section_id}/refine/stream")
+async def stream_refine_section_content(
+    section_id: int,
+    refinement_data: RefinementCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream refined section content as Server-Sent Events.
+
+    Emits ``chunk`` events with partial text, then a ``done`` event carrying
+    the saved refinement, or an ``error`` event if refinement fails.
+    """
+    result = await db.execute(
+        select(Section)
+        .join(Project)
+        .where(Section.id == section_id, Project.user_id == current_user.id)
+    )
+    section = result.scalar_one_or_none()
+    
+    if not section:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Section not found"
+        )
+    
+    if not section.content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot refine section without content. Generate content first."
+        )
+    
+    previous_content = section.content
+    document_type = await db.scalar(select(Project.document_type).where(Project.id == section.project_id))
+    # Reject before streaming starts so the client gets a 429
+    gemini_service.scheduler.check_budget(Priority.INTERACTIVE)
+    stream = gemini_service.stream_refine_content(
+        original_content=previous_content,
+        refinement_prompt=refinement_data.prompt,
+        section_title=section.title,
+        document_type=document_type.value,
+        user_id=current_user.id
+    )
+    
+    async def events():
+        chunks = []
+        try:
+            async for delta in stream:
+                chunks.append(delta)
+                yield sse_event("chunk", {"text": delta})
+            refined_content = "".join(chunks).strip()
+            
+            # The request's session is closed once streaming starts
+            async with async_session_maker() as session:
+                refinement = await refinement_history.record(
+                    session,
+                    section_id=section_id,
+                    prompt=refinement_data.prompt,
+                    previous_content=previous_content,
+                    refined_content=refined_content
+                )
+                saved_section = await session.get(Section, section_id)
+                saved_section.content = refined_content
+                await session.commit()
+                await session.refresh(refinement)
+            
+            yield sse_event(
+                "done",
+                RefinementResponse.model_validate(refinement).model_dump(mode="json")
+            )
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Failed to refine content: {str(e)}"})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/{section_id}/refinements", response_model=list[RefinementResponse])
 async def get_section_refinements(
     section_id: int,
+    include: Optional[str] = Query(None, description="'content' to include every version's text"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all refinements for a section."""
+    """Get all refinements for a section.
+
+    Texts are left out unless ``include=content``; fetch a single version's
+    text from ``GET /sections/refinements/{refinement_id}``.
+    """
     result = await db.execute(
         select(Section)
         .join(Project)
@@ -192,16 +396,55 @@ async def get_section_refinements(
             detail="Section not found"
         )
     
-    result = await db.execute(
+    include_content = "content" in (include or "").split(",")
+    query = (
         select(Refinement)
-        .where(Refinement.section_id == section_id)
+        .where(Refinement.section_id == section_id, Refinement.is_draft.is_(False))
         .order_by(Refinement.created_at.desc())
     )
+    if not include_content:
+        query = query.options(defer(Refinement.refined_data), defer(Refinement.previous_data),
+                              defer(Refinement.legacy_refined_content), defer(Refinement.legacy_previous_content))
+    result = await db.execute(query)
     refinements = result.scalars().all()
+    if include_content:
+        await refinement_history.materialize(db, refinements)
+    else:
+        for refinement in refinements:
+            refinement.omit_texts()
     
     return refinements
 
 
+@router.get("/refinements/{refinement_id}", response_model=RefinementResponse)
+async def get_refinement(
+    refinement_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get one refinement with its previous and refined text."""
+    result = await db.execute(
+        select(Refinement)
+        .join(Section)
+        .join(Project)
+        .where(
+            Refinement.id == refinement_id,
+            Refinement.is_draft.is_(False),
+            Project.user_id == current_user.id
+        )
+    )
+    refinement = result.scalar_one_or_none()
+    
+    if not refinement:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Refinement {refinement_id} not found"
+        )
+    
+    await refinement_history.materialize(db, [refinement])
+    return refinement
+
+
 @router.patch("/refinements/{refinement_id}/feedback", response_model=RefinementResponse)
 async def update_refinement_feedback(
     refinement_id: int,
@@ -212,7 +455,7 @@ async def update_refinement_feedback(
     """Update feedback for a refinement (like/dislike/comment)."""
     # First check if refinement exists at all
     result = await db.execute(
-        select(Refinement).where(Refinement.id == refinement_id)
+        select(Refinement).where(Refinement.id == refinement_id, Refinement.is_draft.is_(False))
     )
     refinement = result.scalar_one_or_none()
     
@@ -249,5 +492,6 @@ async def update_refinement_feedback(
     
     await db.commit()
     await db.refresh(refinement)
+    await refinement_history.materialize(db, [refinement])
     
     return refinement
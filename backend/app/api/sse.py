@@ -0,0 +1,13 @@
+import json
+from typing import Any
+
+# Disable proxy buffering so events reach the browser as soon as they are sent
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format a Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
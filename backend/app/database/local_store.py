@@ -0,0 +1,36 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Local store calls get their own small pool so they never queue behind
+# other work in the event loop's default executor
+_executor = ThreadPoolExecutor(
+    max_workers=settings.LOCAL_STORE_THREADS,
+    thread_name_prefix="local-store",
+)
+
+
+def connect_local_store(path: str) -> sqlite3.Connection:
+    """Open a SQLite file used for state shared between worker processes.
+
+    The connection runs in autocommit mode so callers control transactions
+    explicitly (``BEGIN IMMEDIATE`` for read-modify-write updates), and WAL
+    lets readers proceed while another worker holds the write lock.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+async def run_in_local_store(fn: Callable[..., T], *args) -> T:
+    """Run a blocking local store operation on the dedicated thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
@@ -1,9 +1,65 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+
+def database_url(url: str) -> URL:
+    """Parse ``DATABASE_URL``, using asyncpg for plain PostgreSQL URLs."""
+    parsed = make_url(url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url)
+    if parsed.drivername == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the SQLite profile to every new connection.
+
+    WAL lets readers run alongside the single writer, and busy_timeout
+    makes writers wait for the lock instead of failing with "database is
+    locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    # Negative values are in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.close()
+
+
+def create_db_engine(url: str) -> AsyncEngine:
+    """Create the async engine for ``url`` with the configured profile.
+
+    SQLite file databases get a connection pool (the aiosqlite default
+    opens a connection per session) and the pragmas above; PostgreSQL runs
+    on asyncpg with pre-ping and connection recycling.
+    """
+    parsed = database_url(url)
+    pool_options = {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    }
+    
+    if parsed.get_backend_name() != "sqlite":
+        return create_async_engine(parsed, echo=settings.DATABASE_ECHO, pool_pre_ping=True, **pool_options)
+    
+    options = {"connect_args": {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    if parsed.database and parsed.database != ":memory:":
+        options.update(poolclass=AsyncAdaptedQueuePool, **pool_options)
+    sqlite_engine = create_async_engine(parsed, echo=settings.DATABASE_ECHO, **options)
+    event.listen(sqlite_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return sqlite_engine
+
+
+engine = create_db_engine(settings.DATABASE_URL)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
@@ -18,7 +74,55 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+def _add_missing_columns(conn):
+    """Add model columns that existing tables were created without.
+
+    ``create_all`` only creates missing tables, so columns added to a model
+    later are applied here. New columns must be nullable or have a
+    ``server_default``.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            preparer = conn.dialect.identifier_preparer
+            column_type = column.type.compile(dialect=conn.dialect)
+            ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.quote(column.name)} {column_type}"
+            if column.server_default is not None:
+                default = column.server_default.arg
+                if not isinstance(default, str):
+                    default = default.compile(dialect=conn.dialect)
+                else:
+                    default = f"'{default}'"
+                ddl += f" DEFAULT {default}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            conn.exec_driver_sql(ddl)
+
+
+def _add_missing_indexes(conn):
+    """Create model indexes that existing tables were created without.
+
+    ``create_all`` skips the indexes of tables that already exist. Uses
+    ``IF NOT EXISTS`` so workers starting together do not race.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_add_missing_indexes)
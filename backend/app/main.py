@@ -1,17 +1,36 @@
-from fastapi import FastAPI
+import logging
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.database.session import init_db
-from app.api import auth, projects, sections, export
+from app.database.session import init_db, async_session_maker
+from app.api import auth, projects, sections, export, metrics, jobs
+from app.services.export_pool import export_pool
+from app.services.job_queue import job_queue
+from app.services.refinement_history import refinement_history
+from app.services import generation_jobs  # noqa: F401 - registers job handlers
+from app.services.scheduler import SchedulerOverloadedError
+from app.services.speculation import speculative_generator
+
+logging.basicConfig(
+    level=settings.LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database and start background job workers."""
     await init_db()
+    await refinement_history.migrate_legacy_rows(async_session_maker)
+    await job_queue.start()
     yield
+    await speculative_generator.stop()
+    await job_queue.stop()
+    export_pool.shutdown()
 
 
 app = FastAPI(
@@ -21,6 +40,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+@app.exception_handler(SchedulerOverloadedError)
+async def scheduler_overloaded_handler(request: Request, exc: SchedulerOverloadedError):
+    """Tell clients to back off while the model call queue is over budget."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +63,8 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(projects.router, prefix="/api")
 app.include_router(sections.router, prefix="/api")
 app.include_router(export.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
 
 
 @app.get("/")
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, Integer, LargeBinary, String, DateTime, ForeignKey, Text, Index, Enum as SQLEnum, false, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Optional
 import enum
 
 from app.database.session import Base
@@ -25,6 +26,10 @@ class ColorTheme(str, enum.Enum):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # A user's projects, most recently updated first
+        Index("ix_projects_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -43,6 +48,10 @@ class Project(Base):
 
 class Section(Base):
     __tablename__ = "sections"
+    __table_args__ = (
+        # A project's sections in document order (every selectinload of Project.sections)
+        Index("ix_sections_project_id_order", "project_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -57,17 +66,73 @@ class Section(Base):
     refinements = relationship("Refinement", back_populates="section", cascade="all, delete-orphan")
 
 
+class RefinementTextsNotLoaded(RuntimeError):
+    """A refinement's text was read without being materialized or omitted first."""
+
+
 class Refinement(Base):
     __tablename__ = "refinements"
+    __table_args__ = (
+        # A section's refinement history, newest first
+        Index("ix_refinements_section_id_created_at", "section_id", "created_at"),
+        # Rows still waiting for the history migration (empty once it has run)
+        Index(
+            "ix_refinements_legacy_section_id",
+            "section_id",
+            sqlite_where=text("storage IS NULL"),
+            postgresql_where=text("storage IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     section_id = Column(Integer, ForeignKey("sections.id"), nullable=False)
     prompt = Column(Text, nullable=False)
-    previous_content = Column(Text, nullable=True)
-    refined_content = Column(Text, nullable=False)
+    # Texts are encoded by app.services.refinement_history: 'snapshot' or a
+    # 'delta' against the refinement ``base_id``. None marks rows written
+    # before that, whose texts are still in the legacy columns.
+    storage = Column(String, nullable=True)
+    base_id = Column(Integer, nullable=True)
+    delta_depth = Column(Integer, default=0, server_default="0", nullable=False)
+    refined_data = Column(LargeBinary, nullable=True)
+    previous_data = Column(LargeBinary, nullable=True)
+    legacy_previous_content = Column("previous_content", Text, nullable=True)
+    legacy_refined_content = Column("refined_content", Text, default="", server_default="", nullable=False)
     feedback = Column(String, nullable=True)  # 'like', 'dislike', or None
     comment = Column(Text, nullable=True)
+    # Speculatively generated content not yet shown to the user
+    is_draft = Column(Boolean, default=False, server_default=false(), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     section = relationship("Section", back_populates="refinements")
+
+    def set_texts(self, refined_content: str, previous_content: Optional[str]):
+        """Attach the full texts rebuilt by refinement_history; they are not persisted."""
+        self._texts = (refined_content, previous_content)
+
+    def omit_texts(self):
+        """Leave the texts out (read as None) of responses that did not ask for them."""
+        self._texts_omitted = True
+
+    @property
+    def texts_loaded(self) -> bool:
+        return self.__dict__.get("_texts") is not None
+
+    def _loaded_text(self, position: int) -> Optional[str]:
+        texts = self.__dict__.get("_texts")
+        if texts is None:
+            if self.__dict__.get("_texts_omitted"):
+                return None
+            # Not an AttributeError, so serializers fail instead of falling back to a default
+            raise RefinementTextsNotLoaded(
+                f"Texts of refinement {self.id} were read before refinement_history.materialize()"
+            )
+        return texts[position]
+
+    @property
+    def refined_content(self) -> Optional[str]:
+        return self._loaded_text(0)
+
+    @property
+    def previous_content(self) -> Optional[str]:
+        return self._loaded_text(1)
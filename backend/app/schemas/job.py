@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field, Json
+from typing import Any, Optional
+from datetime import datetime
+from app.models.job import JobKind, JobStatus
+from app.models.project import DocumentType
+from app.schemas.project import MAX_OUTLINE_SECTIONS
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    section_id: Optional[int] = None  # generate_section, refine_section
+    prompt: Optional[str] = None  # refine_section
+    topic: Optional[str] = None  # outline
+    document_type: Optional[DocumentType] = None  # outline
+    num_sections: Optional[int] = Field(5, ge=1, le=MAX_OUTLINE_SECTIONS)  # outline
+    regenerate: Optional[bool] = False  # Skip the response cache
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: JobKind
+    status: JobStatus
+    result: Optional[Json[Any]] = None
+    error: Optional[str]
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 from app.models.project import DocumentType
 
+# Largest outline a single request may ask the model for
+MAX_OUTLINE_SECTIONS = 30
+
 
 class SectionCreate(BaseModel):
     title: str
@@ -34,6 +37,7 @@ class ProjectCreate(BaseModel):
     topic: str
     color_theme: Optional[str] = "blue_purple"
     sections: List[SectionCreate]
+    speculate: Optional[bool] = False  # Pre-generate section content in the background
 
 
 class ProjectUpdate(BaseModel):
@@ -58,6 +62,48 @@ class ProjectResponse(BaseModel):
         from_attributes = True
 
 
+class SectionSummary(BaseModel):
+    id: int
+    title: str
+    order: int
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectSummary(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+    document_type: DocumentType
+    topic: str
+    color_theme: Optional[str] = "blue_purple"
+    created_at: datetime
+    updated_at: datetime
+    section_count: int = 0
+    sections: Optional[List[SectionSummary]] = None  # Only with ?include=sections
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectPage(BaseModel):
+    items: List[ProjectSummary]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
+
+
+class SectionGenerationResult(BaseModel):
+    section_id: int
+    status: str  # 'generated' or 'failed'
+    error: Optional[str] = None
+
+
+class GenerateAllResponse(BaseModel):
+    project: ProjectResponse
+    results: List[SectionGenerationResult]
+
+
 class RefinementCreate(BaseModel):
     prompt: str
 
@@ -71,8 +117,21 @@ class RefinementResponse(BaseModel):
     id: int
     section_id: int
     prompt: str
-    previous_content: Optional[str]
-    refined_content: str
+    # Only filled in when the version's text was requested
+    previous_content: Optional[str] = None
+    refined_content: Optional[str] = None
+    feedback: Optional[str]
+    comment: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SectionFeedbackResponse(BaseModel):
+    """Feedback on the latest refinement of a section."""
+    section_id: int
+    refinement_id: int
     feedback: Optional[str]
     comment: Optional[str]
     created_at: datetime
@@ -84,4 +143,19 @@ class RefinementResponse(BaseModel):
 class GenerateOutlineRequest(BaseModel):
     topic: str
     document_type: DocumentType
-    num_sections: Optional[int] = 5
+    num_sections: Optional[int] = Field(5, ge=1, le=MAX_OUTLINE_SECTIONS)
+    regenerate: Optional[bool] = False  # Skip the response cache
+
+
+class OutlineResponse(BaseModel):
+    sections: List[str]
+    # Set when the outline was served from a near-identical earlier topic
+    reused: bool = False
+    reused_topic: Optional[str] = None
+    similarity: Optional[float] = None
+
+
+class DraftProjectRequest(GenerateOutlineRequest):
+    title: Optional[str] = None  # Defaults to the topic
+    description: Optional[str] = None
+    color_theme: Optional[str] = "blue_purple"
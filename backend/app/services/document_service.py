@@ -5,10 +5,24 @@ from pptx import Presentation
 from pptx.util import Inches as PptxInches, Pt as PptxPt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
-from typing import List
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from lxml import etree
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+import hashlib
 import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
 
-from app.models.project import Project, Section
+from app.core.config import settings
 
 
 # Color theme definitions (background, title, text, accent)
@@ -79,206 +93,431 @@ COLOR_THEMES = {
 }
 
 
+def _style_placeholder(
+    placeholder,
+    box: Tuple[float, float, float, float],
+    size: int,
+    color: RGBColor,
+    bold: bool = False,
+    align: str = "ctr",
+    spacing: int = 0,
+):
+    """Position a layout placeholder and set the text style its slides inherit.
+
+    ``box`` is (left, top, width, height) in inches; ``spacing`` is the
+    space before and after each paragraph in points.
+    """
+    placeholder.left, placeholder.top, placeholder.width, placeholder.height = (PptxInches(v) for v in box)
+    txBody = placeholder.element.txBody
+    bodyPr = txBody.bodyPr
+    bodyPr.set("wrap", "square")
+    bodyPr.set("anchor", "t")
+    # Grow the box to fit like a text box, rather than the master's shrink-to-fit
+    for child in list(bodyPr):
+        bodyPr.remove(child)
+    bodyPr.append(parse_xml(f'<a:spAutoFit {nsdecls("a")}/>'))
+    for list_style in txBody.findall(qn("a:lstStyle")):
+        txBody.remove(list_style)
+    list_style = parse_xml(f'<a:lstStyle {nsdecls("a")}/>')
+    bodyPr.addnext(list_style)
+    list_style.append(parse_xml(
+        f'<a:lvl1pPr {nsdecls("a")} marL="0" indent="0" algn="{align}">'
+        f'<a:spcBef><a:spcPts val="{spacing * 100}"/></a:spcBef>'
+        f'<a:spcAft><a:spcPts val="{spacing * 100}"/></a:spcAft>'
+        f'<a:buNone/>'
+        f'<a:defRPr sz="{size * 100}" b="{int(bold)}"><a:solidFill><a:srgbClr val="{color}"/></a:solidFill></a:defRPr>'
+        f'</a:lvl1pPr>'
+    ))
+
+
+@lru_cache(maxsize=None)
+def pptx_base_template(color_theme: Optional[str]) -> bytes:
+    """Empty presentation styled for a theme, built once per process.
+
+    The slide master has the theme's gradient background, and two layouts
+    are kept: a title slide and a title-and-content slide whose
+    placeholders carry the positions, fonts and colors of the export.
+    """
+    theme = COLOR_THEMES.get(color_theme, COLOR_THEMES["blue_purple"])
+    prs = Presentation()
+    prs.slide_width = PptxInches(12)
+    prs.slide_height = PptxInches(8.5)
+    
+    fill = prs.slide_master.background.fill
+    fill.gradient()
+    fill.gradient_angle = 45
+    fill.gradient_stops[0].color.rgb = theme["bg1"]
+    fill.gradient_stops[1].color.rgb = theme["bg2"]
+    
+    # Drop the layouts exports never use
+    for layout in list(prs.slide_layouts)[2:]:
+        prs.slide_layouts.remove(layout)
+    title_layout, content_layout = prs.slide_layouts[0], prs.slide_layouts[1]
+    
+    _style_placeholder(title_layout.placeholders[0], (0.5, 3, 11, 1.5), 48, theme["title"], bold=True)
+    _style_placeholder(title_layout.placeholders[1], (1, 5, 10, 2), 24, theme["text"])
+    _style_placeholder(content_layout.placeholders[0], (0.5, 0.5, 11, 1.2), 32, theme["title"], bold=True)
+    _style_placeholder(
+        content_layout.placeholders[1], (1.75, 2, 7, 4.5), 20, theme["text"], align="just", spacing=8
+    )
+    
+    file_stream = io.BytesIO()
+    prs.save(file_stream)
+    return file_stream.getvalue()
+
+
+PPTX_SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+PPTX_SLIDE_RELATIONSHIP = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+_XMLNS = re.compile(rb' xmlns:\w+="[^"]*"')
+
+
+def _without_parts(package: bytes, names: Sequence[str]) -> bytes:
+    """Copy of a zip package without ``names``, for appending replacements to."""
+    source = zipfile.ZipFile(io.BytesIO(package))
+    file_stream = io.BytesIO()
+    with zipfile.ZipFile(file_stream, "w") as target:
+        for info in source.infolist():
+            if info.filename not in names:
+                target.writestr(info, source.read(info))
+    return file_stream.getvalue()
+
+
+def _append_parts(base: bytes, parts: Sequence[Tuple[str, bytes]], file_stream: BinaryIO) -> BinaryIO:
+    """Write ``base`` plus parts to ``file_stream``; base entries are not recompressed."""
+    file_stream.write(base)
+    with zipfile.ZipFile(file_stream, "a", zipfile.ZIP_DEFLATED) as package:
+        for name, data in parts:
+            package.writestr(name, data)
+    file_stream.seek(0)
+    return file_stream
+
+
+def _split_part(xml: bytes, marker: bytes) -> Tuple[bytes, bytes]:
+    """Split a template part where generated entries go; the tail starts at ``marker``."""
+    head, found, tail = xml.partition(marker)
+    if not found:
+        raise ValueError(f"Base template part has no {marker.decode()}")
+    return head, marker + tail
+
+
+def _body_xml(element) -> bytes:
+    """Serialize a body element without the namespace declarations lxml repeats on it.
+
+    The declarations are already on the document root it is spliced into.
+    """
+    xml = etree.tostring(element, encoding="UTF-8", xml_declaration=False)
+    end = xml.index(b">")
+    return _XMLNS.sub(b"", xml[:end]) + xml[end:]
+
+
+@lru_cache(maxsize=None)
+def _pptx_package(color_theme: Optional[str]):
+    """The theme's template split into the fixed parts and the ones listing slides.
+
+    Returns ``(base, presentation, relationships, content_types, next_rid)``
+    where ``base`` is the zip without the three listing parts and each of
+    those is a (head, tail) pair to splice slide entries between.
+    """
+    template = pptx_base_template(color_theme)
+    with zipfile.ZipFile(io.BytesIO(template)) as package:
+        presentation = package.read("ppt/presentation.xml")
+        relationships = package.read("ppt/_rels/presentation.xml.rels")
+        content_types = package.read("[Content_Types].xml")
+    next_rid = 1 + max(int(rid) for rid in re.findall(rb'Id="rId(\d+)"', relationships))
+    base = _without_parts(
+        template, ("ppt/presentation.xml", "ppt/_rels/presentation.xml.rels", "[Content_Types].xml")
+    )
+    head, tail = _split_part(presentation, b"<p:sldIdLst/>")
+    return (
+        base,
+        (head, tail[len(b"<p:sldIdLst/>"):]),
+        _split_part(relationships, b"</Relationships>"),
+        _split_part(content_types, b"</Types>"),
+        next_rid,
+    )
+
+
+@lru_cache(maxsize=None)
+def _docx_package():
+    """The default Word template without its body, as ``(base, (head, tail))``.
+
+    ``head`` ends with ``<w:body>`` and ``tail`` starts at the section
+    properties, so the document is ``head`` + body blocks + ``tail``.
+    """
+    file_stream = io.BytesIO()
+    Document().save(file_stream)
+    template = file_stream.getvalue()
+    with zipfile.ZipFile(io.BytesIO(template)) as package:
+        document = package.read("word/document.xml")
+    return _without_parts(template, ("word/document.xml",)), _split_part(document, b"<w:sectPr")
+
+
+def _fragment_digest(*values) -> str:
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class SectionSnapshot:
+    title: str
+    content: Optional[str]
+    order: int
+    id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ProjectSnapshot:
+    """Plain copy of the project fields an export reads.
+
+    Exports render in worker processes, which get this instead of ORM
+    objects bound to a database session.
+    """
+    title: str
+    description: Optional[str]
+    topic: str
+    document_type: str
+    color_theme: Optional[str]
+    sections: Tuple[SectionSnapshot, ...]
+
+    @classmethod
+    def from_project(cls, project) -> "ProjectSnapshot":
+        """Copy a loaded ``Project`` and its sections."""
+        return cls(
+            title=project.title,
+            description=project.description,
+            topic=project.topic,
+            document_type=project.document_type.value,
+            color_theme=project.color_theme,
+            sections=tuple(
+                SectionSnapshot(
+                    title=section.title, content=section.content, order=section.order, id=section.id
+                )
+                for section in sorted(project.sections, key=lambda x: x.order)
+            ),
+        )
+
+
 class DocumentService:
-    @staticmethod
-    def create_docx(project: Project, sections: List[Section]) -> io.BytesIO:
-        """Create a Word document from project data."""
-        doc = Document()
-        
-        # Add title
-        title = doc.add_heading(project.title, 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add description if exists
-        if project.description:
-            desc_para = doc.add_paragraph(project.description)
-            desc_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            doc.add_paragraph()  # Empty line
-        
-        # Add topic information
-        topic_para = doc.add_paragraph()
-        topic_para.add_run("Topic: ").bold = True
-        topic_para.add_run(project.topic)
-        topic_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-        doc.add_paragraph()  # Empty line
-        
+    """Render exports, reusing the XML of slides and sections that have not changed.
+
+    Each content slide (PPTX) or section's body block (DOCX) is cached as
+    serialized XML keyed by (section id, content digest, theme), and the
+    package is assembled from the cached fragments around a prebuilt base,
+    so only changed sections go through python-pptx/python-docx. The cache
+    is an LRU of ``fragment_cache_entries`` fragments in each export
+    worker process.
+
+    Files are written to a ``SpooledTemporaryFile`` that moves to disk once
+    it grows past ``spool_max_bytes``.
+    """
+
+    def __init__(self, fragment_cache_entries: int = 4096, spool_max_bytes: int = 1024 * 1024):
+        self.fragment_cache_entries = fragment_cache_entries
+        self.spool_max_bytes = spool_max_bytes
+        self._fragments: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached_fragments(self, keys: Sequence[tuple]) -> Dict[tuple, object]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                fragment = self._fragments.get(key)
+                if fragment is not None:
+                    self._fragments.move_to_end(key)
+                    found[key] = fragment
+        return found
+
+    def _remember_fragments(self, fragments: Dict[tuple, object]):
+        if self.fragment_cache_entries <= 0:
+            return
+        with self._lock:
+            self._fragments.update(fragments)
+            for key in fragments:
+                self._fragments.move_to_end(key)
+            while len(self._fragments) > self.fragment_cache_entries:
+                self._fragments.popitem(last=False)
+
+    def clear_fragment_cache(self):
+        with self._lock:
+            self._fragments.clear()
+
+    def _spool(self) -> BinaryIO:
+        return tempfile.SpooledTemporaryFile(max_size=self.spool_max_bytes)
+
+    def create_docx(self, project: ProjectSnapshot, sections: Sequence[SectionSnapshot]) -> BinaryIO:
+        """Create a Word document from project data, returned as a rewound spooled file."""
         # Sort sections by order
         sorted_sections = sorted(sections, key=lambda x: x.order)
+        header_key = ("docx", None, _fragment_digest(project.title, project.description, project.topic))
+        keys = [header_key] + [
+            ("docx", section.id, _fragment_digest(section.title, section.content))
+            for section in sorted_sections
+        ]
+        fragments = self._cached_fragments(keys)
+        missing = [(key, section) for key, section in zip(keys[1:], sorted_sections) if key not in fragments]
         
-        # Add each section
-        for section in sorted_sections:
-            # Add section heading
-            doc.add_heading(section.title, level=1)
+        if header_key not in fragments or missing:
+            rendered = {}
+            doc = Document()
+            body = doc.element.body
+            
+            def take_blocks(key):
+                # Everything added since the last call, minus the trailing sectPr
+                blocks = [block for block in body if block.tag != body.sectPr.tag]
+                rendered[key] = b"".join(_body_xml(block) for block in blocks)
+                for block in blocks:
+                    body.remove(block)
             
-            # Add section content
-            if section.content:
-                content_para = doc.add_paragraph(section.content)
-                content_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            else:
-                placeholder_para = doc.add_paragraph("[Content not yet generated]")
-                placeholder_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+            if header_key not in fragments:
+                # Add title
+                title = doc.add_heading(project.title, 0)
+                title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                
+                # Add description if exists
+                if project.description:
+                    desc_para = doc.add_paragraph(project.description)
+                    desc_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                    doc.add_paragraph()  # Empty line
+                
+                # Add topic information
+                topic_para = doc.add_paragraph()
+                topic_para.add_run("Topic: ").bold = True
+                topic_para.add_run(project.topic)
+                topic_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+                doc.add_paragraph()  # Empty line
+                take_blocks(header_key)
             
-            doc.add_paragraph()  # Empty line between sections
+            for key, section in missing:
+                # Add section heading
+                doc.add_heading(section.title, level=1)
+                
+                # Add section content
+                if section.content:
+                    content_para = doc.add_paragraph(section.content)
+                    content_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+                else:
+                    placeholder_para = doc.add_paragraph("[Content not yet generated]")
+                    placeholder_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+                
+                doc.add_paragraph()  # Empty line between sections
+                take_blocks(key)
+            
+            self._remember_fragments(rendered)
+            fragments.update(rendered)
         
-        # Save to BytesIO
-        file_stream = io.BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-        return file_stream
+        base, (head, tail) = _docx_package()
+        document = b"".join([head] + [fragments[key] for key in keys] + [tail])
+        return _append_parts(base, [("word/document.xml", document)], self._spool())
     
-    @staticmethod
-    def create_pptx(project: Project, sections: List[Section]) -> io.BytesIO:
-        """Create a PowerPoint presentation from project data."""
-        prs = Presentation()
-        prs.slide_width = PptxInches(12)
-        prs.slide_height = PptxInches(8.5)
-        
-        # Get color theme
-        theme = COLOR_THEMES.get(project.color_theme, COLOR_THEMES["blue_purple"])
-        
-        # Title slide with custom design
-        blank_layout = prs.slide_layouts[6]  # Blank layout
-        title_slide = prs.slides.add_slide(blank_layout)
-        
-        # Add gradient background to title slide
-        background = title_slide.background
-        fill = background.fill
-        fill.gradient()
-        fill.gradient_angle = 45
-        fill.gradient_stops[0].color.rgb = theme["bg1"]
-        fill.gradient_stops[1].color.rgb = theme["bg2"]
-        
-        # Add title text box - centered and full width
-        title_box = title_slide.shapes.add_textbox(
-            PptxInches(0.5), 
-            PptxInches(3), 
-            PptxInches(11), 
-            PptxInches(1.5)
-        )
-        title_frame = title_box.text_frame
-        title_frame.word_wrap = True
-        title_frame.vertical_anchor = 1  # Middle vertical alignment
-        title_para = title_frame.paragraphs[0]
-        title_para.text = project.title
-        title_para.alignment = PP_ALIGN.CENTER
-        title_para.font.size = PptxPt(48)
-        title_para.font.bold = True
-        title_para.font.color.rgb = theme["title"]
-        
-        # Add subtitle/description text box - full width
-        subtitle_box = title_slide.shapes.add_textbox(
-            PptxInches(1), 
-            PptxInches(5), 
-            PptxInches(10), 
-            PptxInches(2)
-        )
-        subtitle_frame = subtitle_box.text_frame
-        subtitle_frame.word_wrap = True
-        subtitle_frame.vertical_anchor = 1  # Middle vertical alignment
-        subtitle_para = subtitle_frame.paragraphs[0]
-        if project.description:
-            subtitle_para.text = project.description
-        else:
-            subtitle_para.text = project.topic
-        subtitle_para.alignment = PP_ALIGN.CENTER
-        subtitle_para.font.size = PptxPt(24)
-        subtitle_para.font.color.rgb = theme["text"]
-        
+    def create_pptx(self, project: ProjectSnapshot, sections: Sequence[SectionSnapshot]) -> BinaryIO:
+        """Create a PowerPoint presentation from project data, returned as a rewound spooled file.
+
+        Slides come from the theme's base template, whose layouts already
+        carry the background and text styles, so each slide only gets text.
+        """
         # Sort sections by order
         sorted_sections = sorted(sections, key=lambda x: x.order)
+        theme = project.color_theme
+        title_key = ("pptx", None, _fragment_digest(project.title, project.description or project.topic), theme)
+        keys = [title_key] + [
+            ("pptx", section.id, _fragment_digest(section.title, section.content), theme)
+            for section in sorted_sections
+        ]
+        fragments = self._cached_fragments(keys)
+        missing = [(key, section) for key, section in zip(keys[1:], sorted_sections) if key not in fragments]
         
-        # Add content slides
-        for section in sorted_sections:
-            # Use blank layout for custom positioning
-            blank_layout = prs.slide_layouts[6]  # Blank layout
-            slide = prs.slides.add_slide(blank_layout)
+        if title_key not in fragments or missing:
+            rendered = {}
+            prs = Presentation(io.BytesIO(pptx_base_template(theme)))
+            title_layout, content_layout = prs.slide_layouts[0], prs.slide_layouts[1]
             
-            # Add gradient background with theme colors
-            background = slide.background
-            fill = background.fill
-            fill.gradient()
-            fill.gradient_angle = 45
-            fill.gradient_stops[0].color.rgb = theme["bg1"]
-            fill.gradient_stops[1].color.rgb = theme["bg2"]
+            if title_key not in fragments:
+                # Title slide
+                title_slide = prs.slides.add_slide(title_layout)
+                title_slide.shapes.title.text = project.title
+                title_slide.placeholders[1].text = project.description or project.topic
+                rendered[title_key] = (title_slide.part.blob, title_slide.part.rels.xml)
             
-            # Add title at the top - centered with styling
-            title_box = slide.shapes.add_textbox(
-                PptxInches(0.5), 
-                PptxInches(0.5), 
-                PptxInches(11), 
-                PptxInches(1.2)
-            )
-            title_frame = title_box.text_frame
-            title_frame.word_wrap = True
-            title_para = title_frame.paragraphs[0]
-            title_para.text = section.title
-            title_para.alignment = PP_ALIGN.CENTER
-            title_para.font.size = PptxPt(32)
-            title_para.font.bold = True
-            title_para.font.color.rgb = theme["title"]
+            # Add content slides
+            for key, section in missing:
+                slide = prs.slides.add_slide(content_layout)
+                slide.shapes.title.text = section.title
+                text_frame = slide.placeholders[1].text_frame
+                
+                if section.content:
+                    lines = []
+                    for line in section.content.strip().split('\n'):
+                        line = line.strip()
+                        # Normalize bullet markers to "• "
+                        if line[:2] in ('• ', '- ', '* '):
+                            line = '• ' + line[2:]
+                        if line:
+                            lines.append(line)
+                    for i, line in enumerate(lines):
+                        p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+                        p.text = line
+                else:
+                    p = text_frame.paragraphs[0]
+                    p.text = "[Content not yet generated]"
+                    p.alignment = PP_ALIGN.CENTER
+                    p.font.size = PptxPt(18)
+                rendered[key] = (slide.part.blob, slide.part.rels.xml)
             
-            # Add content box - centered on the page both horizontally and vertically
-            # Slide is 10" wide x 8.5" tall
-            # Box is 7" wide x 4.5" tall, so:
-            # Left = (10 - 7) / 2 = 1.5"
-            # Top = (8.5 - 4.5) / 2 = 2"
-            content_box = slide.shapes.add_textbox(
-                PptxInches(1.75), 
-                PptxInches(2), 
-                PptxInches(7), 
-                PptxInches(4.5)
-            )
-            text_frame = content_box.text_frame
-            text_frame.vertical_anchor = 1  # MSO_ANCHOR.MIDDLE for vertical centering
-            text_frame.word_wrap = True
-            
-            if section.content:
-                # Remove redundant bullet markers (• or - at start) and split content
-                content_lines = section.content.strip().split('\n')
-                for i, line in enumerate(content_lines):
-                    line = line.strip()
-                    # Remove leading bullet characters but keep track if it was bulleted
-                    is_bullet = False
-                    if line.startswith('• '):
-                        line = line[2:]
-                        is_bullet = True
-                    elif line.startswith('- '):
-                        line = line[2:]
-                        is_bullet = True
-                    elif line.startswith('* '):
-                        line = line[2:]
-                        is_bullet = True
-                    
-                    if line:
-                        if i == 0:
-                            p = text_frame.paragraphs[0]
-                        else:
-                            p = text_frame.add_paragraph()
-                        
-                        # Add bullet symbol back if it was originally bulleted
-                        if is_bullet:
-                            p.text = '• ' + line
-                        else:
-                            p.text = line
-                        
-                        p.level = 0
-                        p.alignment = PP_ALIGN.JUSTIFY  # Justify text
-                        p.font.size = PptxPt(20)
-                        p.font.color.rgb = theme["text"]
-                        p.space_before = PptxPt(8)
-                        p.space_after = PptxPt(8)
-            else:
-                p = text_frame.paragraphs[0]
-                p.text = "[Content not yet generated]"
-                p.alignment = PP_ALIGN.CENTER
-                p.font.size = PptxPt(18)
-                p.font.color.rgb = theme["text"]
+            self._remember_fragments(rendered)
+            fragments.update(rendered)
         
-        # Save to BytesIO
-        file_stream = io.BytesIO()
-        prs.save(file_stream)
-        file_stream.seek(0)
-        return file_stream
+        # Assemble the package: slide parts plus the entries that list them
+        base, presentation, relationships, content_types, next_rid = _pptx_package(theme)
+        parts: List[Tuple[str, bytes]] = []
+        slide_ids, slide_rels, overrides = [], [], []
+        for number, key in enumerate(keys, start=1):
+            xml, rels = fragments[key]
+            parts.append((f"ppt/slides/slide{number}.xml", xml))
+            parts.append((f"ppt/slides/_rels/slide{number}.xml.rels", rels))
+            rid = f"rId{next_rid + number - 1}"
+            slide_ids.append(f'<p:sldId id="{255 + number}" r:id="{rid}"/>')
+            slide_rels.append(
+                f'<Relationship Id="{rid}" Type="{PPTX_SLIDE_RELATIONSHIP}" Target="slides/slide{number}.xml"/>'
+            )
+            overrides.append(
+                f'<Override PartName="/ppt/slides/slide{number}.xml" ContentType="{PPTX_SLIDE_CONTENT_TYPE}"/>'
+            )
+        parts.append(("[Content_Types].xml", content_types[0] + "".join(overrides).encode() + content_types[1]))
+        parts.append((
+            "ppt/presentation.xml",
+            presentation[0] + b"<p:sldIdLst>" + "".join(slide_ids).encode() + b"</p:sldIdLst>" + presentation[1],
+        ))
+        parts.append((
+            "ppt/_rels/presentation.xml.rels",
+            relationships[0] + "".join(slide_rels).encode() + relationships[1],
+        ))
+        return _append_parts(base, parts, self._spool())
 
 
-document_service = DocumentService()
+# Global document service instance
+document_service = DocumentService(
+    fragment_cache_entries=settings.EXPORT_FRAGMENT_CACHE_ENTRIES,
+    spool_max_bytes=settings.EXPORT_SPOOL_MAX_KB * 1024,
+)
+
+
+def render_document(snapshot: ProjectSnapshot, spool_directory: Optional[str] = None) -> Union[bytes, str]:
+    """Render a snapshot to DOCX or PPTX; runs in export worker processes.
+
+    Returns the file's bytes if it fit in the spool. A larger file is
+    copied to a ``.tmp`` file in ``spool_directory`` (the system temporary
+    directory if None) and its path returned; the caller moves or removes it.
+    """
+    if snapshot.document_type == "docx":
+        file_stream = document_service.create_docx(snapshot, snapshot.sections)
+    else:
+        file_stream = document_service.create_pptx(snapshot, snapshot.sections)
+    with file_stream:
+        if file_stream.seek(0, io.SEEK_END) <= document_service.spool_max_bytes:
+            file_stream.seek(0)
+            return file_stream.read()
+        file_stream.seek(0)
+        if spool_directory is not None:
+            os.makedirs(spool_directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=spool_directory, suffix=".tmp", delete=False) as spilled:
+            shutil.copyfileobj(file_stream, spilled)
+        return spilled.name
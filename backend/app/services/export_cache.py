@@ -0,0 +1,127 @@
+"""Disk cache of rendered exports keyed by a digest of their content."""
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.services.document_service import ProjectSnapshot
+from app.services.metrics import metrics_registry
+
+# Bump when rendering changes so stale files stop matching
+RENDER_VERSION = 2
+
+lookups_total = metrics_registry.counter(
+    "export_cache_lookups_total", "Export requests by cache outcome", ("result",)
+)
+evictions_total = metrics_registry.counter(
+    "export_cache_evictions_total", "Rendered exports evicted to stay under the size limit"
+)
+
+
+def snapshot_digest(snapshot: ProjectSnapshot) -> str:
+    """Hex digest of everything that affects a rendered export."""
+    payload = json.dumps(
+        {"version": RENDER_VERSION, **dataclasses.asdict(snapshot)}, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    """Size-bounded LRU of rendered files in ``directory``.
+
+    Files are named by their digest, so workers sharing the directory also
+    share entries. Reads bump the file's mtime, and writes evict the least
+    recently used files once the total exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str, extension: str) -> Path:
+        return self.directory / f"{digest}.{extension}"
+
+    def _lookup(self, digest: str, extension: str) -> Optional[Path]:
+        path = self._path(digest, extension)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def _store(self, digest: str, extension: str, data: bytes) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write under a temporary name so readers never see a partial file
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        return self._adopt(digest, extension, temporary)
+
+    def _adopt(self, digest: str, extension: str, source: str) -> Path:
+        path = self._path(digest, extension)
+        size = os.path.getsize(source)
+        os.replace(source, path)
+        with self._lock:
+            if self._total is None:
+                self._total = sum(entry.stat().st_size for entry in self._entries())
+            else:
+                self._total += size
+            if self._total > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _entries(self):
+        return [entry for entry in self.directory.iterdir() if entry.suffix != ".tmp" and entry.is_file()]
+
+    def _evict(self, keep: Path):
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat(), entry))
+            except FileNotFoundError:
+                continue
+        entries.sort(key=lambda item: item[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+            evictions_total.inc()
+        self._total = total
+
+    async def get(self, digest: str, extension: str) -> Optional[Path]:
+        """Path of the cached file for ``digest``, or None."""
+        return await asyncio.to_thread(self._lookup, digest, extension)
+
+    async def put(self, digest: str, extension: str, data: bytes) -> Path:
+        """Store rendered bytes and return their path."""
+        return await asyncio.to_thread(self._store, digest, extension, data)
+
+    async def put_file(self, digest: str, extension: str, source: str) -> Path:
+        """Move a rendered file into the cache and return its new path.
+
+        ``source`` should be on the same filesystem as the cache directory,
+        such as a temporary file inside it, so the move is a rename.
+        """
+        return await asyncio.to_thread(self._adopt, digest, extension, source)
+
+
+# Global export cache instance
+export_cache = ExportCache(
+    directory=settings.EXPORT_CACHE_DIR,
+    max_bytes=settings.EXPORT_CACHE_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,141 @@
+"""Render exports off the event loop in worker processes."""
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Union
+
+from app.core.config import settings
+from app.services.document_service import ProjectSnapshot, render_document
+from app.services.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+queue_depth = metrics_registry.gauge("export_queue_depth", "Exports waiting for a render worker")
+in_flight = metrics_registry.gauge("export_in_flight", "Exports being rendered")
+queue_wait = metrics_registry.histogram(
+    "export_queue_wait_seconds", "Time exports waited for a render worker", ("document_type",)
+)
+render_duration = metrics_registry.histogram(
+    "export_render_seconds", "Time spent rendering an export", ("document_type",)
+)
+exports_total = metrics_registry.counter(
+    "exports_total", "Exports by outcome", ("document_type", "result")
+)
+
+
+class ExportOverloadedError(Exception):
+    """Too many exports are queued; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Too many exports are queued; retry in {self.retry_after}s")
+
+
+class ExportPool:
+    """Run ``render_document`` in a process pool with bounded concurrency.
+
+    python-docx and python-pptx are CPU-bound and hold the GIL, so exports
+    rendered on the event loop (or in a thread) stall every other request.
+    At most ``workers`` exports render at once; up to ``max_queued`` more
+    wait their turn and anything beyond that is rejected with
+    ``ExportOverloadedError``. ``workers=0`` renders in a thread instead,
+    for platforms where worker processes are unavailable.
+
+    Workers are spawned, not forked, on first use: forking the running
+    server would copy its event loop and database connections.
+
+    Files too large for the render spool come back as the path of a
+    temporary file in ``spool_directory`` rather than as bytes, so they are
+    never held whole in this process.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 16, spool_directory: Optional[str] = None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.spool_directory = spool_directory
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._rendering = 0
+        # Recent render time, for the Retry-After estimate
+        self._average_seconds = 1.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+        return self._executor
+
+    def _update_gauges(self):
+        queue_depth.set(self._waiting)
+        in_flight.set(self._rendering)
+
+    async def render(self, snapshot: ProjectSnapshot) -> Union[bytes, str]:
+        """Render ``snapshot``, waiting for a free worker; see ``render_document``."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+        if self._slots.locked() and self._waiting >= self.max_queued:
+            exports_total.inc(document_type=snapshot.document_type, result="rejected")
+            raise ExportOverloadedError(
+                self._average_seconds * (self._waiting + 1) / max(1, self.workers)
+            )
+
+        queued_at = time.monotonic()
+        self._waiting += 1
+        self._update_gauges()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+            self._update_gauges()
+        queue_wait.observe(time.monotonic() - queued_at, document_type=snapshot.document_type)
+
+        self._rendering += 1
+        self._update_gauges()
+        started = time.monotonic()
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), render_document, snapshot, self.spool_directory
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            logger.exception("Export worker pool broke; restarting it")
+            self._executor = None
+            exports_total.inc(document_type=snapshot.document_type, result="error")
+            raise
+        except Exception:
+            exports_total.inc(document_type=snapshot.document_type, result="error")
+            raise
+        finally:
+            self._rendering -= 1
+            self._update_gauges()
+            self._slots.release()
+
+        elapsed = time.monotonic() - started
+        self._average_seconds = 0.8 * self._average_seconds + 0.2 * elapsed
+        render_duration.observe(elapsed, document_type=snapshot.document_type)
+        exports_total.inc(document_type=snapshot.document_type, result="ok")
+        return data
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+
+# Global export pool instance
+export_pool = ExportPool(
+    workers=settings.EXPORT_WORKERS,
+    max_queued=settings.EXPORT_MAX_QUEUED,
+    # Spilled files land next to the cache so adopting them is a rename
+    spool_directory=settings.EXPORT_CACHE_DIR if settings.EXPORT_CACHE_ENABLED else None,
+)
@@ -1,25 +1,70 @@
-import google.generativeai as genai
 import asyncio
+import json
 import time
-from typing import List
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
 from app.core.config import settings
-
-# Configure Gemini API
-genai.configure(api_key=settings.GEMINI_API_KEY)
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_metrics import LLMCallStats, track_llm_call
+from app.services.llm_providers import LLMProvider, LLMResponse, RateLimitError, create_provider
+from app.services.prompt_budget import (
+    CHARS_PER_TOKEN,
+    CONTEXT_EXCERPT_TOKENS,
+    bounded_refines_total,
+    estimate_tokens,
+    pack_windows,
+    split_paragraphs,
+    target_paragraphs,
+    truncate_to_tokens,
+)
+from app.services.rate_limiter import TokenBucketRateLimiter
+from app.services.scheduler import FairScheduler, Priority, ScheduleRequest
+from app.services.single_flight import SingleFlight
 
 
 class GeminiService:
-    def __init__(self):
-        # Use the latest stable Gemini model
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-        self.last_request_time = 0
-        self.min_request_interval = 6.5  # Slightly over 6 seconds to stay under 10 requests/minute
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        # The model backend is chosen by LLM_PROVIDER unless one is passed in
+        self.provider = provider or create_provider()
+        self.model_name = self.provider.model_name
+        # Shared across uvicorn workers so the quota holds for the whole deployment
+        self.rate_limiter = TokenBucketRateLimiter(
+            name=self.provider.name,
+            db_path=settings.LLM_STATE_DB_PATH,
+            max_rpm=settings.GEMINI_RATE_LIMIT_RPM,
+            min_rpm=settings.GEMINI_RATE_LIMIT_MIN_RPM,
+            burst=settings.GEMINI_RATE_LIMIT_BURST,
+            increase_rpm=settings.GEMINI_RATE_LIMIT_INCREASE_RPM,
+            decrease_factor=settings.GEMINI_RATE_LIMIT_DECREASE_FACTOR,
+        )
+        self.max_retries = 3
+        self.batch_size = settings.GENERATE_BATCH_SIZE
+        self.refine_max_tokens = settings.REFINE_PROMPT_MAX_TOKENS
+        self.timeout_seconds = settings.LLM_TIMEOUT_SECONDS
+        self.cache = LLMResponseCache(
+            db_path=settings.LLM_STATE_DB_PATH,
+            max_memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        ) if settings.LLM_CACHE_ENABLED else None
+        # Identical prompts in flight at the same time share one model call
+        self.single_flight = SingleFlight()
+        # Orders waiting calls by priority and shares capacity fairly between users
+        self.scheduler = FairScheduler(
+            quantum=settings.LLM_SCHEDULER_QUANTUM,
+            max_wait_seconds=settings.LLM_SCHEDULER_MAX_WAIT_SECONDS,
+            max_queue_depth=settings.LLM_SCHEDULER_MAX_QUEUE_DEPTH,
+            initial_dispatch_seconds=60.0 / settings.GEMINI_RATE_LIMIT_RPM,
+        )
     
-    async def generate_outline(self, topic: str, document_type: str, num_sections: int = 5) -> List[str]:
+    async def generate_outline(
+        self,
+        topic: str,
+        document_type: str,
+        num_sections: int = 5,
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.GENERATE
+    ) -> List[str]:
         """Generate document outline using Gemini."""
-        # Apply rate limiting
-        await self._rate_limit()
-        
         if document_type == "docx":
             prompt = f"""Generate {num_sections} section headers for a professional document with the title: "{topic}"
 
@@ -45,35 +90,171 @@ Strategic Analysis
 Future Recommendations
 etc."""
         
-        # Run the synchronous API call in a thread pool
-        response = await asyncio.to_thread(self.model.generate_content, prompt)
-        # Remove all ** markdown bold formatting and split into sections
-        content = response.text.strip().replace('**', '')
+        with track_llm_call("outline", document_type) as stats:
+            content = await self._generate(prompt, stats, ScheduleRequest(priority, user_id), use_cache=use_cache)
         sections = [line.strip() for line in content.split('\n') if line.strip()]
         return sections[:num_sections]
     
-    async def _rate_limit(self):
-        """Implement rate limiting to avoid API quota errors."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+    def _prompt_key(self, prompt: str) -> str:
+        return LLMResponseCache.make_key(self.model_name, prompt)
+    
+    async def _generate(
+        self,
+        prompt: str,
+        stats: LLMCallStats,
+        schedule: ScheduleRequest,
+        use_cache: bool = True
+    ) -> str:
+        """Call the model under the shared rate limiter, retrying on quota errors.
+
+        Responses are cached by prompt; ``use_cache=False`` skips the lookup
+        but still stores the fresh response. Concurrent calls with the same
+        prompt are coalesced into a single model call. Timings and token usage
+        are recorded on ``stats``; ``schedule`` places the call in the
+        scheduler's queue. Only calls of the same priority are coalesced, so
+        an interactive call never waits behind a bulk call's queue position.
+        """
+        stats.estimated_prompt_tokens = estimate_tokens(prompt)
+        prompt_key = self._prompt_key(prompt)
+        if self.cache and use_cache:
+            cached = await self.cache.get(prompt_key)
+            if cached is not None:
+                stats.source = "cache"
+                return cached
         
-        if time_since_last_request < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last_request
-            await asyncio.sleep(wait_time)
+        waited = time.monotonic()
+        try:
+            return await self.single_flight.do(
+                (prompt_key, schedule.priority), lambda: self._call_model(prompt, prompt_key, stats, schedule)
+            )
+        finally:
+            # Only the caller that started the shared call made model requests
+            if not stats.attempts:
+                stats.source = "coalesced"
+                stats.queue_wait += time.monotonic() - waited
+    
+    async def _call_model(
+        self,
+        prompt: str,
+        prompt_key: str,
+        stats: LLMCallStats,
+        schedule: ScheduleRequest
+    ) -> str:
+        """Make one rate-limited model call and cache its response."""
+        for attempt in range(self.max_retries):
+            stats.attempts += 1
+            await self._acquire(stats, schedule, retry=attempt > 0)
+            called = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self.provider.generate(prompt), timeout=self.timeout_seconds
+                )
+            except RateLimitError:
+                # Shrinking the shared rate drains the bucket, so the next
+                # acquire() already waits out the backoff for every worker.
+                await self.rate_limiter.on_throttled()
+                if attempt < self.max_retries - 1:
+                    continue
+                raise
+            finally:
+                stats.model_latency += time.monotonic() - called
+            stats.add_usage(response.prompt_tokens, response.response_tokens)
+            await self.rate_limiter.on_success()
+            # Remove all ** markdown bold formatting
+            content = response.text.strip().replace('**', '')
+            if self.cache and content:
+                await self.cache.set(prompt_key, content)
+            return content
+    
+    async def _acquire(self, stats: LLMCallStats, schedule: ScheduleRequest, retry: bool = False):
+        """Wait for the call's turn in the scheduler, then for a rate limiter token.
+
+        Retries are already admitted, so they are never rejected as over budget.
+        """
+        if retry and schedule.enforce_budget:
+            schedule = ScheduleRequest(schedule.priority, schedule.user_id, schedule.cost, enforce_budget=False)
+        async with self.scheduler.slot(schedule) as waited:
+            stats.queue_wait += waited
+            stats.rate_limit_delay += await self.rate_limiter.acquire()
+    
+    async def _stream(
+        self,
+        prompt: str,
+        stats: LLMCallStats,
+        schedule: ScheduleRequest,
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from the model under the shared rate limiter.
+
+        Quota errors are retried only until the first chunk arrives; after
+        that the caller has already seen partial output. A cached response is
+        sent as a single delta. Model latency on ``stats`` counts only time
+        spent waiting for chunks, not time the consumer takes between them.
+        """
+        stats.estimated_prompt_tokens = estimate_tokens(prompt)
+        cache_key = self._prompt_key(prompt) if self.cache else None
+        if cache_key and use_cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                stats.source = "cache"
+                yield cached
+                return
+        
+        async def next_chunk():
+            called = time.monotonic()
+            try:
+                return await asyncio.wait_for(anext(chunks, None), timeout=self.timeout_seconds)
+            finally:
+                stats.model_latency += time.monotonic() - called
         
-        self.last_request_time = time.time()
+        usage = LLMResponse(text="")
+        for attempt in range(self.max_retries):
+            stats.attempts += 1
+            await self._acquire(stats, schedule, retry=attempt > 0)
+            chunks = self.provider.stream(prompt, usage=usage)
+            try:
+                chunk = await next_chunk()
+            except RateLimitError:
+                await self.rate_limiter.on_throttled()
+                if attempt < self.max_retries - 1:
+                    continue
+                raise
+            break
+        await self.rate_limiter.on_success()
+        
+        # Hold back trailing '*' so a '**' split across chunks is still removed
+        pending = ""
+        started = False
+        deltas = []
+        while chunk is not None:
+            pending += chunk
+            held = len(pending) - len(pending.rstrip('*'))
+            text, pending = pending[:len(pending) - held], pending[len(pending) - held:]
+            delta = text.replace('**', '')
+            if not started:
+                delta = delta.lstrip()
+            if delta:
+                started = True
+                deltas.append(delta)
+                yield delta
+            chunk = await next_chunk()
+        stats.add_usage(usage.prompt_tokens, usage.response_tokens)
+        if pending.replace('**', ''):
+            deltas.append(pending.replace('**', ''))
+            yield deltas[-1]
+        
+        content = "".join(deltas).strip()
+        if cache_key and content:
+            await self.cache.set(cache_key, content)
     
-    async def generate_section_content(
-        self, 
-        topic: str, 
-        section_title: str, 
+    @staticmethod
+    def _section_prompt(
+        topic: str,
+        section_title: str,
         document_type: str,
         project_context: str = ""
     ) -> str:
-        """Generate content for a specific section."""
-        # Apply rate limiting
-        await self._rate_limit()
-        
+        """Build the prompt for generating a single section."""
         if document_type == "docx":
             prompt = f"""Write detailed, professional content for the following section of a document titled "{topic}":
 
@@ -100,35 +281,198 @@ Provide:
 
 Format as bullet points with • symbol.
 Do not include the slide title in your response."""
-        
-        # Run the synchronous API call in a thread pool with retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = await asyncio.to_thread(self.model.generate_content, prompt)
-                # Remove all ** markdown bold formatting
-                content = response.text.strip()
-                content = content.replace('**', '')
-                return content
-            except Exception as e:
-                if "ResourceExhausted" in str(type(e)) or "429" in str(e):
-                    if attempt < max_retries - 1:
-                        wait_time = 20 * (attempt + 1)  # Exponential backoff
-                        await asyncio.sleep(wait_time)
-                        continue
-                raise
+        return prompt
     
-    async def refine_content(
+    async def generate_section_content(
         self, 
-        original_content: str, 
-        refinement_prompt: str,
-        section_title: str
+        topic: str, 
+        section_title: str, 
+        document_type: str,
+        project_context: str = "",
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.GENERATE
     ) -> str:
-        """Refine existing content based on user prompt."""
-        # Apply rate limiting
-        await self._rate_limit()
+        """Generate content for a specific section."""
+        prompt = self._section_prompt(topic, section_title, document_type, project_context)
+        with track_llm_call("section", document_type) as stats:
+            return await self._generate(prompt, stats, ScheduleRequest(priority, user_id), use_cache=use_cache)
+    
+    async def stream_section_content(
+        self,
+        topic: str,
+        section_title: str,
+        document_type: str,
+        project_context: str = "",
+        use_cache: bool = True,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.GENERATE
+    ) -> AsyncIterator[str]:
+        """Stream content for a specific section as text deltas."""
+        prompt = self._section_prompt(topic, section_title, document_type, project_context)
+        with track_llm_call("section", document_type) as stats:
+            async for delta in self._stream(prompt, stats, ScheduleRequest(priority, user_id), use_cache=use_cache):
+                yield delta
+    
+    @staticmethod
+    def _batch_prompt(
+        topic: str,
+        section_titles: List[str],
+        document_type: str,
+        project_context: str = ""
+    ) -> str:
+        """Build one prompt asking for several sections as a JSON object."""
+        numbered_titles = "\n".join(
+            f"{index}. {title}" for index, title in enumerate(section_titles, start=1)
+        )
+        if document_type == "docx":
+            unit = "section"
+            intro = f'Write detailed, professional content for each of the following sections of a document titled "{topic}":'
+            context = f"Document context: {project_context}" if project_context else ""
+            instructions = """For each section write 2-3 well-structured paragraphs with clear, informative content.
+Use professional language and ensure the content is comprehensive and relevant.
+Separate paragraphs with a blank line."""
+        else:  # pptx
+            unit = "slide"
+            intro = f'Create content for each of the following PowerPoint slides in a presentation titled "{topic}":'
+            context = f"Presentation context: {project_context}" if project_context else ""
+            instructions = """For each slide provide 3-5 concise, impactful bullet points in professional presentation language.
+Put each bullet point on its own line, starting with the • symbol."""
+        
+        return f"""{intro}
+
+{numbered_titles}
+
+{context}
+
+{instructions}
+Focus on how each {unit} supports the title: "{topic}"
+Do not include the {unit} title in its content.
+
+Return ONLY a JSON object of the form {{"sections": [{{"index": <number>, "content": "<text>"}}]}} with one entry per {unit}, using the numbers above. Do not wrap the JSON in markdown."""
+    
+    @staticmethod
+    def _parse_batch(text: str, count: int, key: str = "sections") -> Dict[int, str]:
+        """Map zero-based position to content for every valid entry of a batched response."""
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            return {}
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return {}
+        entries = data.get(key) if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            return {}
         
-        prompt = f"""You are refining content for a section titled "{section_title}".
+        parsed = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index, content = entry.get("index"), entry.get("content")
+            if isinstance(index, int) and 1 <= index <= count and isinstance(content, str) and content.strip():
+                parsed[index - 1] = content.strip()
+        return parsed
+    
+    async def generate_sections(
+        self,
+        topic: str,
+        section_titles: List[str],
+        document_type: str,
+        project_context: str = "",
+        use_cache: bool = True,
+        max_concurrency: int = 1,
+        on_result: Optional[Callable[[int, Union[str, Exception]], None]] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.BULK
+    ) -> List[Union[str, Exception]]:
+        """Generate several sections with one model call per batch.
+
+        Titles are sent ``batch_size`` at a time in a single JSON-returning
+        prompt. Sections missing or malformed in a batched response fall back
+        to an individual call. Returns one entry per title: the content, or
+        the exception that section failed with. ``on_result(index, outcome)``
+        is called as each section settles.
+
+        The whole request is admitted by the scheduler up front, so it raises
+        ``SchedulerOverloadedError`` before doing any work rather than failing
+        sections part-way through.
+        """
+        self.scheduler.check_budget(priority)
+        results: List[Union[str, Exception, None]] = [None] * len(section_titles)
+        
+        def settle(index: int, outcome: Union[str, Exception]):
+            results[index] = outcome
+            if on_result:
+                on_result(index, outcome)
+        
+        def section_prompt(index: int) -> str:
+            return self._section_prompt(topic, section_titles[index], document_type, project_context)
+        
+        # Sections already cached on their own need no model call
+        pending = []
+        for index in range(len(section_titles)):
+            if self.cache and use_cache:
+                cached = await self.cache.get(self._prompt_key(section_prompt(index)))
+                if cached is not None:
+                    with track_llm_call("section", document_type) as stats:
+                        stats.source = "cache"
+                    settle(index, cached)
+                    continue
+            pending.append(index)
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate_queued(operation: str, prompt: str, cost: int) -> str:
+            schedule = ScheduleRequest(priority, user_id, cost=cost, enforce_budget=False)
+            with track_llm_call(operation, document_type) as stats:
+                waited = time.monotonic()
+                async with semaphore:
+                    stats.queue_wait += time.monotonic() - waited
+                    return await self._generate(prompt, stats, schedule, use_cache=use_cache)
+        
+        async def generate_one(index: int):
+            try:
+                settle(index, await generate_queued("section", section_prompt(index), cost=1))
+            except Exception as e:
+                settle(index, e)
+        
+        async def generate_batch(indices: List[int]):
+            parsed = {}
+            if len(indices) > 1:
+                prompt = self._batch_prompt(
+                    topic, [section_titles[index] for index in indices], document_type, project_context
+                )
+                try:
+                    # A batch uses as much of the user's fair share as its sections would
+                    text = await generate_queued("section_batch", prompt, cost=len(indices))
+                except Exception as e:
+                    for index in indices:
+                        settle(index, e)
+                    return
+                parsed = self._parse_batch(text, len(indices))
+            
+            for position, index in enumerate(indices):
+                if position in parsed:
+                    # Later single-section requests for the same prompt hit the cache
+                    if self.cache:
+                        await self.cache.set(self._prompt_key(section_prompt(index)), parsed[position])
+                    settle(index, parsed[position])
+            
+            await asyncio.gather(*(
+                generate_one(index)
+                for position, index in enumerate(indices)
+                if position not in parsed
+            ))
+        
+        batches = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+        await asyncio.gather(*(generate_batch(batch) for batch in batches))
+        return results
+    
+    @staticmethod
+    def _refine_prompt(original_content: str, refinement_prompt: str, section_title: str) -> str:
+        """Build the prompt for refining existing content."""
+        return f"""You are refining content for a section titled "{section_title}".
 
 Current content:
 {original_content}
@@ -137,13 +481,149 @@ User's refinement request: {refinement_prompt}
 
 Provide the refined content based on the user's request. Maintain professional quality and relevance to the section.
 Return ONLY the refined content, without any preamble or explanation."""
+    
+    @staticmethod
+    def _paragraph_refine_prompt(
+        section_title: str,
+        refinement_prompt: str,
+        paragraphs: Dict[int, str],
+        total: int,
+        before: str = "",
+        after: str = ""
+    ) -> str:
+        """Build the prompt for refining some of a section's paragraphs."""
+        numbered = "\n\n".join(f"{index + 1}. {text}" for index, text in paragraphs.items())
+        context_before = f"Text just before these paragraphs (do not rewrite):\n{before}\n\n" if before else ""
+        context_after = f"\n\nText just after these paragraphs (do not rewrite):\n{after}" if after else ""
+        return f"""You are refining part of the content for a section titled "{section_title}". The section has {total} paragraphs; the ones below are numbered by their position in it.
+
+{context_before}Paragraphs to refine:
+{numbered}{context_after}
+
+User's refinement request: {refinement_prompt}
+
+Apply the request to these paragraphs, keeping them consistent with the surrounding text. Return a paragraph unchanged if the request does not concern it. Maintain professional quality and relevance to the section.
+Return ONLY a JSON object of the form {{"paragraphs": [{{"index": <number>, "content": "<text>"}}]}} with one entry per paragraph above, using its number. Do not wrap the JSON in markdown."""
+    
+    async def _refine_paragraphs(
+        self,
+        original_content: str,
+        refinement_prompt: str,
+        section_title: str,
+        document_type: Optional[str],
+        use_cache: bool,
+        schedule: ScheduleRequest
+    ) -> Optional[str]:
+        """Refine content too long for one prompt and splice the edited paragraphs back.
+
+        A request naming paragraphs sends only those; any other request
+        walks the section in windows that fit ``refine_max_tokens``.
+        A window whose response is malformed or misses paragraphs is
+        refined again with the plain refine prompt. Returns None if the
+        content cannot be split into paragraphs.
+        """
+        paragraphs, separator = split_paragraphs(original_content)
+        if len(paragraphs) < 2:
+            return None
+        
+        targets = target_paragraphs(paragraphs, refinement_prompt)
+        bounded_refines_total.inc(strategy="targeted" if targets else "windowed")
+        # Size the windows as if both neighbouring excerpts were full length
+        excerpt = "x" * CONTEXT_EXCERPT_TOKENS * CHARS_PER_TOKEN
+        overhead = estimate_tokens(self._paragraph_refine_prompt(
+            section_title, refinement_prompt, {}, len(paragraphs), before=excerpt, after=excerpt
+        ))
+        windows = pack_windows(
+            targets or range(len(paragraphs)), paragraphs, self.refine_max_tokens - overhead
+        )
         
-        # Run the synchronous API call in a thread pool
-        response = await asyncio.to_thread(self.model.generate_content, prompt)
-        # Remove all ** markdown bold formatting
-        content = response.text.strip()
-        content = content.replace('**', '')
-        return content
+        # Admit the whole refinement up front, like generate_sections
+        self.scheduler.check_budget(schedule.priority)
+        schedule = ScheduleRequest(schedule.priority, schedule.user_id, enforce_budget=False)
+        refined: List[Optional[str]] = list(paragraphs)
+        
+        async def refine_window(window: List[int]):
+            first, last = window[0], window[-1]
+            prompt = self._paragraph_refine_prompt(
+                section_title,
+                refinement_prompt,
+                {index: paragraphs[index] for index in window},
+                len(paragraphs),
+                before=truncate_to_tokens(paragraphs[first - 1], CONTEXT_EXCERPT_TOKENS, from_end=True) if first > 0 else "",
+                after=truncate_to_tokens(paragraphs[last + 1], CONTEXT_EXCERPT_TOKENS) if last + 1 < len(paragraphs) else ""
+            )
+            with track_llm_call("refine_paragraphs", document_type) as stats:
+                text = await self._generate(prompt, stats, schedule, use_cache=use_cache)
+            parsed = self._parse_batch(text, len(paragraphs), key="paragraphs")
+            if all(index in parsed for index in window):
+                for index in window:
+                    refined[index] = parsed[index]
+                return
+            
+            # Refine the window as plain text instead; it fits the budget on its own
+            window_prompt = self._refine_prompt(
+                separator.join(paragraphs[index] for index in window), refinement_prompt, section_title
+            )
+            with track_llm_call("refine", document_type) as stats:
+                refined[first] = await self._generate(window_prompt, stats, schedule, use_cache=use_cache)
+            for index in window[1:]:
+                refined[index] = None
+        
+        await asyncio.gather(*(refine_window(window) for window in windows))
+        return separator.join(paragraph for paragraph in refined if paragraph is not None)
+    
+    async def refine_content(
+        self, 
+        original_content: str, 
+        refinement_prompt: str,
+        section_title: str,
+        use_cache: bool = True,
+        document_type: Optional[str] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> str:
+        """Refine existing content based on user prompt.
+
+        Content that would push the prompt past ``refine_max_tokens`` is
+        refined paragraph by paragraph instead of being sent whole.
+        """
+        prompt = self._refine_prompt(original_content, refinement_prompt, section_title)
+        schedule = ScheduleRequest(priority, user_id)
+        if estimate_tokens(prompt) > self.refine_max_tokens:
+            refined = await self._refine_paragraphs(
+                original_content, refinement_prompt, section_title, document_type, use_cache, schedule
+            )
+            if refined is not None:
+                return refined
+        with track_llm_call("refine", document_type) as stats:
+            return await self._generate(prompt, stats, schedule, use_cache=use_cache)
+    
+    async def stream_refine_content(
+        self,
+        original_content: str,
+        refinement_prompt: str,
+        section_title: str,
+        use_cache: bool = True,
+        document_type: Optional[str] = None,
+        user_id: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Stream refined content as text deltas.
 
+        Content refined paragraph by paragraph (see ``refine_content``) is
+        sent as a single delta once it has been spliced back together.
+        """
+        prompt = self._refine_prompt(original_content, refinement_prompt, section_title)
+        schedule = ScheduleRequest(priority, user_id)
+        if estimate_tokens(prompt) > self.refine_max_tokens:
+            refined = await self._refine_paragraphs(
+                original_content, refinement_prompt, section_title, document_type, use_cache, schedule
+            )
+            if refined is not None:
+                yield refined
+                return
+        with track_llm_call("refine", document_type) as stats:
+            async for delta in self._stream(prompt, stats, schedule, use_cache=use_cache):
+                yield delta
 
 gemini_service = GeminiService()
@@ -0,0 +1,101 @@
+"""Job handlers that run generation work off the request path."""
+from typing import Any, Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import JobKind
+from app.models.project import Project, Section
+from app.schemas.project import SectionResponse, RefinementResponse
+from app.services.gemini_service import gemini_service
+from app.services.job_queue import job_queue, PermanentJobError
+from app.services.prompt_budget import build_project_context
+from app.services.refinement_history import refinement_history
+from app.services.scheduler import Priority
+from app.services.speculation import promote_draft, discard_drafts
+
+
+async def _get_section(db: AsyncSession, section_id: int) -> Section:
+    section = await db.get(Section, section_id)
+    if section is None:
+        raise PermanentJobError("Section not found")
+    return section
+
+
+@job_queue.register(JobKind.OUTLINE)
+async def run_outline_job(db: AsyncSession, payload: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """Generate a document outline."""
+    sections = await gemini_service.generate_outline(
+        topic=payload["topic"],
+        document_type=payload["document_type"],
+        num_sections=payload["num_sections"],
+        use_cache=not payload["regenerate"],
+        user_id=user_id,
+        priority=Priority.BULK
+    )
+    return {"sections": sections}
+
+
+@job_queue.register(JobKind.GENERATE_SECTION)
+async def run_generate_section_job(db: AsyncSession, payload: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """Generate content for a section and record it as a refinement."""
+    section = await _get_section(db, payload["section_id"])
+    if payload["regenerate"]:
+        await discard_drafts(db, [section.id])
+    elif await promote_draft(db, section):
+        await db.refresh(section)
+        return SectionResponse.model_validate(section).model_dump(mode="json")
+    
+    result = await db.execute(select(Project).where(Project.id == section.project_id))
+    project = result.scalar_one()
+    
+    content = await gemini_service.generate_section_content(
+        topic=project.topic,
+        section_title=section.title,
+        document_type=project.document_type.value,
+        project_context=build_project_context(project.title, project.description),
+        use_cache=not (payload["regenerate"] or section.content),
+        user_id=user_id,
+        priority=Priority.BULK
+    )
+    
+    await refinement_history.record(
+        db,
+        section_id=section.id,
+        prompt="Initial content generation",
+        previous_content=section.content,
+        refined_content=content
+    )
+    section.content = content
+    await db.flush()
+    await db.refresh(section)
+    return SectionResponse.model_validate(section).model_dump(mode="json")
+
+
+@job_queue.register(JobKind.REFINE_SECTION)
+async def run_refine_section_job(db: AsyncSession, payload: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """Refine a section's content and record the refinement."""
+    section = await _get_section(db, payload["section_id"])
+    if not section.content:
+        raise PermanentJobError("Cannot refine section without content. Generate content first.")
+    
+    document_type = await db.scalar(select(Project.document_type).where(Project.id == section.project_id))
+    refined_content = await gemini_service.refine_content(
+        original_content=section.content,
+        refinement_prompt=payload["prompt"],
+        section_title=section.title,
+        document_type=document_type.value,
+        user_id=user_id,
+        priority=Priority.BULK
+    )
+    
+    refinement = await refinement_history.record(
+        db,
+        section_id=section.id,
+        prompt=payload["prompt"],
+        previous_content=section.content,
+        refined_content=refined_content
+    )
+    section.content = refined_content
+    await db.flush()
+    return RefinementResponse.model_validate(refinement).model_dump(mode="json")
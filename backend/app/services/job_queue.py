@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database.session import async_session_maker
+from app.models.job import Job, JobKind, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any], int], Awaitable[Any]]
+
+
+class PermanentJobError(Exception):
+    """A job failure that retrying cannot fix, such as a deleted section."""
+
+
+class JobQueue:
+    """Persisted job queue drained by a pool of in-process async workers.
+
+    Jobs live in the ``jobs`` table, so they survive restarts and can be
+    picked up by any worker process. A worker claims a job with a
+    compare-and-set UPDATE and holds it under a lease, renewed while the
+    job runs; a job whose lease expires (because its worker died) becomes
+    claimable again. A worker that lost its claim discards its result.
+    Failed jobs are retried with exponential backoff until ``max_attempts``.
+
+    Handlers receive a session, the decoded payload and the id of the user
+    who queued the job, and return a JSON-serializable result. They must not commit: their writes are
+    committed together with the job's status so a crash never leaves a
+    half-recorded job.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        max_attempts: int,
+        lease_seconds: float,
+        retry_backoff_seconds: float,
+        poll_interval_seconds: float,
+    ):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._handlers: Dict[JobKind, JobHandler] = {}
+        self._workers = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(self, kind: JobKind):
+        """Decorator registering the coroutine that runs jobs of ``kind``."""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self._handlers[kind] = handler
+            return handler
+        return decorator
+
+    async def enqueue(self, db: AsyncSession, user_id: int, kind: JobKind, payload: Dict[str, Any]) -> Job:
+        """Persist a new job and wake an idle worker."""
+        job = Job(
+            user_id=user_id,
+            kind=kind,
+            payload=json.dumps(payload),
+            max_attempts=self.max_attempts
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def start(self):
+        """Start the worker pool; jobs left over from a previous run are resumed."""
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"job-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """Cancel the workers; a job interrupted here is resumed after its lease expires."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self):
+        while True:
+            try:
+                claim = await self._claim()
+            except Exception:
+                logger.exception("Failed to claim a job")
+                claim = None
+
+            if claim is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(*claim)
+            except Exception:
+                # The job is retried once its lease expires; keep this worker draining the queue
+                logger.exception("Job %s attempt %s failed to run", *claim)
+
+    async def _claim(self) -> Optional[Tuple[int, int]]:
+        """Claim the next runnable job; returns ``(job_id, attempts)`` identifying the claim."""
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+            and_(Job.status == JobStatus.RUNNING, Job.locked_until < now),
+        )
+        async with async_session_maker() as session:
+            job_id = await session.scalar(
+                select(Job.id).where(claimable).order_by(Job.run_after, Job.id).limit(1)
+            )
+            if job_id is None:
+                return None
+            # Only one worker wins the compare-and-set
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id, claimable)
+                .values(
+                    status=JobStatus.RUNNING,
+                    locked_until=now + timedelta(seconds=self.lease_seconds),
+                    attempts=Job.attempts + 1,
+                    updated_at=now
+                )
+            )
+            if result.rowcount != 1:
+                await session.rollback()
+                return None
+            attempts = await session.scalar(select(Job.attempts).where(Job.id == job_id))
+            await session.commit()
+            return job_id, attempts
+
+    @staticmethod
+    def _held(job_id: int, attempts: int):
+        """Condition that the job is still running under the claim with ``attempts``."""
+        return and_(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.attempts == attempts)
+
+    async def _heartbeat(self, job_id: int, attempts: int):
+        """Extend the lease while the handler runs, so slow jobs are not reclaimed."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with async_session_maker() as session:
+                    now = datetime.utcnow()
+                    result = await session.execute(
+                        update(Job)
+                        .where(self._held(job_id, attempts))
+                        .values(locked_until=now + timedelta(seconds=self.lease_seconds), updated_at=now)
+                    )
+                    await session.commit()
+            except Exception:
+                # Try again next beat; the lease only lapses if every renewal fails
+                logger.exception("Failed to renew the lease of job %s", job_id)
+                continue
+            if result.rowcount != 1:
+                logger.warning("Job %s attempt %s lost its lease", job_id, attempts)
+                return
+
+    async def _finish(self, session: AsyncSession, job_id: int, attempts: int, **values) -> bool:
+        """Write the job's outcome and commit the handler's writes, unless the claim was lost.
+
+        If another worker reclaimed the job meanwhile, everything is rolled
+        back so the job is not recorded twice.
+        """
+        result = await session.execute(
+            update(Job)
+            .where(self._held(job_id, attempts))
+            .values(locked_until=None, updated_at=datetime.utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            await session.rollback()
+            logger.warning("Job %s attempt %s lost its claim; discarding its result", job_id, attempts)
+            return False
+        await session.commit()
+        return True
+
+    async def _run(self, job_id: int, attempts: int):
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, attempts))
+        try:
+            async with async_session_maker() as session:
+                job = await session.get(Job, job_id)
+                kind, payload, user_id, max_attempts = job.kind, job.payload, job.user_id, job.max_attempts
+                handler = self._handlers.get(kind)
+                try:
+                    if handler is None:
+                        raise PermanentJobError(f"No handler registered for job kind '{kind.value}'")
+                    if attempts > max_attempts:
+                        raise PermanentJobError("Job exceeded its maximum number of attempts")
+                    result = await handler(session, json.loads(payload), user_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    await session.rollback()
+                    retry = not isinstance(e, PermanentJobError) and attempts < max_attempts
+                    logger.warning("Job %s (%s) attempt %s failed: %s", job_id, kind.value, attempts, e)
+                    if retry:
+                        await self._finish(
+                            session, job_id, attempts,
+                            status=JobStatus.QUEUED,
+                            error=str(e),
+                            run_after=datetime.utcnow() + timedelta(
+                                seconds=self.retry_backoff_seconds * 2 ** (attempts - 1)
+                            )
+                        )
+                    else:
+                        await self._finish(
+                            session, job_id, attempts,
+                            status=JobStatus.FAILED, error=str(e), finished_at=datetime.utcnow()
+                        )
+                    return
+
+                await self._finish(
+                    session, job_id, attempts,
+                    status=JobStatus.SUCCEEDED,
+                    result=json.dumps(result),
+                    error=None,
+                    finished_at=datetime.utcnow()
+                )
+        finally:
+            heartbeat.cancel()
+
+job_queue = JobQueue(
+    concurrency=settings.JOB_WORKERS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS,
+    poll_interval_seconds=settings.JOB_POLL_INTERVAL_SECONDS,
+)
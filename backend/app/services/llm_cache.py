@@ -0,0 +1,126 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.database.local_store import connect_local_store, run_in_local_store
+
+
+class LLMResponseCache:
+    """Two-tier cache of model responses keyed by a content hash.
+
+    Lookups check an in-memory LRU first and fall back to a SQLite table
+    that survives restarts and is shared by every worker. Entries in both
+    tiers expire after ``ttl_seconds``.
+    """
+
+    # Expired rows are purged from disk once every this many writes
+    PURGE_EVERY = 100
+
+    def __init__(self, db_path: str, max_memory_entries: int = 512, ttl_seconds: int = 604800):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._conn = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Hash the model, whitespace-normalized prompt and call parameters."""
+        payload = json.dumps(
+            {"model": model, "prompt": " ".join(prompt.split()), "params": params or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self):
+        if self._conn is None:
+            conn = connect_local_store(self.db_path)
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, created_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] + self.ttl_seconds < time.time():
+            return None
+        return row[0]
+
+    def _disk_set(self, key: str, value: str, purge: bool):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, now),
+            )
+            if purge:
+                conn.execute(
+                    "DELETE FROM llm_response_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+
+    def _disk_count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = (value, time.time() + self.ttl_seconds)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key``, or None on a miss."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+
+        value = await run_in_local_store(self._disk_get, key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    async def set(self, key: str, value: str):
+        """Store a response in both tiers."""
+        self._remember(key, value)
+        self.writes += 1
+        await run_in_local_store(self._disk_set, key, value, self.writes % self.PURGE_EVERY == 0)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes for sizing the cache."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_capacity": self.max_memory_entries,
+            "disk_entries": await run_in_local_store(self._disk_count),
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,117 @@
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from app.services.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("operation", "document_type")
+
+call_duration = metrics_registry.histogram(
+    "llm_call_duration_seconds", "End-to-end time of a GeminiService call", LABELS
+)
+queue_wait = metrics_registry.histogram(
+    "llm_queue_wait_seconds", "Time spent waiting on an identical in-flight call, a concurrency slot or the scheduler", LABELS
+)
+rate_limit_delay = metrics_registry.histogram(
+    "llm_rate_limit_delay_seconds", "Time spent waiting for rate limiter tokens, including 429 backoff", LABELS
+)
+model_latency = metrics_registry.histogram(
+    "llm_model_latency_seconds", "Time spent inside provider calls", LABELS
+)
+calls_total = metrics_registry.counter(
+    "llm_calls_total", "GeminiService calls by how they were served and how they ended", LABELS + ("source", "status")
+)
+model_requests_total = metrics_registry.counter(
+    "llm_model_requests_total", "Requests sent to the model provider, including retries", LABELS
+)
+retries_total = metrics_registry.counter(
+    "llm_retries_total", "Model requests retried after a quota error", LABELS
+)
+prompt_tokens_total = metrics_registry.counter(
+    "llm_prompt_tokens_total", "Prompt tokens reported by the provider", LABELS
+)
+response_tokens_total = metrics_registry.counter(
+    "llm_response_tokens_total", "Response tokens reported by the provider", LABELS
+)
+prompt_size = metrics_registry.histogram(
+    "llm_prompt_estimated_tokens", "Estimated size of prompts sent to the model", LABELS,
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+)
+
+
+@dataclass
+class LLMCallStats:
+    """Timings and usage collected over one GeminiService call."""
+    operation: str
+    document_type: str
+    started: float = field(default_factory=time.monotonic)
+    source: str = "model"  # model, cache or coalesced
+    queue_wait: float = 0.0
+    rate_limit_delay: float = 0.0
+    model_latency: float = 0.0
+    attempts: int = 0
+    prompt_tokens: Optional[int] = None
+    response_tokens: Optional[int] = None
+    estimated_prompt_tokens: Optional[int] = None
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+    def add_usage(self, prompt_tokens: Optional[int], response_tokens: Optional[int]):
+        if prompt_tokens is not None:
+            self.prompt_tokens = (self.prompt_tokens or 0) + prompt_tokens
+        if response_tokens is not None:
+            self.response_tokens = (self.response_tokens or 0) + response_tokens
+
+
+def _record(stats: LLMCallStats, status: str):
+    labels = {"operation": stats.operation, "document_type": stats.document_type}
+    duration = time.monotonic() - stats.started
+
+    call_duration.observe(duration, **labels)
+    calls_total.inc(source=stats.source, status=status, **labels)
+    if stats.source != "cache":
+        queue_wait.observe(stats.queue_wait, **labels)
+    if stats.attempts:
+        rate_limit_delay.observe(stats.rate_limit_delay, **labels)
+        model_latency.observe(stats.model_latency, **labels)
+        model_requests_total.inc(stats.attempts, **labels)
+        if stats.estimated_prompt_tokens is not None:
+            prompt_size.observe(stats.estimated_prompt_tokens, **labels)
+    if stats.retries:
+        retries_total.inc(stats.retries, **labels)
+    if stats.prompt_tokens:
+        prompt_tokens_total.inc(stats.prompt_tokens, **labels)
+    if stats.response_tokens:
+        response_tokens_total.inc(stats.response_tokens, **labels)
+
+    logger.info(
+        "llm call operation=%s document_type=%s source=%s status=%s total=%.3fs queue_wait=%.3fs "
+        "rate_limit_delay=%.3fs model_latency=%.3fs retries=%d prompt_tokens=%s response_tokens=%s",
+        stats.operation, stats.document_type, stats.source, status, duration, stats.queue_wait,
+        stats.rate_limit_delay, stats.model_latency, stats.retries, stats.prompt_tokens, stats.response_tokens,
+    )
+
+
+@contextmanager
+def track_llm_call(operation: str, document_type: Optional[str] = None) -> Iterator[LLMCallStats]:
+    """Collect stats for one call and publish them when the block exits."""
+    # Accept DocumentType members as well as their string values
+    document_type = getattr(document_type, "value", document_type)
+    stats = LLMCallStats(operation=operation, document_type=document_type or "unknown")
+    try:
+        yield stats
+    except Exception:
+        _record(stats, "error")
+        raise
+    except BaseException:
+        # Cancelled tasks and streams abandoned by their consumer
+        _record(stats, "cancelled")
+        raise
+    else:
+        _record(stats, "ok")
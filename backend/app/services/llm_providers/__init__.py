@@ -0,0 +1,55 @@
+"""Pluggable LLM providers used by GeminiService."""
+from app.core.config import settings
+from app.services.llm_providers.base import LLMProvider, LLMResponse, RateLimitError
+from app.services.llm_providers.fake import FakeProvider
+from app.services.llm_providers.gemini import GeminiProvider
+from app.services.llm_providers.replay import RecordReplayProvider, RecordingNotFoundError
+
+
+def create_provider() -> LLMProvider:
+    """Build the provider selected by ``LLM_PROVIDER``."""
+    provider = settings.LLM_PROVIDER
+    if provider == "gemini":
+        return GeminiProvider(
+            api_key=settings.GEMINI_API_KEY,
+            model_name=settings.LLM_MODEL,
+            timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+        )
+    if provider == "fake":
+        return FakeProvider(
+            latency_seconds=settings.FAKE_LLM_LATENCY_SECONDS,
+            chunk_size=settings.FAKE_LLM_CHUNK_SIZE,
+            chunk_delay_seconds=settings.FAKE_LLM_CHUNK_DELAY_SECONDS,
+            rate_limit_error_rate=settings.FAKE_LLM_RATE_LIMIT_ERROR_RATE,
+            timeout_error_rate=settings.FAKE_LLM_TIMEOUT_ERROR_RATE,
+            timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+            seed=settings.FAKE_LLM_SEED,
+        )
+    if provider in ("record", "replay"):
+        inner = None
+        if provider == "record":
+            inner = GeminiProvider(
+                api_key=settings.GEMINI_API_KEY,
+                model_name=settings.LLM_MODEL,
+                timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+            )
+        return RecordReplayProvider(
+            directory=settings.LLM_RECORDINGS_DIR,
+            mode=provider,
+            inner=inner,
+            model_name=settings.LLM_MODEL,
+            realtime=settings.LLM_REPLAY_REALTIME,
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER '{provider}'")
+
+
+__all__ = [
+    "LLMProvider",
+    "LLMResponse",
+    "RateLimitError",
+    "FakeProvider",
+    "GeminiProvider",
+    "RecordReplayProvider",
+    "RecordingNotFoundError",
+    "create_provider",
+]
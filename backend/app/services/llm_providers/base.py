@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+
+@dataclass
+class LLMResponse:
+    """Text returned by a provider plus token usage when the provider reports it."""
+    text: str
+    prompt_tokens: Optional[int] = None
+    response_tokens: Optional[int] = None
+
+
+class RateLimitError(Exception):
+    """The provider rejected a call because the quota was exhausted (HTTP 429)."""
+
+
+class LLMProvider(ABC):
+    """Interface GeminiService uses to reach a text generation model.
+
+    ``generate`` returns the full response; ``stream`` yields raw text chunks
+    as they arrive and, when given a ``usage`` response, fills in its token
+    counts once the stream ends. Providers raise ``RateLimitError`` for quota errors so the
+    service can back off the shared rate limiter regardless of backend.
+    A provider that does not implement both cannot be instantiated.
+    """
+
+    name: str = "llm"
+    model_name: str = ""
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> LLMResponse:
+        """Return the model's full response to ``prompt``."""
+
+    @abstractmethod
+    def stream(self, prompt: str, usage: Optional[LLMResponse] = None) -> AsyncIterator[str]:
+        """Yield the model's response to ``prompt`` as text chunks."""
@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import AsyncIterator, Optional
+
+from app.services.llm_providers.base import LLMProvider, LLMResponse, RateLimitError
+
+
+class FakeProvider(LLMProvider):
+    """Offline stand-in that returns deterministic text for each prompt.
+
+    Latency, streaming chunk size and error injection (429s and timeouts) are
+    configurable, so generation paths can be load-tested and benchmarked
+    without an API key or quota.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_seconds: float = 1.0,
+        chunk_size: int = 20,
+        chunk_delay_seconds: float = 0.05,
+        rate_limit_error_rate: float = 0.0,
+        timeout_error_rate: float = 0.0,
+        timeout_seconds: float = 30.0,
+        seed: Optional[int] = None,
+    ):
+        self.model_name = "fake-llm"
+        self.latency_seconds = latency_seconds
+        self.chunk_size = max(chunk_size, 1)
+        self.chunk_delay_seconds = chunk_delay_seconds
+        self.rate_limit_error_rate = rate_limit_error_rate
+        self.timeout_error_rate = timeout_error_rate
+        self.timeout_seconds = timeout_seconds
+        self._random = random.Random(seed)
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        """Deterministic response text for a prompt.
+
+        Batched section prompts and paragraph refinements (which ask for a
+        ``{"sections": ...}`` or ``{"paragraphs": ...}`` JSON object over a
+        numbered list) get a JSON answer with one entry per numbered item.
+        """
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        lines = [
+            f"• Point {index + 1} ({digest[index * 6:index * 6 + 6]}) expands on the requested topic"
+            for index in range(5)
+        ]
+        key = next((key for key in ("sections", "paragraphs") if f'{{"{key}"' in prompt), None)
+        if key is None:
+            return "\n".join(lines)
+        
+        items = re.findall(r"^(\d+)\. (.+)$", prompt, flags=re.MULTILINE)
+        if key == "paragraphs":
+            # Refined paragraphs keep their length so refine chains stay stable
+            return json.dumps({
+                key: [{"index": int(number), "content": f"{text} ({digest[:6]})"} for number, text in items]
+            })
+        return json.dumps({
+            key: [
+                {"index": int(number), "content": "\n".join(f"{line} ({title})" for line in lines[:3])}
+                for number, title in items
+            ]
+        })
+
+    async def _inject_errors(self):
+        roll = self._random.random()
+        if roll < self.rate_limit_error_rate:
+            raise RateLimitError("429 Resource has been exhausted (injected by fake provider)")
+        if roll < self.rate_limit_error_rate + self.timeout_error_rate:
+            await asyncio.sleep(self.timeout_seconds)
+            raise TimeoutError("Fake provider timed out (injected)")
+
+    async def generate(self, prompt: str) -> LLMResponse:
+        await self._inject_errors()
+        await asyncio.sleep(self.latency_seconds)
+        text = self.respond(prompt)
+        return LLMResponse(
+            text=text,
+            prompt_tokens=len(prompt) // 4,
+            response_tokens=len(text) // 4,
+        )
+
+    async def stream(self, prompt: str, usage: Optional[LLMResponse] = None) -> AsyncIterator[str]:
+        await self._inject_errors()
+        await asyncio.sleep(self.latency_seconds)
+        text = self.respond(prompt)
+        for start in range(0, len(text), self.chunk_size):
+            if start:
+                await asyncio.sleep(self.chunk_delay_seconds)
+            yield text[start:start + self.chunk_size]
+        if usage is not None:
+            usage.prompt_tokens = len(prompt) // 4
+            usage.response_tokens = len(text) // 4
@@ -0,0 +1,64 @@
+from typing import AsyncIterator, Optional
+
+from app.services.llm_providers.base import LLMProvider, LLMResponse, RateLimitError
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Return True if the error is a Gemini quota (HTTP 429) error."""
+    return "ResourceExhausted" in str(type(error)) or "429" in str(error)
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through the google-generativeai SDK's native async API."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str, timeout_seconds: Optional[float] = None):
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY must be set to use the Gemini provider")
+        # Imported here so other providers work without the SDK configured
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        # Also bound the underlying gRPC call so it is torn down server-side
+        self.request_options = {"timeout": timeout_seconds} if timeout_seconds else {}
+
+    async def generate(self, prompt: str) -> LLMResponse:
+        try:
+            response = await self.model.generate_content_async(
+                prompt, request_options=self.request_options
+            )
+            text = response.text
+        except Exception as e:
+            if is_rate_limit_error(e):
+                raise RateLimitError(str(e)) from e
+            raise
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=text,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            response_tokens=getattr(usage, "candidates_token_count", None),
+        )
+
+    async def stream(self, prompt: str, usage: Optional[LLMResponse] = None) -> AsyncIterator[str]:
+        try:
+            response = await self.model.generate_content_async(
+                prompt, stream=True, request_options=self.request_options
+            )
+            chunks = response.__aiter__()
+            chunk = await anext(chunks, None)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                raise RateLimitError(str(e)) from e
+            raise
+        last_chunk = None
+        while chunk is not None:
+            yield chunk.text
+            last_chunk, chunk = chunk, await anext(chunks, None)
+        # The final chunk carries usage for the whole response
+        metadata = getattr(last_chunk, "usage_metadata", None)
+        if usage is not None and metadata is not None:
+            usage.prompt_tokens = getattr(metadata, "prompt_token_count", None)
+            usage.response_tokens = getattr(metadata, "candidates_token_count", None)
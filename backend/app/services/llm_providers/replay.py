@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from app.services.llm_providers.base import LLMProvider, LLMResponse
+
+
+class RecordingNotFoundError(LookupError):
+    """No recorded response exists for a prompt in replay mode."""
+
+
+class RecordReplayProvider(LLMProvider):
+    """Capture another provider's responses to disk and serve them back.
+
+    In ``record`` mode every call goes to ``inner`` and the response (with its
+    stream chunks, token usage and latency) is written to one JSON file per
+    prompt. In ``replay`` mode responses come only from those files, either
+    immediately or, with ``realtime=True``, after the recorded latency.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        directory: str,
+        mode: str = "replay",
+        inner: Optional[LLMProvider] = None,
+        model_name: str = "",
+        realtime: bool = False,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown record/replay mode '{mode}'")
+        if mode == "record" and inner is None:
+            raise ValueError("Record mode needs a provider to record from")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.inner = inner
+        self.model_name = inner.model_name if inner else model_name
+        self.realtime = realtime
+
+    def _path(self, prompt: str) -> Path:
+        key = hashlib.sha256(f"{self.model_name}\n{prompt}".encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json"
+
+    def _load(self, prompt: str) -> dict:
+        path = self._path(prompt)
+        if not path.exists():
+            raise RecordingNotFoundError(f"No recorded response for prompt (expected {path.name})")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _save(self, prompt: str, recording: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        recording = {"model": self.model_name, "prompt": prompt, **recording}
+        self._path(prompt).write_text(json.dumps(recording, indent=2), encoding="utf-8")
+
+    async def generate(self, prompt: str) -> LLMResponse:
+        if self.mode == "replay":
+            recording = await asyncio.to_thread(self._load, prompt)
+            if self.realtime:
+                await asyncio.sleep(recording.get("latency_seconds", 0.0))
+            return LLMResponse(
+                text=recording["text"],
+                prompt_tokens=recording.get("prompt_tokens"),
+                response_tokens=recording.get("response_tokens"),
+            )
+
+        started = time.monotonic()
+        response = await self.inner.generate(prompt)
+        await asyncio.to_thread(self._save, prompt, {
+            "text": response.text,
+            "chunks": [response.text],
+            "prompt_tokens": response.prompt_tokens,
+            "response_tokens": response.response_tokens,
+            "latency_seconds": time.monotonic() - started,
+        })
+        return response
+
+    async def stream(self, prompt: str, usage: Optional[LLMResponse] = None) -> AsyncIterator[str]:
+        if self.mode == "replay":
+            recording = await asyncio.to_thread(self._load, prompt)
+            chunks = recording.get("chunks") or [recording["text"]]
+            delay = recording.get("latency_seconds", 0.0) / len(chunks) if self.realtime else 0.0
+            for chunk in chunks:
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk
+            if usage is not None:
+                usage.prompt_tokens = recording.get("prompt_tokens")
+                usage.response_tokens = recording.get("response_tokens")
+            return
+
+        started = time.monotonic()
+        chunks = []
+        recorded_usage = LLMResponse(text="")
+        async for chunk in self.inner.stream(prompt, usage=recorded_usage):
+            chunks.append(chunk)
+            yield chunk
+        if usage is not None:
+            usage.prompt_tokens = recorded_usage.prompt_tokens
+            usage.response_tokens = recorded_usage.response_tokens
+        await asyncio.to_thread(self._save, prompt, {
+            "text": "".join(chunks),
+            "chunks": chunks,
+            "prompt_tokens": recorded_usage.prompt_tokens,
+            "response_tokens": recorded_usage.response_tokens,
+            "latency_seconds": time.monotonic() - started,
+        })
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import random
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional
+
+from app.core.config import settings
+from app.database.local_store import connect_local_store, run_in_local_store
+from app.services.metrics import metrics_registry
+
+lookups_total = metrics_registry.counter(
+    "outline_reuse_lookups_total", "Outline requests checked against the similarity index", ("result",)
+)
+
+# Words that name the deliverable rather than its subject
+_FILLER_WORDS = frozenset({
+    "a", "an", "the", "of", "for", "on", "about", "and", "to", "in",
+    "deck", "presentation", "slides", "slide", "ppt", "pptx",
+    "document", "doc", "docx", "report", "writeup", "overview",
+})
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+@dataclass
+class OutlineMatch:
+    """A previously generated outline similar enough to reuse."""
+    topic: str
+    sections: List[str]
+    similarity: float
+
+
+class OutlineSimilarityIndex:
+    """MinHash/LSH index of generated outlines keyed by their normalized topic.
+
+    Topics are lowercased, stripped of punctuation and filler words like
+    "deck" or "report", and broken into character shingles. Each outline's
+    MinHash signature is split into ``bands`` buckets stored in SQLite, so a
+    lookup only compares topics sharing at least one bucket; candidates are
+    then checked by exact Jaccard similarity of their shingles against
+    ``threshold``. Lookups are scoped to the requesting user unless
+    ``share_across_users`` is set.
+    """
+
+    # Expired rows are purged from disk once every this many writes
+    PURGE_EVERY = 100
+    SHINGLE_SIZE = 3
+
+    def __init__(
+        self,
+        db_path: str,
+        threshold: float = 0.8,
+        share_across_users: bool = False,
+        ttl_seconds: int = 604800,
+        bands: int = 16,
+        rows: int = 4,
+    ):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.share_across_users = share_across_users
+        self.ttl_seconds = ttl_seconds
+        self.bands = bands
+        self.rows = rows
+        # Fixed seed so signatures stay comparable across restarts and workers
+        generator = random.Random(0x0C3A)
+        self._permutations = [
+            (generator.randrange(1, _MERSENNE_PRIME), generator.randrange(0, _MERSENNE_PRIME))
+            for _ in range(bands * rows)
+        ]
+        self._conn = None
+        self._lock = threading.Lock()
+        self.writes = 0
+
+    @staticmethod
+    def normalize(topic: str) -> str:
+        words = re.findall(r"[a-z0-9]+", topic.lower())
+        kept = [word for word in words if word not in _FILLER_WORDS]
+        return " ".join(kept or words)
+
+    def shingles(self, normalized: str) -> FrozenSet[str]:
+        size = self.SHINGLE_SIZE
+        if len(normalized) <= size:
+            return frozenset({normalized})
+        return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+    def signature(self, shingles: FrozenSet[str]) -> List[int]:
+        hashes = [
+            struct.unpack("<Q", hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest())[0]
+            for shingle in shingles
+        ]
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._permutations]
+
+    def _buckets(self, signature: List[int]) -> List[str]:
+        rows = self.rows
+        return [
+            hashlib.blake2b(
+                json.dumps(signature[band * rows:(band + 1) * rows]).encode("utf-8"), digest_size=8
+            ).hexdigest()
+            for band in range(self.bands)
+        ]
+
+    def _connection(self):
+        if self._conn is None:
+            conn = connect_local_store(self.db_path)
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS outline_index (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    document_type TEXT NOT NULL,
+                    num_sections INTEGER NOT NULL,
+                    topic TEXT NOT NULL,
+                    normalized TEXT NOT NULL,
+                    sections TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS outline_lsh (
+                    band INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    outline_id INTEGER NOT NULL REFERENCES outline_index (id) ON DELETE CASCADE
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_outline_lsh_bucket ON outline_lsh (band, bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_outline_lsh_outline ON outline_lsh (outline_id)")
+            self._conn = conn
+        return self._conn
+
+    def _disk_find(
+        self, normalized: str, buckets: List[str], document_type: str, num_sections: int, user_id: Optional[int]
+    ) -> Optional[OutlineMatch]:
+        placeholders = " OR ".join("(l.band = ? AND l.bucket = ?)" for _ in buckets)
+        params: list = [value for pair in enumerate(buckets) for value in pair]
+        params += [document_type, num_sections, time.time() - self.ttl_seconds]
+        query = f"""SELECT DISTINCT o.topic, o.normalized, o.sections FROM outline_lsh l
+            JOIN outline_index o ON o.id = l.outline_id
+            WHERE ({placeholders}) AND o.document_type = ? AND o.num_sections = ? AND o.created_at >= ?"""
+        if not self.share_across_users:
+            query += " AND o.user_id IS ?"
+            params.append(user_id)
+        with self._lock:
+            rows = self._connection().execute(query, params).fetchall()
+
+        shingles = self.shingles(normalized)
+        best = None
+        for topic, candidate, sections in rows:
+            other = self.shingles(candidate)
+            similarity = len(shingles & other) / len(shingles | other)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = OutlineMatch(topic=topic, sections=json.loads(sections), similarity=similarity)
+        return best
+
+    def _disk_add(
+        self,
+        topic: str,
+        normalized: str,
+        buckets: List[str],
+        document_type: str,
+        num_sections: int,
+        sections: List[str],
+        user_id: Optional[int],
+        purge: bool,
+    ):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # The latest outline for a topic replaces older ones for the same user
+                conn.execute(
+                    "DELETE FROM outline_lsh WHERE outline_id IN (SELECT id FROM outline_index "
+                    "WHERE normalized = ? AND document_type = ? AND num_sections = ? AND user_id IS ?)",
+                    (normalized, document_type, num_sections, user_id),
+                )
+                conn.execute(
+                    "DELETE FROM outline_index WHERE normalized = ? AND document_type = ? "
+                    "AND num_sections = ? AND user_id IS ?",
+                    (normalized, document_type, num_sections, user_id),
+                )
+                outline_id = conn.execute(
+                    "INSERT INTO outline_index (user_id, document_type, num_sections, topic, normalized, sections, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, document_type, num_sections, topic, normalized, json.dumps(sections), now),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO outline_lsh (band, bucket, outline_id) VALUES (?, ?, ?)",
+                    [(band, bucket, outline_id) for band, bucket in enumerate(buckets)],
+                )
+                if purge:
+                    expired = now - self.ttl_seconds
+                    conn.execute(
+                        "DELETE FROM outline_lsh WHERE outline_id IN (SELECT id FROM outline_index WHERE created_at < ?)",
+                        (expired,),
+                    )
+                    conn.execute("DELETE FROM outline_index WHERE created_at < ?", (expired,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    async def find(
+        self, topic: str, document_type: str, num_sections: int, user_id: Optional[int] = None
+    ) -> Optional[OutlineMatch]:
+        """Return the most similar stored outline at or above ``threshold``, if any."""
+        normalized = self.normalize(topic)
+        buckets = self._buckets(self.signature(self.shingles(normalized)))
+        match = await run_in_local_store(
+            self._disk_find, normalized, buckets, document_type, num_sections, user_id
+        )
+        lookups_total.inc(result="hit" if match else "miss")
+        return match
+
+    async def add(
+        self, topic: str, document_type: str, num_sections: int, sections: List[str], user_id: Optional[int] = None
+    ):
+        """Index a freshly generated outline."""
+        normalized = self.normalize(topic)
+        buckets = self._buckets(self.signature(self.shingles(normalized)))
+        self.writes += 1
+        await run_in_local_store(
+            self._disk_add, topic, normalized, buckets, document_type, num_sections, sections, user_id,
+            self.writes % self.PURGE_EVERY == 0,
+        )
+
+
+# Global outline index instance
+outline_index = OutlineSimilarityIndex(
+    db_path=settings.LLM_STATE_DB_PATH,
+    threshold=settings.OUTLINE_REUSE_SIMILARITY,
+    share_across_users=settings.OUTLINE_REUSE_ACROSS_USERS,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+)
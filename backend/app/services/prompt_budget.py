@@ -0,0 +1,126 @@
+"""Token estimates and size limits for model prompts."""
+import math
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.metrics import metrics_registry
+
+# Gemini tokenizers average roughly four characters of English per token
+CHARS_PER_TOKEN = 4
+# Neighbouring text shown around paragraphs being refined
+CONTEXT_EXCERPT_TOKENS = 80
+
+bounded_refines_total = metrics_registry.counter(
+    "llm_bounded_refines_total",
+    "Refinements sent as paragraph edits because the whole section exceeded the prompt budget",
+    ("strategy",),
+)
+
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+}
+_UNIT = r"(?:paragraph|para|bullet(?:\s+point)?|point|item)"
+# "paragraph 2", "paragraphs 2 and 3", "bullets 1-3" (but not "paragraph 2 sentences long")
+_NUMBERED = re.compile(
+    rf"\b{_UNIT}s?\s*(?:#|no\.?\s*|number\s+)?(\d+(?:\s*(?:,|and|&|-|to)\s*\d+)*)\b(?!\s*(?:sentence|word|line)s?\b)",
+    re.IGNORECASE,
+)
+# "second paragraph", "3rd bullet", "last paragraph"
+_ORDINAL = re.compile(
+    rf"\b({'|'.join(_ORDINALS)}|\d+(?:st|nd|rd|th)|last|final|opening|introductory|closing|concluding)\s+{_UNIT}\b",
+    re.IGNORECASE,
+)
+# Quoted passages the user wants changed
+_QUOTED = re.compile(r"[\"“]([^\"“”]{12,})[\"”]|(?<!\w)'([^']{12,})'(?!\w)")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, provider-independent token estimate for budgeting."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, from_end: bool = False) -> str:
+    """Shorten ``text`` to about ``max_tokens`` at a word boundary, marking the cut."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    if from_end:
+        kept = text[-max_chars:]
+        return "…" + kept[kept.find(" ") + 1:] if " " in kept else "…" + kept
+    kept = text[:max_chars]
+    return (kept.rsplit(" ", 1)[0] if " " in kept else kept) + "…"
+
+
+@lru_cache(maxsize=256)
+def build_project_context(title: str, description: Optional[str]) -> str:
+    """Project context shared by every prompt for a project, capped to its budget."""
+    return truncate_to_tokens(
+        f"Project: {title}. {description or ''}", settings.PROMPT_PROJECT_CONTEXT_MAX_TOKENS
+    )
+
+
+def split_paragraphs(content: str) -> Tuple[List[str], str]:
+    """Split content into paragraphs and the separator that joins them back.
+
+    Blank lines separate document paragraphs; slide content without blank
+    lines is split into its bullet lines.
+    """
+    paragraphs = [part.strip() for part in re.split(r"\n\s*\n", content.strip()) if part.strip()]
+    if len(paragraphs) == 1:
+        lines = [line.strip() for line in paragraphs[0].splitlines() if line.strip()]
+        if len(lines) > 1:
+            return lines, "\n"
+    return paragraphs, "\n\n"
+
+
+def target_paragraphs(paragraphs: List[str], instruction: str) -> Optional[List[int]]:
+    """Zero-based indices of the paragraphs a refinement request refers to.
+
+    Recognises numbered and ordinal references ("paragraph 2", "the last
+    bullet") and quoted passages. Returns None when the request names no
+    paragraph and so applies to the whole section.
+    """
+    count = len(paragraphs)
+    targets = set()
+
+    for match in _NUMBERED.finditer(instruction):
+        for start, end in re.findall(r"(\d+)(?:\s*(?:-|to)\s*(\d+))?", match.group(1)):
+            first = int(start)
+            targets.update(range(first, int(end or first) + 1))
+    for match in _ORDINAL.finditer(instruction):
+        word = match.group(1).lower()
+        if word in ("last", "final", "closing", "concluding"):
+            targets.add(count)
+        elif word in ("opening", "introductory"):
+            targets.add(1)
+        else:
+            targets.add(_ORDINALS.get(word) or int(word[:-2]))
+    indices = {number - 1 for number in targets if 1 <= number <= count}
+
+    for quotes in _QUOTED.findall(instruction):
+        needle = "".join(quotes).strip().casefold()
+        indices.update(index for index, paragraph in enumerate(paragraphs) if needle in paragraph.casefold())
+
+    return sorted(indices) or None
+
+
+def pack_windows(indices: Iterable[int], paragraphs: List[str], max_tokens: int) -> List[List[int]]:
+    """Group paragraph indices into contiguous runs of at most ``max_tokens``.
+
+    A single paragraph larger than the budget gets a window of its own.
+    """
+    windows: List[List[int]] = []
+    size = 0
+    for index in sorted(indices):
+        # Allow for the paragraph's number and separator in the prompt
+        tokens = estimate_tokens(paragraphs[index]) + 2
+        if windows and windows[-1][-1] == index - 1 and size + tokens <= max_tokens:
+            windows[-1].append(index)
+            size += tokens
+        else:
+            windows.append([index])
+            size = tokens
+    return windows
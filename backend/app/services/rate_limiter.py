@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from app.database.local_store import connect_local_store, run_in_local_store
+
+
+class TokenBucketRateLimiter:
+    """Token bucket shared by every worker process through a local SQLite file.
+
+    The bucket state (available tokens, current refill rate and last refill
+    time) lives in a single row that is updated inside an IMMEDIATE
+    transaction, so concurrent coroutines and uvicorn workers never hand out
+    the same token twice.
+
+    The refill rate follows AIMD: it is multiplied by ``decrease_factor`` when
+    the API answers with a 429 and grows back by ``increase_rpm`` after each
+    successful call, up to ``max_rpm``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        db_path: str,
+        max_rpm: float,
+        min_rpm: float = 1.0,
+        burst: int = 1,
+        increase_rpm: float = 0.5,
+        decrease_factor: float = 0.5,
+    ):
+        self.name = name
+        self.db_path = db_path
+        self.max_rpm = max_rpm
+        self.min_rpm = min(min_rpm, max_rpm)
+        self.capacity = float(max(burst, 1))
+        self.increase_rpm = increase_rpm
+        self.decrease_factor = decrease_factor
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            conn = connect_local_store(self.db_path)
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS token_buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    rate REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    throttled_at REAL NOT NULL DEFAULT 0
+                )"""
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO token_buckets (name, tokens, rate, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (self.name, self.capacity, self.max_rpm, time.time()),
+            )
+            self._conn = conn
+        return self._conn
+
+    def _update(self, apply) -> float:
+        """Run ``apply`` on the refilled bucket state inside a write transaction.
+
+        ``apply`` receives ``(tokens, rate, throttled_at, now)`` and returns the
+        new ``(tokens, rate, throttled_at)`` plus a value handed back to the
+        caller.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, rate, updated_at, throttled_at = conn.execute(
+                    "SELECT tokens, rate, updated_at, throttled_at FROM token_buckets WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+                now = time.time()
+                rate = min(max(rate, self.min_rpm), self.max_rpm)
+                elapsed = max(now - updated_at, 0.0)
+                tokens = min(self.capacity, tokens + elapsed * rate / 60.0)
+
+                tokens, rate, throttled_at, result = apply(tokens, rate, throttled_at, now)
+
+                conn.execute(
+                    "UPDATE token_buckets SET tokens = ?, rate = ?, updated_at = ?, throttled_at = ? "
+                    "WHERE name = ?",
+                    (tokens, rate, now, throttled_at, self.name),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def _try_take(self) -> float:
+        """Take a token if one is available, otherwise return seconds to wait."""
+        def apply(tokens, rate, throttled_at, now):
+            if tokens >= 1.0:
+                return tokens - 1.0, rate, throttled_at, 0.0
+            return tokens, rate, throttled_at, (1.0 - tokens) * 60.0 / rate
+
+        return self._update(apply)
+
+    def _record_success(self) -> float:
+        def apply(tokens, rate, throttled_at, now):
+            new_rate = min(self.max_rpm, rate + self.increase_rpm)
+            return tokens, new_rate, throttled_at, new_rate
+
+        return self._update(apply)
+
+    def _record_throttled(self) -> float:
+        def apply(tokens, rate, throttled_at, now):
+            # A burst of calls that were already in flight tends to fail
+            # together; only the first 429 per refill interval shrinks the rate.
+            if now - throttled_at < 60.0 / rate:
+                return min(tokens, 0.0), rate, throttled_at, rate
+            new_rate = max(self.min_rpm, rate * self.decrease_factor)
+            return 0.0, new_rate, now, new_rate
+
+        return self._update(apply)
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """Wait until a token is available and take it.
+
+        Returns the number of seconds spent waiting. Raises ``TimeoutError``
+        if ``timeout`` elapses first.
+        """
+        started = time.monotonic()
+        while True:
+            wait = await run_in_local_store(self._try_take)
+            waited = time.monotonic() - started
+            if wait <= 0:
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"Rate limiter '{self.name}' could not grant a token in time")
+            await asyncio.sleep(wait)
+
+    async def on_success(self) -> float:
+        """Additively grow the refill rate after a successful call."""
+        return await run_in_local_store(self._record_success)
+
+    async def on_throttled(self) -> float:
+        """Multiplicatively shrink the refill rate and drain the bucket after a 429."""
+        return await run_in_local_store(self._record_throttled)
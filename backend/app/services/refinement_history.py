@@ -0,0 +1,310 @@
+"""Compact storage for section refinement history."""
+import difflib
+import json
+import logging
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.project import Refinement
+from app.services.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+_ZLIB = b"z"
+_RAW = b"n"
+# Words with their leading whitespace, so joining the tokens restores the text exactly
+_TOKENS = re.compile(r"\s*\S+|\s+")
+# Cached versions rebuilt only as a base, whose previous text is not known yet
+_UNKNOWN = object()
+
+rebuilds_total = metrics_registry.counter(
+    "refinement_history_rebuilds_total", "Refinement texts materialized from history", ("result",)
+)
+
+
+def _pack(payload: bytes, compression: str) -> bytes:
+    if compression == "zlib":
+        return _ZLIB + zlib.compress(payload, 6)
+    return _RAW + payload
+
+
+def _unpack(blob: bytes) -> bytes:
+    return zlib.decompress(blob[1:]) if blob[:1] == _ZLIB else blob[1:]
+
+
+def encode_delta(base: str, text: str) -> List[object]:
+    """Edit script turning ``base`` into ``text``, diffed word by word.
+
+    ``[start, end]`` copies ``base[start:end]``; a string is inserted.
+    Offsets are in characters so applying a delta is plain slicing.
+    """
+    base_tokens = _TOKENS.findall(base)
+    tokens = _TOKENS.findall(text)
+    offsets = list(accumulate((len(token) for token in base_tokens), initial=0))
+    ops: List[object] = []
+    matcher = difflib.SequenceMatcher(None, base_tokens, tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([offsets[i1], offsets[i2]])
+        elif j2 > j1:
+            inserted = "".join(tokens[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += inserted
+            else:
+                ops.append(inserted)
+    return ops
+
+
+def apply_delta(base: str, ops: Iterable[object]) -> str:
+    return "".join(op if isinstance(op, str) else base[op[0]:op[1]] for op in ops)
+
+
+class RefinementHistory:
+    """Store refinement texts as periodic snapshots plus compressed deltas.
+
+    A refinement's text is saved as a delta against the latest earlier
+    refinement of the same section (its ``base_id``), and the text it
+    replaced as a delta against that same base, which it usually equals.
+    Every ``snapshot_interval`` versions, or whenever the delta would not be
+    smaller, the full text is stored instead, so rebuilding any version
+    applies at most ``snapshot_interval - 1`` deltas. Drafts are always
+    snapshots since they are not part of the history yet. Rebuilt texts are
+    kept in an LRU of ``cache_entries`` versions.
+
+    Texts are only rebuilt by ``materialize``, which fills the refinement's
+    ``refined_content`` and ``previous_content``; reading them before that
+    raises ``RefinementTextsNotLoaded``.
+    """
+
+    def __init__(self, snapshot_interval: int = 10, cache_entries: int = 256, compression: str = "zlib"):
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.cache_entries = cache_entries
+        self.compression = compression
+        # (id, created_at) -> [refined text, previous text or _UNKNOWN]
+        self._cache: "OrderedDict[Tuple[int, object], list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(refinement: Refinement) -> Tuple[int, object]:
+        # created_at guards against a rolled-back id being reused for another row
+        return refinement.id, refinement.created_at
+
+    def _cached(self, refinement: Refinement) -> Optional[list]:
+        key = self._key(refinement)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _remember(self, refinement: Refinement, refined: str, previous: object = _UNKNOWN):
+        if self.cache_entries <= 0:
+            return
+        key = self._key(refinement)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._cache[key] = [refined, previous]
+            elif previous is not _UNKNOWN:
+                entry[1] = previous
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def encode(
+        self, base_text: Optional[str], base_depth: int, previous: Optional[str], refined: str
+    ) -> Tuple[str, int, bytes, Optional[bytes]]:
+        """Return ``(storage, delta_depth, refined_data, previous_data)`` for a version."""
+        snapshot = _pack(refined.encode("utf-8"), self.compression)
+        storage, depth, refined_data = SNAPSHOT, 0, snapshot
+        if base_text is not None and base_depth + 1 < self.snapshot_interval:
+            delta = _pack(json.dumps(encode_delta(base_text, refined)).encode("utf-8"), self.compression)
+            if len(delta) < len(snapshot):
+                storage, depth, refined_data = DELTA, base_depth + 1, delta
+
+        previous_data = None
+        if previous is not None:
+            reference = base_text if base_text is not None else refined
+            previous_data = _pack(json.dumps(encode_delta(reference, previous)).encode("utf-8"), self.compression)
+        return storage, depth, refined_data, previous_data
+
+    async def _text(self, db: AsyncSession, refinement: Refinement) -> str:
+        """Rebuild the refined text of a stored refinement."""
+        if refinement.storage is None:
+            return refinement.legacy_refined_content
+        entry = self._cached(refinement)
+        if entry is not None:
+            return entry[0]
+
+        # Walk back to a snapshot or cached version, then replay the deltas
+        chain = []
+        current = refinement
+        while current.storage == DELTA:
+            chain.append(current)
+            current = await db.get(Refinement, current.base_id)
+            entry = self._cached(current)
+            if entry is not None:
+                break
+        if entry is not None:
+            text = entry[0]
+        else:
+            text = (
+                current.legacy_refined_content if current.storage is None
+                else _unpack(current.refined_data).decode("utf-8")
+            )
+            self._remember(current, text)
+        for version in reversed(chain):
+            text = apply_delta(text, json.loads(_unpack(version.refined_data)))
+            self._remember(version, text)
+        return text
+
+    async def materialize(self, db: AsyncSession, refinements: Iterable[Refinement]):
+        """Fill ``refined_content`` and ``previous_content`` on each refinement."""
+        for refinement in refinements:
+            if refinement.texts_loaded:
+                continue
+            entry = self._cached(refinement) if refinement.storage is not None else None
+            if entry is not None and entry[1] is not _UNKNOWN:
+                rebuilds_total.inc(result="cached")
+                refinement.set_texts(*entry)
+                continue
+
+            rebuilds_total.inc(result="rebuilt")
+            refined = await self._text(db, refinement)
+            previous = refinement.legacy_previous_content
+            if refinement.storage is not None:
+                if refinement.previous_data is not None:
+                    if refinement.base_id is not None:
+                        reference = await self._text(db, await db.get(Refinement, refinement.base_id))
+                    else:
+                        reference = refined
+                    previous = apply_delta(reference, json.loads(_unpack(refinement.previous_data)))
+                self._remember(refinement, refined, previous)
+            refinement.set_texts(refined, previous)
+
+    async def _latest(self, db: AsyncSession, section_id: int) -> Optional[Refinement]:
+        result = await db.execute(
+            select(Refinement)
+            .where(Refinement.section_id == section_id, Refinement.is_draft.is_(False))
+            .order_by(Refinement.created_at.desc(), Refinement.id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def record(
+        self,
+        db: AsyncSession,
+        section_id: int,
+        prompt: str,
+        previous_content: Optional[str],
+        refined_content: str,
+        is_draft: bool = False,
+    ) -> Refinement:
+        """Add a refinement to the session with its texts encoded. The caller commits."""
+        base = None if is_draft else await self._latest(db, section_id)
+        base_text = await self._text(db, base) if base is not None else None
+        storage, depth, refined_data, previous_data = self.encode(
+            base_text, base.delta_depth if base is not None else 0, previous_content, refined_content
+        )
+        refinement = Refinement(
+            section_id=section_id,
+            prompt=prompt,
+            is_draft=is_draft,
+            storage=storage,
+            base_id=base.id if base is not None else None,
+            delta_depth=depth,
+            refined_data=refined_data,
+            previous_data=previous_data,
+        )
+        db.add(refinement)
+        await db.flush()
+        refinement.set_texts(refined_content, previous_content)
+        self._remember(refinement, refined_content, previous_content)
+        return refinement
+
+    async def migrate_legacy_rows(self, session_maker, batch_sections: int = 50) -> int:
+        """Re-encode refinements that still hold plain text, one section at a time.
+
+        Safe to run from several workers at once: encoding is deterministic
+        and each row is only updated while it is still in the legacy format.
+        Returns the number of rows converted.
+        """
+        converted = 0
+        while True:
+            async with session_maker() as session:
+                section_ids = (await session.scalars(
+                    select(Refinement.section_id)
+                    .where(Refinement.storage.is_(None))
+                    .distinct()
+                    .limit(batch_sections)
+                )).all()
+                if not section_ids:
+                    break
+                for section_id in section_ids:
+                    converted += await self._migrate_section(session, section_id)
+                await session.commit()
+        if converted:
+            logger.info("Compressed %d refinement history rows", converted)
+        return converted
+
+    async def _migrate_section(self, session: AsyncSession, section_id: int) -> int:
+        rows = (await session.scalars(
+            select(Refinement)
+            .where(Refinement.section_id == section_id)
+            .order_by(Refinement.created_at, Refinement.id)
+        )).all()
+        await self.materialize(session, rows)
+
+        converted = 0
+        # (id, text, delta_depth) of the version the next refinement builds on
+        base: Optional[Tuple[int, str, int]] = None
+        for row in rows:
+            if row.storage is not None:
+                if not row.is_draft:
+                    base = (row.id, row.refined_content, row.delta_depth)
+                continue
+            chained = None if row.is_draft else base
+            storage, depth, refined_data, previous_data = self.encode(
+                chained[1] if chained else None, chained[2] if chained else 0, row.previous_content, row.refined_content
+            )
+            result = await session.execute(
+                update(Refinement)
+                .where(Refinement.id == row.id, Refinement.storage.is_(None))
+                .values(
+                    storage=storage,
+                    base_id=chained[0] if chained else None,
+                    delta_depth=depth,
+                    refined_data=refined_data,
+                    previous_data=previous_data,
+                    legacy_refined_content="",
+                    legacy_previous_content=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            converted += result.rowcount
+            if not row.is_draft:
+                base = (row.id, row.refined_content, depth)
+        return converted
+
+
+# Global refinement history instance
+refinement_history = RefinementHistory(
+    snapshot_interval=settings.REFINEMENT_SNAPSHOT_INTERVAL,
+    cache_entries=settings.REFINEMENT_HISTORY_CACHE_ENTRIES,
+    compression=settings.REFINEMENT_HISTORY_COMPRESSION,
+)
@@ -0,0 +1,218 @@
+import asyncio
+import enum
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from app.services.metrics import metrics_registry
+
+queue_depth = metrics_registry.gauge(
+    "llm_scheduler_queue_depth", "Model calls waiting for the scheduler", ("priority",)
+)
+queue_wait = metrics_registry.histogram(
+    "llm_scheduler_wait_seconds", "Time model calls waited for the scheduler", ("priority",)
+)
+rejected_total = metrics_registry.counter(
+    "llm_scheduler_rejected_total", "Model calls rejected because the queue was over budget", ("priority",)
+)
+
+
+class Priority(enum.IntEnum):
+    """Scheduling classes; lower values are served first."""
+    INTERACTIVE = 0  # refining content the user is looking at
+    GENERATE = 1  # a single section or outline
+    BULK = 2  # generate-all, drafts, background jobs and speculation
+
+
+@dataclass
+class ScheduleRequest:
+    """Who a model call is for and how it should be queued."""
+    priority: Priority = Priority.GENERATE
+    user_id: Optional[int] = None
+    # Share of the user's turn the call uses, e.g. the number of sections in a batch
+    cost: float = 1.0
+    # Reject with SchedulerOverloadedError instead of queueing past the budget
+    enforce_budget: bool = True
+
+
+class SchedulerOverloadedError(Exception):
+    """The model call queue is over budget; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Too many model calls are queued; retry in {self.retry_after}s")
+
+
+class _Waiter:
+    __slots__ = ("future", "user", "cost")
+
+    def __init__(self, future: asyncio.Future, user: str, cost: float):
+        self.future = future
+        self.user = user
+        self.cost = cost
+
+
+class _FairQueue:
+    """Per-user FIFO queues served by deficit round-robin.
+
+    The user at the head of the rotation is served while their deficit covers
+    the cost of their next call; then they move to the back and earn another
+    ``quantum``. A user with many or expensive queued calls therefore cannot
+    starve users with a single cheap one.
+    """
+
+    def __init__(self, quantum: float):
+        self.quantum = quantum
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._deficits: Dict[str, float] = {}
+        self._order: Deque[str] = deque()
+        self.depth = 0
+
+    def push(self, waiter: _Waiter):
+        queue = self._queues.get(waiter.user)
+        if queue is None:
+            queue = self._queues[waiter.user] = deque()
+            self._deficits[waiter.user] = self.quantum
+            self._order.append(waiter.user)
+        queue.append(waiter)
+        self.depth += 1
+
+    def remove(self, waiter: _Waiter):
+        queue = self._queues.get(waiter.user)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.depth -= 1
+            if not queue:
+                self._drop(waiter.user)
+
+    def pop(self) -> Optional[_Waiter]:
+        while self._order:
+            user = self._order[0]
+            queue = self._queues[user]
+            waiter = queue[0]
+            if self._deficits[user] >= waiter.cost:
+                self._deficits[user] -= waiter.cost
+                queue.popleft()
+                self.depth -= 1
+                if not queue:
+                    self._drop(user)
+                return waiter
+            self._deficits[user] += self.quantum
+            self._order.rotate(-1)
+        return None
+
+    def _drop(self, user: str):
+        # An idle user does not bank credit for later
+        del self._queues[user]
+        del self._deficits[user]
+        self._order.remove(user)
+
+
+class FairScheduler:
+    """Decide which waiting model call goes next.
+
+    Calls hold one of ``slots`` while they wait for a rate limiter token, so
+    the scheduler, not arrival order, decides who gets each token. Higher
+    priority classes are always served first; within a class users share
+    capacity by deficit round-robin.
+
+    A call is rejected with ``SchedulerOverloadedError`` when the queue holds
+    ``max_queue_depth`` calls or its estimated wait exceeds
+    ``max_wait_seconds``. The estimate uses a moving average of how long each
+    call held its slot.
+    """
+
+    # Weight of the latest slot hold time in the moving average
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        slots: int = 1,
+        quantum: float = 1.0,
+        max_wait_seconds: float = 120.0,
+        max_queue_depth: int = 200,
+        initial_dispatch_seconds: float = 1.0,
+    ):
+        self.slots = slots
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queue_depth = max_queue_depth
+        self._queues = {priority: _FairQueue(quantum) for priority in Priority}
+        self._free = slots
+        self._dispatch_seconds = initial_dispatch_seconds
+
+    def queue_depth(self, priority: Optional[Priority] = None) -> int:
+        if priority is None:
+            return sum(queue.depth for queue in self._queues.values())
+        return self._queues[priority].depth
+
+    def estimate_wait(self, priority: Priority) -> float:
+        """Seconds a new call of ``priority`` can expect to wait for its slot."""
+        ahead = sum(self._queues[p].depth for p in Priority if p <= priority)
+        if self._free and not ahead:
+            return 0.0
+        return (ahead + 1) * self._dispatch_seconds / self.slots
+
+    def check_budget(self, priority: Priority):
+        """Raise ``SchedulerOverloadedError`` if a call of ``priority`` should not be queued."""
+        wait = self.estimate_wait(priority)
+        if self.queue_depth() >= self.max_queue_depth or wait > self.max_wait_seconds:
+            rejected_total.inc(priority=priority.name.lower())
+            raise SchedulerOverloadedError(retry_after=wait)
+
+    @asynccontextmanager
+    async def slot(self, request: ScheduleRequest) -> AsyncIterator[float]:
+        """Wait for this call's turn and hold a slot; yields the seconds waited."""
+        if request.enforce_budget:
+            self.check_budget(request.priority)
+
+        started = time.monotonic()
+        if self._free and not self.queue_depth():
+            self._free -= 1
+        else:
+            queue = self._queues[request.priority]
+            user = str(request.user_id) if request.user_id is not None else "anonymous"
+            waiter = _Waiter(asyncio.get_running_loop().create_future(), user, request.cost)
+            queue.push(waiter)
+            self._update_gauges()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.cancelled():
+                    queue.remove(waiter)
+                    self._update_gauges()
+                else:
+                    # Granted a slot just as we were cancelled; hand it on
+                    self._release()
+                raise
+
+        waited = time.monotonic() - started
+        queue_wait.observe(waited, priority=request.priority.name.lower())
+        held = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self._dispatch_seconds += self.SMOOTHING * (time.monotonic() - held - self._dispatch_seconds)
+            self._release()
+
+    def _release(self):
+        self._free += 1
+        while self._free:
+            waiter = None
+            for priority in Priority:
+                waiter = self._queues[priority].pop()
+                if waiter is not None:
+                    break
+            if waiter is None:
+                break
+            if waiter.future.done():
+                continue
+            self._free -= 1
+            waiter.future.set_result(None)
+        self._update_gauges()
+
+    def _update_gauges(self):
+        for priority, queue in self._queues.items():
+            queue_depth.set(queue.depth, priority=priority.name.lower())
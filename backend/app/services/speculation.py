@@ -0,0 +1,179 @@
+"""Speculative background generation of section content."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.database.session import async_session_maker
+from app.models.project import Project, Section, Refinement
+from app.services.gemini_service import gemini_service
+from app.services.prompt_budget import build_project_context
+from app.services.refinement_history import refinement_history
+from app.services.scheduler import SchedulerOverloadedError
+
+logger = logging.getLogger(__name__)
+
+
+async def promote_draft(db: AsyncSession, section: Section) -> Optional[Refinement]:
+    """Make the latest draft of an empty section its content.
+
+    Returns the promoted refinement, or None if the section already has
+    content or no draft exists. The caller commits.
+    """
+    if section.content:
+        return None
+    result = await db.execute(
+        select(Refinement)
+        .where(Refinement.section_id == section.id, Refinement.is_draft.is_(True))
+        .order_by(Refinement.created_at.desc(), Refinement.id.desc())
+        .limit(1)
+    )
+    draft = result.scalar_one_or_none()
+    if draft is None:
+        return None
+
+    await refinement_history.materialize(db, [draft])
+    draft.is_draft = False
+    draft.created_at = datetime.utcnow()
+    section.content = draft.refined_content
+    await db.flush()
+    await discard_drafts(db, [section.id])
+    return draft
+
+
+async def discard_drafts(db: AsyncSession, section_ids: Iterable[int]):
+    """Delete unpromoted drafts for the given sections. The caller commits."""
+    section_ids = list(section_ids)
+    if section_ids:
+        await db.execute(
+            delete(Refinement)
+            .where(Refinement.section_id.in_(section_ids), Refinement.is_draft.is_(True))
+        )
+
+
+class SpeculativeGenerator:
+    """Pre-generate content for a new project's empty sections in the background.
+
+    Runs one task per project using batched model calls in the scheduler's
+    bulk class, so it only spends capacity interactive calls are not waiting
+    for, and skips the project if the queue is already over budget.
+    Results are stored as draft refinements that ``promote_draft`` turns into
+    section content when the user asks to generate.
+    """
+
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = concurrency
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def start(self, project_id: int):
+        """Start (or restart) speculation for a project if it is enabled."""
+        if not settings.SPECULATIVE_GENERATION_ENABLED:
+            return
+        self.cancel(project_id)
+        task = asyncio.create_task(self._run(project_id))
+        self._tasks[project_id] = task
+        task.add_done_callback(lambda done: self._forget(project_id, done))
+
+    def cancel(self, project_id: int) -> bool:
+        """Cancel a project's speculation. Returns True if it was running."""
+        task = self._tasks.pop(project_id, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    def restart(self, project_id: int):
+        """Cancel a project's running speculation and start it over with current titles."""
+        if self.cancel(project_id):
+            self.start(project_id)
+
+    async def stop(self):
+        """Cancel all speculation and wait for it to finish."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget(self, project_id: int, task: asyncio.Task):
+        if self._tasks.get(project_id) is task:
+            del self._tasks[project_id]
+
+    @property
+    def running(self) -> int:
+        return len(self._tasks)
+
+    async def _run(self, project_id: int):
+        try:
+            async with async_session_maker() as session:
+                result = await session.execute(
+                    select(Project)
+                    .options(selectinload(Project.sections))
+                    .where(Project.id == project_id)
+                )
+                project = result.scalar_one_or_none()
+                if project is None:
+                    return
+                drafted = set((await session.execute(
+                    select(Refinement.section_id)
+                    .join(Section)
+                    .where(Section.project_id == project_id, Refinement.is_draft.is_(True))
+                )).scalars())
+                sections = [
+                    section for section in sorted(project.sections, key=lambda x: x.order)
+                    if not section.content and section.id not in drafted
+                ]
+                if not sections:
+                    return
+                titles = {section.id: section.title for section in sections}
+                user_id = project.user_id
+                topic = project.topic
+                document_type = project.document_type.value
+                project_context = build_project_context(project.title, project.description)
+
+            outcomes = await gemini_service.generate_sections(
+                topic=topic,
+                section_titles=list(titles.values()),
+                document_type=document_type,
+                project_context=project_context,
+                max_concurrency=self.concurrency,
+                user_id=user_id
+            )
+
+            async with async_session_maker() as session:
+                result = await session.execute(select(Section).where(Section.id.in_(titles)))
+                current = {section.id: section for section in result.scalars()}
+                for section_id, outcome in zip(titles, outcomes):
+                    section = current.get(section_id)
+                    # Skip sections deleted, renamed or generated while we were running
+                    if (
+                        isinstance(outcome, Exception)
+                        or section is None
+                        or section.content
+                        or section.title != titles[section_id]
+                    ):
+                        continue
+                    await refinement_history.record(
+                        session,
+                        section_id=section_id,
+                        prompt="Initial content generation",
+                        previous_content=None,
+                        refined_content=outcome,
+                        is_draft=True
+                    )
+                await session.commit()
+        except asyncio.CancelledError:
+            raise
+        except SchedulerOverloadedError:
+            logger.info("Skipped speculative generation for project %s: model queue is busy", project_id)
+        except Exception:
+            logger.exception("Speculative generation failed for project %s", project_id)
+
+
+# Global speculative generator instance
+speculative_generator = SpeculativeGenerator(concurrency=settings.SPECULATIVE_GENERATION_CONCURRENCY)
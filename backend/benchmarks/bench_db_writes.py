@@ -0,0 +1,155 @@
+"""Measure database write throughput under concurrent refine and feedback load.
+
+Each worker repeatedly records a refinement (read the section, insert a
+refinement, update the section's content) or sets feedback on the latest
+refinement, while readers list refinement history. Runs against fresh
+SQLite files with the previous engine setup (rollback journal, a new
+connection per session) and with the engine profile from
+``app.database.session``, or against ``--database-url`` (e.g. PostgreSQL)
+with the profile only.
+
+    python -m benchmarks.bench_db_writes --workers 16 --ops 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.database.session import Base, create_db_engine  # noqa: E402
+from app.models.project import DocumentType, Project, Refinement, Section  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.refinement_history import refinement_history  # noqa: E402
+
+CONTENT = "Quarterly results paragraph with enough text to resemble generated content. " * 25
+
+
+async def seed(session_maker, sections: int):
+    async with session_maker() as session:
+        user = User(email="bench@example.com", username="bench", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        project = Project(
+            user_id=user.id, title="Benchmark", document_type=DocumentType.DOCX, topic="Benchmark"
+        )
+        session.add(project)
+        await session.flush()
+        rows = [Section(project_id=project.id, title=f"Section {i}", content=CONTENT, order=i) for i in range(sections)]
+        session.add_all(rows)
+        await session.commit()
+        return [row.id for row in rows]
+
+
+async def refine(session_maker, section_id: int):
+    async with session_maker() as session:
+        section = await session.get(Section, section_id)
+        previous = section.content
+        await refinement_history.record(
+            session, section_id=section_id, prompt="Make it shorter", previous_content=previous, refined_content=CONTENT
+        )
+        section.content = CONTENT
+        await session.commit()
+
+
+async def feedback(session_maker, section_id: int):
+    async with session_maker() as session:
+        refinement = (await session.execute(
+            select(Refinement)
+            .where(Refinement.section_id == section_id)
+            .order_by(Refinement.created_at.desc())
+            .limit(1)
+        )).scalar_one_or_none()
+        if refinement is not None:
+            refinement.feedback = random.choice(("like", "dislike"))
+            await session.commit()
+
+
+async def history(session_maker, section_id: int):
+    async with session_maker() as session:
+        await session.execute(select(Refinement).where(Refinement.section_id == section_id))
+
+
+async def run(engine, workers: int, readers: int, ops: int, sections: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    section_ids = await seed(session_maker, sections)
+    durations, errors = [], 0
+    stop = asyncio.Event()
+
+    async def writer(seed_value: int):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        for _ in range(ops):
+            operation = refine if rng.random() < 0.5 else feedback
+            started = time.perf_counter()
+            try:
+                await operation(session_maker, rng.choice(section_ids))
+            except OperationalError:
+                errors += 1
+                continue
+            durations.append(time.perf_counter() - started)
+
+    async def reader(seed_value: int):
+        rng = random.Random(seed_value)
+        while not stop.is_set():
+            try:
+                await history(session_maker, rng.choice(section_ids))
+            except OperationalError:
+                pass
+
+    reading = [asyncio.create_task(reader(i)) for i in range(readers)]
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(i) for i in range(workers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*reading)
+    await engine.dispose()
+
+    durations.sort()
+    return {
+        "writes/s": len(durations) / elapsed,
+        "p50 ms": statistics.median(durations) * 1000 if durations else 0.0,
+        "p95 ms": durations[max(int(len(durations) * 0.95) - 1, 0)] * 1000 if durations else 0.0,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent writers")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent history readers")
+    parser.add_argument("--ops", type=int, default=50, help="Writes per worker")
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--database-url", help="Benchmark this (empty) database instead of temporary SQLite files")
+    args = parser.parse_args()
+
+    if args.database_url:
+        scenarios = [("engine profile", lambda: create_db_engine(args.database_url))]
+    else:
+        directory = tempfile.mkdtemp()
+        scenarios = [
+            ("previous sqlite setup", lambda: create_async_engine(
+                f"sqlite+aiosqlite:///{os.path.join(directory, 'previous.db')}"
+            )),
+            ("sqlite engine profile", lambda: create_db_engine(
+                f"sqlite+aiosqlite:///{os.path.join(directory, 'profile.db')}"
+            )),
+        ]
+
+    print(f"{'scenario':<24}{'writes/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for label, make_engine in scenarios:
+        result = asyncio.run(run(make_engine(), args.workers, args.readers, args.ops, args.sections))
+        print(f"{label:<24}{result['writes/s']:>10.1f}{result['p50 ms']:>10.2f}{result['p95 ms']:>10.2f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
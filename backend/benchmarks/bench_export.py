@@ -0,0 +1,95 @@
+"""Measure export throughput and event loop stalls during concurrent exports.
+
+Renders a synthetic deck ``--exports`` times concurrently, first on the
+event loop as the export endpoint used to, then through the export worker
+pool. A probe task sleeps 10 ms in a loop meanwhile; how late it wakes up
+is the latency every other request on the worker would see.
+
+    python -m benchmarks.bench_export --exports 8 --slides 40 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.document_service import ProjectSnapshot, SectionSnapshot, render_document  # noqa: E402
+from app.services.export_pool import ExportPool  # noqa: E402
+
+BULLETS = "\n".join(
+    f"• Point {i}: regional demand held steady while pricing changes reached most renewing contracts"
+    for i in range(6)
+)
+
+
+def make_snapshot(slides: int, document_type: str) -> ProjectSnapshot:
+    return ProjectSnapshot(
+        title="Quarterly Results",
+        description="Benchmark deck",
+        topic="Quarterly results",
+        document_type=document_type,
+        color_theme="ocean",
+        sections=tuple(
+            SectionSnapshot(title=f"Slide {i}", content=BULLETS, order=i) for i in range(slides)
+        ),
+    )
+
+
+async def probe(stop: asyncio.Event, delays: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        delays.append((time.perf_counter() - started - 0.01) * 1000)
+
+
+async def run(render, snapshot: ProjectSnapshot, exports: int):
+    stop, delays = asyncio.Event(), []
+    probing = asyncio.create_task(probe(stop, delays))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(render(snapshot) for _ in range(exports)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probing
+    delays.sort()
+    return {
+        "exports/s": exports / elapsed,
+        "p50 stall ms": statistics.median(delays),
+        "max stall ms": delays[-1],
+    }
+
+
+async def inline(snapshot: ProjectSnapshot) -> bytes:
+    return render_document(snapshot)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--exports", type=int, default=8, help="Concurrent exports")
+    parser.add_argument("--slides", type=int, default=40, help="Sections per document")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Export worker processes")
+    parser.add_argument("--document-type", choices=("pptx", "docx"), default="pptx")
+    args = parser.parse_args()
+
+    snapshot = make_snapshot(args.slides, args.document_type)
+    pool = ExportPool(workers=args.workers, max_queued=args.exports)
+
+    async def pooled():
+        # Start the workers before timing so spawn cost is not counted
+        await asyncio.gather(*(pool.render(make_snapshot(1, args.document_type)) for _ in range(args.workers)))
+        return await run(pool.render, snapshot, args.exports)
+
+    print(f"{'scenario':<24}{'exports/s':>10}{'p50 stall ms':>14}{'max stall ms':>14}")
+    for label, measure in (
+        ("on the event loop", lambda: run(inline, snapshot, args.exports)),
+        (f"{args.workers} worker processes", pooled),
+    ):
+        result = asyncio.run(measure())
+        print(f"{label:<24}{result['exports/s']:>10.2f}{result['p50 stall ms']:>14.1f}{result['max stall ms']:>14.1f}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
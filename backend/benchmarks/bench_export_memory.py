@@ -0,0 +1,115 @@
+"""Measure the server's peak memory while many large exports download at once.
+
+Renders a large deck ``--exports`` times through the export worker pool
+and keeps every download open until all renders finish, like slow
+clients would. It does this twice, each time in a fresh process:
+
+- buffered: each file is held whole in memory and streamed from a
+  ``BytesIO``, as the export endpoint used to
+- spooled: files beyond ``EXPORT_SPOOL_MAX_KB`` come back as temporary
+  files and are streamed in ``EXPORT_STREAM_CHUNK_KB`` chunks
+
+Reports the growth of the server process's peak RSS over its baseline.
+Worker processes render the same way in both modes, so they are not
+measured.
+
+    python -m benchmarks.bench_export_memory --exports 16 --slides 2000
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+MODES = ("buffered", "spooled")
+
+
+def peak_rss_kib() -> int:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def download(rendered, mode: str) -> int:
+    """Read an export the way the endpoint streams it."""
+    from app.api.export import _close_export, _iter_chunks
+
+    if isinstance(rendered, bytes):
+        file_stream, remove = io.BytesIO(rendered), None
+        # The old response iterated the buffer line by line
+        chunks = file_stream if mode == "buffered" else _iter_chunks(file_stream)
+    else:
+        file_stream, remove = open(rendered, "rb"), rendered
+        chunks = _iter_chunks(file_stream)
+    received = 0
+    try:
+        for chunk in chunks:
+            received += len(chunk)
+            await asyncio.sleep(0)
+    finally:
+        _close_export(file_stream, remove)
+    return received
+
+
+async def run_child(mode: str, exports: int, slides: int, workers: int) -> dict:
+    from app.services.export_pool import ExportPool
+    from benchmarks.bench_export import make_snapshot
+
+    pool = ExportPool(workers=workers, max_queued=exports, spool_directory=tempfile.mkdtemp())
+    snapshot = make_snapshot(slides, "pptx")
+    # Start the workers, fill their fragment caches and load the endpoint before measuring
+    for rendered in await asyncio.gather(*(pool.render(snapshot) for _ in range(max(1, workers)))):
+        await download(rendered, mode)
+    baseline = peak_rss_kib()
+
+    started = time.perf_counter()
+    # Every download stays open until the last render is done
+    rendered = await asyncio.gather(*(pool.render(snapshot) for _ in range(exports)))
+    sizes = await asyncio.gather(*(download(result, mode) for result in rendered))
+    elapsed = time.perf_counter() - started
+    pool.shutdown()
+    return {
+        "peak_growth_kib": peak_rss_kib() - baseline,
+        "file_kib": sizes[0] / 1024,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--exports", type=int, default=16, help="Downloads open at once")
+    parser.add_argument("--slides", type=int, default=2000, help="Sections per deck")
+    parser.add_argument("--workers", type=int, default=2, help="Export worker processes (0 renders in a thread)")
+    parser.add_argument("--spool-kb", type=int, default=1024, help="EXPORT_SPOOL_MAX_KB for the spooled run")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(run_child(args.child, args.exports, args.slides, args.workers))
+        print(json.dumps(result))
+        return
+
+    print(f"{args.exports} concurrent downloads of a {args.slides}-slide deck, {args.workers} workers")
+    print(f"{'mode':<10}{'file KiB':>10}{'peak RSS growth MiB':>21}{'seconds':>10}")
+    for mode in MODES:
+        # A spool larger than any file keeps every export in memory, as before
+        spool_kb = args.spool_kb if mode == "spooled" else 1024 * 1024
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_export_memory", "--child", mode,
+             "--exports", str(args.exports), "--slides", str(args.slides), "--workers", str(args.workers)],
+            env={**os.environ, "EXPORT_SPOOL_MAX_KB": str(spool_kb)},
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<10}{result['file_kib']:>10.0f}{result['peak_growth_kib'] / 1024:>21.1f}{result['seconds']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
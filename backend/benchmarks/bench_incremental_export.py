@@ -0,0 +1,82 @@
+"""Measure re-export time after editing a few sections of a large document.
+
+Renders a synthetic document with an empty fragment cache, then edits
+``--changed`` sections and renders it again, first with the fragment cache
+disabled (every section rendered, as exports used to be) and then with the
+fragments of the unchanged sections reused. Re-export time should follow
+the number of changed sections, not the size of the document.
+
+    python -m benchmarks.bench_incremental_export --sections 20 60 200 --changed 1 5
+"""
+import argparse
+import dataclasses
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.document_service import DocumentService, ProjectSnapshot  # noqa: E402
+from benchmarks.bench_export import make_snapshot  # noqa: E402
+
+
+def numbered(snapshot: ProjectSnapshot) -> ProjectSnapshot:
+    """Give sections ids and distinct content, like a real project."""
+    return dataclasses.replace(snapshot, sections=tuple(
+        dataclasses.replace(section, id=index + 1, content=f"{section.content}\nSection {index}")
+        for index, section in enumerate(snapshot.sections)
+    ))
+
+
+def edited(snapshot: ProjectSnapshot, changed: int, rng: random.Random) -> ProjectSnapshot:
+    sections = list(snapshot.sections)
+    for index in rng.sample(range(len(sections)), changed):
+        sections[index] = dataclasses.replace(
+            sections[index], content=f"{sections[index].content}\nRefined {rng.random():.6f}"
+        )
+    return dataclasses.replace(snapshot, sections=tuple(sections))
+
+
+def timed(service: DocumentService, snapshot: ProjectSnapshot) -> float:
+    render = service.create_docx if snapshot.document_type == "docx" else service.create_pptx
+    started = time.perf_counter()
+    render(snapshot, snapshot.sections).close()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[20, 60, 200], help="Sections per document")
+    parser.add_argument("--changed", type=int, nargs="+", default=[1, 5], help="Sections edited before re-export")
+    parser.add_argument("--repeat", type=int, default=5, help="Edits timed per measurement; the median counts")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    full = DocumentService(fragment_cache_entries=0)
+    # Warm the per-process templates so neither side pays for them
+    for document_type in ("pptx", "docx"):
+        timed(full, make_snapshot(1, document_type))
+
+    print(f"{'type':<6}{'sections':>9}{'changed':>9}{'full ms':>10}{'incremental ms':>16}{'speedup':>10}")
+    for document_type in ("pptx", "docx"):
+        for sections in args.sections:
+            for changed in args.changed:
+                if changed > sections:
+                    continue
+                incremental = DocumentService(fragment_cache_entries=4 * sections)
+                snapshot = numbered(make_snapshot(sections, document_type))
+                timed(incremental, snapshot)
+                full_ms, incremental_ms = [], []
+                for _ in range(args.repeat):
+                    snapshot = edited(snapshot, changed, rng)
+                    full_ms.append(timed(full, snapshot))
+                    incremental_ms.append(timed(incremental, snapshot))
+                full_median = statistics.median(full_ms)
+                incremental_median = statistics.median(incremental_ms)
+                print(f"{document_type:<6}{sections:>9}{changed:>9}{full_median:>10.1f}"
+                      f"{incremental_median:>16.1f}{full_median / incremental_median:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
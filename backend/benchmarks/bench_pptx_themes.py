@@ -0,0 +1,244 @@
+"""Compare PPTX export time and size with per-slide styling and theme templates.
+
+Exports used to build every slide on the blank layout and style it one
+shape at a time: the gradient background, the text boxes, and the font,
+size and color of each paragraph. They now start from a per-theme base
+template whose master and layouts carry all of that, so slides only hold
+text. This renders a synthetic deck in every color theme at several
+sizes both ways, and reports render time, file size and the average size
+of a slide's XML. The one-off cost of building each theme's template is
+reported separately.
+
+    python -m benchmarks.bench_pptx_themes --slides 10 100 500
+"""
+import argparse
+import dataclasses
+import io
+import os
+import statistics
+import time
+import zipfile
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from pptx import Presentation  # noqa: E402
+from pptx.enum.text import PP_ALIGN  # noqa: E402
+from pptx.util import Inches as PptxInches, Pt as PptxPt  # noqa: E402
+
+from app.services.document_service import (  # noqa: E402
+    COLOR_THEMES,
+    DocumentService,
+    ProjectSnapshot,
+    pptx_base_template,
+)
+from benchmarks.bench_export import make_snapshot  # noqa: E402
+
+
+def legacy_pptx(project: ProjectSnapshot, sections) -> io.BytesIO:
+    """The export renderer before theme templates, styling every slide."""
+    prs = Presentation()
+    prs.slide_width = PptxInches(12)
+    prs.slide_height = PptxInches(8.5)
+
+    # Get color theme
+    theme = COLOR_THEMES.get(project.color_theme, COLOR_THEMES["blue_purple"])
+
+    # Title slide with custom design
+    blank_layout = prs.slide_layouts[6]  # Blank layout
+    title_slide = prs.slides.add_slide(blank_layout)
+
+    # Add gradient background to title slide
+    background = title_slide.background
+    fill = background.fill
+    fill.gradient()
+    fill.gradient_angle = 45
+    fill.gradient_stops[0].color.rgb = theme["bg1"]
+    fill.gradient_stops[1].color.rgb = theme["bg2"]
+
+    # Add title text box - centered and full width
+    title_box = title_slide.shapes.add_textbox(
+        PptxInches(0.5), 
+        PptxInches(3), 
+        PptxInches(11), 
+        PptxInches(1.5)
+    )
+    title_frame = title_box.text_frame
+    title_frame.word_wrap = True
+    title_frame.vertical_anchor = 1  # Middle vertical alignment
+    title_para = title_frame.paragraphs[0]
+    title_para.text = project.title
+    title_para.alignment = PP_ALIGN.CENTER
+    title_para.font.size = PptxPt(48)
+    title_para.font.bold = True
+    title_para.font.color.rgb = theme["title"]
+
+    # Add subtitle/description text box - full width
+    subtitle_box = title_slide.shapes.add_textbox(
+        PptxInches(1), 
+        PptxInches(5), 
+        PptxInches(10), 
+        PptxInches(2)
+    )
+    subtitle_frame = subtitle_box.text_frame
+    subtitle_frame.word_wrap = True
+    subtitle_frame.vertical_anchor = 1  # Middle vertical alignment
+    subtitle_para = subtitle_frame.paragraphs[0]
+    if project.description:
+        subtitle_para.text = project.description
+    else:
+        subtitle_para.text = project.topic
+    subtitle_para.alignment = PP_ALIGN.CENTER
+    subtitle_para.font.size = PptxPt(24)
+    subtitle_para.font.color.rgb = theme["text"]
+
+    # Sort sections by order
+    sorted_sections = sorted(sections, key=lambda x: x.order)
+
+    # Add content slides
+    for section in sorted_sections:
+        # Use blank layout for custom positioning
+        blank_layout = prs.slide_layouts[6]  # Blank layout
+        slide = prs.slides.add_slide(blank_layout)
+
+        # Add gradient background with theme colors
+        background = slide.background
+        fill = background.fill
+        fill.gradient()
+        fill.gradient_angle = 45
+        fill.gradient_stops[0].color.rgb = theme["bg1"]
+        fill.gradient_stops[1].color.rgb = theme["bg2"]
+
+        # Add title at the top - centered with styling
+        title_box = slide.shapes.add_textbox(
+            PptxInches(0.5), 
+            PptxInches(0.5), 
+            PptxInches(11), 
+            PptxInches(1.2)
+        )
+        title_frame = title_box.text_frame
+        title_frame.word_wrap = True
+        title_para = title_frame.paragraphs[0]
+        title_para.text = section.title
+        title_para.alignment = PP_ALIGN.CENTER
+        title_para.font.size = PptxPt(32)
+        title_para.font.bold = True
+        title_para.font.color.rgb = theme["title"]
+
+        # Add content box - centered on the page both horizontally and vertically
+        # Slide is 10" wide x 8.5" tall
+        # Box is 7" wide x 4.5" tall, so:
+        # Left = (10 - 7) / 2 = 1.5"
+        # Top = (8.5 - 4.5) / 2 = 2"
+        content_box = slide.shapes.add_textbox(
+            PptxInches(1.75), 
+            PptxInches(2), 
+            PptxInches(7), 
+            PptxInches(4.5)
+        )
+        text_frame = content_box.text_frame
+        text_frame.vertical_anchor = 1  # MSO_ANCHOR.MIDDLE for vertical centering
+        text_frame.word_wrap = True
+
+        if section.content:
+            # Remove redundant bullet markers (• or - at start) and split content
+            content_lines = section.content.strip().split('\n')
+            for i, line in enumerate(content_lines):
+                line = line.strip()
+                # Remove leading bullet characters but keep track if it was bulleted
+                is_bullet = False
+                if line.startswith('• '):
+                    line = line[2:]
+                    is_bullet = True
+                elif line.startswith('- '):
+                    line = line[2:]
+                    is_bullet = True
+                elif line.startswith('* '):
+                    line = line[2:]
+                    is_bullet = True
+
+                if line:
+                    if i == 0:
+                        p = text_frame.paragraphs[0]
+                    else:
+                        p = text_frame.add_paragraph()
+
+                    # Add bullet symbol back if it was originally bulleted
+                    if is_bullet:
+                        p.text = '• ' + line
+                    else:
+                        p.text = line
+
+                    p.level = 0
+                    p.alignment = PP_ALIGN.JUSTIFY  # Justify text
+                    p.font.size = PptxPt(20)
+                    p.font.color.rgb = theme["text"]
+                    p.space_before = PptxPt(8)
+                    p.space_after = PptxPt(8)
+        else:
+            p = text_frame.paragraphs[0]
+            p.text = "[Content not yet generated]"
+            p.alignment = PP_ALIGN.CENTER
+            p.font.size = PptxPt(18)
+            p.font.color.rgb = theme["text"]
+
+    # Save to BytesIO
+    file_stream = io.BytesIO()
+    prs.save(file_stream)
+    file_stream.seek(0)
+    return file_stream
+
+
+def slide_xml_bytes(data: bytes) -> float:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        sizes = [
+            info.file_size for info in archive.infolist()
+            if info.filename.startswith("ppt/slides/slide") and info.filename.endswith(".xml")
+        ]
+    return statistics.mean(sizes)
+
+
+def measure(render, snapshot: ProjectSnapshot, repeat: int):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with render(snapshot, snapshot.sections) as file_stream:
+            data = file_stream.read()
+        durations.append(time.perf_counter() - started)
+    return min(durations) * 1000, len(data), slide_xml_bytes(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 100, 500], help="Sections per deck")
+    parser.add_argument("--repeat", type=int, default=3, help="Renders per measurement; the fastest counts")
+    args = parser.parse_args()
+
+    # Without the fragment cache, so repeated renders do the full work
+    renderer = DocumentService(fragment_cache_entries=0)
+    build_ms = []
+    for theme in COLOR_THEMES:
+        started = time.perf_counter()
+        pptx_base_template(theme)
+        build_ms.append((time.perf_counter() - started) * 1000)
+    print(f"Built {len(COLOR_THEMES)} theme templates, {statistics.mean(build_ms):.1f} ms each on average")
+
+    print(f"{'theme':<14}{'slides':>7}{'renderer':>10}{'ms':>10}{'KiB':>9}{'slide XML B':>13}")
+    totals = {}
+    for slides in args.slides:
+        for theme in COLOR_THEMES:
+            snapshot = dataclasses.replace(make_snapshot(slides, "pptx"), color_theme=theme)
+            for label, render in (("styled", legacy_pptx), ("template", renderer.create_pptx)):
+                ms, size, slide_bytes = measure(render, snapshot, args.repeat)
+                totals.setdefault((slides, label), []).append(ms)
+                print(f"{theme:<14}{slides:>7}{label:>10}{ms:>10.1f}{size / 1024:>9.0f}{slide_bytes:>13.0f}")
+
+    print()
+    print(f"{'slides':>7}{'styled ms':>12}{'template ms':>14}{'speedup':>10}")
+    for slides in args.slides:
+        styled = statistics.mean(totals[slides, "styled"])
+        template = statistics.mean(totals[slides, "template"])
+        print(f"{slides:>7}{styled:>12.1f}{template:>14.1f}{styled / template:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
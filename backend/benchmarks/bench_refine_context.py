@@ -0,0 +1,85 @@
+"""Compare refine prompt sizes against section length.
+
+Refines synthetic sections of growing length with the offline FakeProvider
+and reports the estimated prompt tokens sent to the model: the whole-section
+prompt used below REFINE_PROMPT_MAX_TOKENS, a request naming one paragraph,
+and a request that applies to the whole section.
+
+    python -m benchmarks.bench_refine_context --budget 1500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core.config import settings  # noqa: E402
+from app.services.gemini_service import GeminiService  # noqa: E402
+from app.services.llm_providers import FakeProvider  # noqa: E402
+from app.services.prompt_budget import estimate_tokens  # noqa: E402
+
+PARAGRAPH = (
+    "Regional operators reported steady demand through the quarter, with growth concentrated in "
+    "mid-sized accounts that renewed early. Margins held despite higher input costs because the "
+    "pricing changes introduced last year have now reached most contracts, and churn stayed "
+    "below the planning assumption in every segment except the smallest customers."
+)
+REQUESTS = {
+    "targeted": "Make the second paragraph more concise",
+    "whole section": "Make the tone more formal",
+}
+
+
+class RecordingProvider(FakeProvider):
+    """FakeProvider that remembers the size of every prompt it receives."""
+
+    def __init__(self):
+        super().__init__(latency_seconds=0.0)
+        self.prompt_tokens = []
+
+    async def generate(self, prompt: str):
+        self.prompt_tokens.append(estimate_tokens(prompt))
+        return await super().generate(prompt)
+
+
+async def measure(service: GeminiService, provider: RecordingProvider, content: str, request: str):
+    provider.prompt_tokens.clear()
+    await service.refine_content(content, request, "Quarterly Results", use_cache=False, document_type="docx")
+    return len(provider.prompt_tokens), max(provider.prompt_tokens), sum(provider.prompt_tokens)
+
+
+async def run(lengths, budget: int):
+    settings.LLM_STATE_DB_PATH = os.path.join(tempfile.mkdtemp(), "llm_state.db")
+    provider = RecordingProvider()
+    service = GeminiService(provider=provider)
+    service.rate_limiter.max_rpm = 1e9
+    service.rate_limiter.capacity = 1e9
+    service.refine_max_tokens = budget
+
+    header = f"{'paragraphs':>10}{'content':>9}{'unbounded':>11}"
+    for label in REQUESTS:
+        header += f"{label + ' calls':>22}{'max':>7}{'total':>8}"
+    print(header)
+    for count in lengths:
+        content = "\n\n".join(f"{PARAGRAPH} ({index + 1})" for index in range(count))
+        unbounded = estimate_tokens(service._refine_prompt(content, REQUESTS["targeted"], "Quarterly Results"))
+        row = f"{count:>10}{estimate_tokens(content):>9}{unbounded:>11}"
+        for request in REQUESTS.values():
+            calls, largest, total = await measure(service, provider, content, request)
+            row += f"{calls:>22}{largest:>7}{total:>8}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=settings.REFINE_PROMPT_MAX_TOKENS,
+                        help="Refine prompt budget in estimated tokens")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[2, 4, 8, 16, 32, 64],
+                        help="Section lengths in paragraphs")
+    args = parser.parse_args()
+    asyncio.run(run(args.lengths, args.budget))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Compare refinement history size and read latency before and after delta storage.
+
+Seeds a SQLite database with sections refined many times, mostly edits to
+one paragraph with an occasional full rewrite, stored as plain text the way
+rows were written before ``app.services.refinement_history``. Measures the
+database size and read latency, runs the startup migration, and measures
+again: listing a section's whole history with text, and reading a single
+version with an empty and a warm LRU.
+
+    python -m benchmarks.bench_refinement_history --sections 20 --versions 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
+
+from app.database.session import Base, create_db_engine  # noqa: E402
+from app.models.project import DocumentType, Project, Refinement, Section  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.refinement_history import refinement_history  # noqa: E402
+
+WORDS = (
+    "revenue margin growth customers renewal pricing region quarter operators demand contracts "
+    "segment churn forecast investment capacity delivery partners costs planning teams market"
+).split()
+
+
+def paragraph(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(50, 90))).capitalize() + "."
+
+
+def versions(rng: random.Random, count: int, paragraphs: int):
+    """Successive section texts: single-paragraph edits with a full rewrite one time in ten."""
+    current = [paragraph(rng) for _ in range(paragraphs)]
+    for _ in range(count):
+        if rng.random() < 0.1:
+            current = [paragraph(rng) for _ in range(paragraphs)]
+        else:
+            current = list(current)
+            current[rng.randrange(paragraphs)] = paragraph(rng)
+        yield "\n\n".join(current)
+
+
+async def seed(session_maker, sections: int, count: int, paragraphs: int):
+    rng = random.Random(7)
+    async with session_maker() as session:
+        user = User(email="bench@example.com", username="bench", hashed_password="x")
+        session.add(user)
+        await session.flush()
+        project = Project(user_id=user.id, title="Benchmark", document_type=DocumentType.DOCX, topic="Benchmark")
+        session.add(project)
+        await session.flush()
+        section_ids = []
+        for index in range(sections):
+            section = Section(project_id=project.id, title=f"Section {index}", order=index)
+            session.add(section)
+            await session.flush()
+            previous = None
+            for number, text in enumerate(versions(rng, count, paragraphs)):
+                # Legacy layout: both texts in full, no storage kind
+                session.add(Refinement(
+                    section_id=section.id, prompt=f"Edit {number}",
+                    legacy_previous_content=previous, legacy_refined_content=text
+                ))
+                previous = text
+            section.content = previous
+            section_ids.append(section.id)
+        await session.commit()
+        return section_ids
+
+
+def database_size(path: str) -> int:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+async def read_latency(session_maker, section_ids, reads: int):
+    rng = random.Random(11)
+    async with session_maker() as session:
+        refinement_ids = (await session.scalars(select(Refinement.id))).all()
+
+    async def list_history(section_id: int):
+        async with session_maker() as session:
+            rows = (await session.scalars(
+                select(Refinement).where(Refinement.section_id == section_id).order_by(Refinement.created_at.desc())
+            )).all()
+            await refinement_history.materialize(session, rows)
+
+    async def single(refinement_id: int):
+        async with session_maker() as session:
+            await refinement_history.materialize(session, [await session.get(Refinement, refinement_id)])
+
+    async def timed(operation, ids, clear: bool):
+        durations = []
+        for value in ids:
+            if clear:
+                refinement_history.clear_cache()
+            started = time.perf_counter()
+            await operation(value)
+            durations.append((time.perf_counter() - started) * 1000)
+        return statistics.median(durations)
+
+    picks = [rng.choice(refinement_ids) for _ in range(reads)]
+    # Revisit a working set that fits in the LRU
+    hot = picks[:max(1, refinement_history.cache_entries // refinement_history.snapshot_interval)]
+    cold = {
+        "history": await timed(list_history, [rng.choice(section_ids) for _ in range(reads)], clear=True),
+        "version cold": await timed(single, picks, clear=True),
+    }
+    refinement_history.clear_cache()
+    await timed(single, hot, clear=False)
+    return {**cold, "version warm": await timed(single, hot * (reads // len(hot) + 1), clear=False)}
+
+
+async def run(path: str, sections: int, count: int, paragraphs: int, reads: int):
+    engine = create_db_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    section_ids = await seed(session_maker, sections, count, paragraphs)
+
+    results = []
+    await engine.dispose()
+    results.append(("plain text", database_size(path), await read_latency(session_maker, section_ids, reads)))
+
+    started = time.perf_counter()
+    converted = await refinement_history.migrate_legacy_rows(session_maker)
+    migration_seconds = time.perf_counter() - started
+    await engine.dispose()
+    results.append(("snapshots + deltas", database_size(path), await read_latency(session_maker, section_ids, reads)))
+    await engine.dispose()
+    return results, converted, migration_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=30, help="Refinements per section")
+    parser.add_argument("--paragraphs", type=int, default=6, help="Paragraphs per section")
+    parser.add_argument("--reads", type=int, default=200, help="Reads timed per measurement")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "history.db")
+    results, converted, migration_seconds = asyncio.run(
+        run(path, args.sections, args.versions, args.paragraphs, args.reads)
+    )
+    print(f"Migrated {converted} rows in {migration_seconds:.2f}s "
+          f"(snapshot every {refinement_history.snapshot_interval}, {refinement_history.compression})")
+    print(f"{'storage':<20}{'db KiB':>10}{'history p50 ms':>16}{'version cold ms':>17}{'version warm ms':>17}")
+    for label, size, latency in results:
+        print(f"{label:<20}{size / 1024:>10.0f}{latency['history']:>16.2f}"
+              f"{latency['version cold']:>17.3f}{latency['version warm']:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
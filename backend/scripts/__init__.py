@@ -0,0 +1,4 @@
+"""Maintenance and CI checks for the backend. Run from the backend directory, e.g.
+
+    python -m scripts.check_query_plans
+"""
@@ -0,0 +1,144 @@
+"""Fail if any endpoint's queries fall back to a full table scan.
+
+Calls every API endpoint against a temporary SQLite database with the
+offline fake provider, records each SELECT, UPDATE and DELETE the app
+issues, and runs ``EXPLAIN QUERY PLAN`` on it. Exits with status 1 if a
+plan scans a whole table instead of searching an index.
+
+    python -m scripts.check_query_plans --verbose
+
+Uses FastAPI's TestClient, which needs httpx installed.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+directory = tempfile.mkdtemp()
+database_path = os.path.join(directory, "plans.db")
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{database_path}",
+    "LLM_STATE_DB_PATH": os.path.join(directory, "llm_state.db"),
+    "LLM_PROVIDER": "fake",
+    "FAKE_LLM_LATENCY_SECONDS": "0",
+    "FAKE_LLM_CHUNK_DELAY_SECONDS": "0",
+    "GEMINI_RATE_LIMIT_RPM": "100000",
+    "GEMINI_RATE_LIMIT_BURST": "1000",
+    "SPECULATIVE_GENERATION_ENABLED": "false",
+    "JOB_POLL_INTERVAL_SECONDS": "0.05",
+    "LOG_LEVEL": "WARNING",
+})
+os.environ.setdefault("SECRET_KEY", "query-plans")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database.session import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+# "SCAN projects" is a full scan; "SCAN projects USING INDEX ..." walks an index.
+# Only app tables count: scans of subquery results and of sqlite_master
+# (read by schema reflection at startup) are fine.
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?!.*USING (?:COVERING )?INDEX)")
+
+# statement -> (parameters, endpoint that first issued it)
+statements = {}
+current_endpoint = ["startup"]
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+        statements.setdefault(statement, (parameters, current_endpoint[0]))
+
+
+def exercise(client: TestClient):
+    """Call each endpoint once, in an order where every call has data to read."""
+    def call(method: str, path: str, **kwargs):
+        current_endpoint[0] = f"{method} {path}"
+        response = client.request(method, path, **kwargs)
+        current_endpoint[0] = "background"
+        if response.status_code >= 400:
+            sys.exit(f"{method} {path} failed with {response.status_code}: {response.text}")
+        return response
+
+    credentials = {"email": "plans@example.com", "password": "query-plans"}
+    call("POST", "/api/auth/register", json={**credentials, "username": "plans"})
+    token = call("POST", "/api/auth/login", json=credentials).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    call("GET", "/api/auth/me")
+
+    outline = {"topic": "Query plans", "document_type": "docx", "num_sections": 3}
+    titles = call("POST", "/api/projects/generate-outline", json=outline).json()["sections"]
+    project = call("POST", "/api/projects", json={
+        "title": "Query plans",
+        "document_type": "docx",
+        "topic": "Query plans",
+        "sections": [{"title": title, "order": order} for order, title in enumerate(titles)],
+    }).json()
+    project_id = project["id"]
+    first, second = project["sections"][0]["id"], project["sections"][1]["id"]
+
+    call("POST", "/api/projects", json={
+        "title": "Second page", "document_type": "pptx", "topic": "Pagination", "sections": [],
+    })
+    page = call("GET", "/api/projects", params={"limit": 1}).json()
+    call("GET", "/api/projects", params={"limit": 1, "cursor": page["next_cursor"], "include": "sections"})
+    call("GET", f"/api/projects/{project_id}")
+    call("PUT", f"/api/projects/{project_id}", json={"description": "Checking query plans"})
+    call("POST", f"/api/sections/{first}/generate")
+    call("POST", f"/api/sections/{second}/generate/stream")
+    call("PUT", f"/api/sections/{first}", json={"title": "Renamed section"})
+    refinement = call("POST", f"/api/sections/{first}/refine", json={"prompt": "Make it shorter"}).json()
+    call("POST", f"/api/sections/{first}/refine/stream", json={"prompt": "Make it longer"})
+    call("GET", f"/api/sections/{first}/refinements")
+    call("GET", f"/api/sections/{first}/refinements", params={"include": "content"})
+    call("GET", f"/api/sections/refinements/{refinement['id']}")
+    call("PATCH", f"/api/sections/refinements/{refinement['id']}/feedback", json={"feedback": "like"})
+    call("GET", f"/api/projects/{project_id}/feedback")
+    call("POST", f"/api/projects/{project_id}/generate-all")
+    call("POST", "/api/projects/draft", json={**outline, "topic": "Draft query plans"})
+
+    job = call("POST", "/api/jobs", json={"kind": "refine_section", "section_id": first, "prompt": "Tighten"}).json()
+    deadline = time.monotonic() + 30
+    while call("GET", f"/api/jobs/{job['id']}").json()["status"] in ("queued", "running"):
+        if time.monotonic() > deadline:
+            sys.exit("Job did not finish")
+        time.sleep(0.05)
+    call("GET", f"/api/jobs/{job['id']}/events")
+
+    call("GET", f"/api/export/{project_id}")
+    call("DELETE", f"/api/projects/{project_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="Print every query plan")
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        exercise(client)
+
+    conn = sqlite3.connect(database_path)
+    failures = 0
+    for statement, (parameters, endpoint) in statements.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        scans = [
+            detail for detail in plan
+            if (match := FULL_SCAN.match(detail)) and match.group(1) in Base.metadata.tables
+        ]
+        failures += bool(scans)
+        if scans or args.verbose:
+            print(f"{'FULL SCAN' if scans else 'ok'} [{endpoint}]\n  {' '.join(statement.split())}")
+            for detail in plan:
+                print(f"    {detail}")
+
+    print(f"{len(statements)} queries checked, {failures} with full table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Shared test setup: an isolated SQLite database and the offline fake model.
+
+The environment is set before ``app`` is imported, since settings are
+read once at import time. Every test starts from empty tables.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="oceanai-tests-")
+
+os.environ.update({
+    "SECRET_KEY": "test",
+    "DATABASE_URL": f"sqlite+aiosqlite:///{_STATE_DIR}/app.db",
+    "LLM_STATE_DB_PATH": f"{_STATE_DIR}/llm_state.db",
+    "LLM_PROVIDER": "fake",
+    "FAKE_LLM_LATENCY_SECONDS": "0",
+    "FAKE_LLM_CHUNK_DELAY_SECONDS": "0",
+    "GEMINI_RATE_LIMIT_RPM": "100000",
+    "GEMINI_RATE_LIMIT_MIN_RPM": "10000",
+    "GEMINI_RATE_LIMIT_BURST": "1000",
+    "LLM_CACHE_ENABLED": "false",
+    "EXPORT_WORKERS": "0",
+    "EXPORT_CACHE_DIR": f"{_STATE_DIR}/export_cache",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database.session import Base, engine, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def _reset_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await init_db()
+
+
+def _run(coroutine):
+    async def main():
+        try:
+            await _reset_db()
+            return await coroutine
+        finally:
+            # Pooled connections belong to this event loop
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine on a fresh event loop against empty tables."""
+    return _run
+
+
+@pytest.fixture
+def client():
+    """An API client logged in as a freshly registered user."""
+    _run(asyncio.sleep(0))
+    with TestClient(app) as test_client:
+        user = {"email": "user@example.com", "username": "user", "password": "password"}
+        test_client.post("/api/auth/register", json=user)
+        token = test_client.post("/api/auth/login", json=user).json()["access_token"]
+        test_client.headers["Authorization"] = f"Bearer {token}"
+        yield test_client
+        test_client.portal.call(engine.dispose)
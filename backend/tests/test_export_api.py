@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from app.api import export
+from app.services.export_cache import export_cache
+
+
+@pytest.fixture
+def project_id(client):
+    project = client.post("/api/projects", json={
+        "title": "Solar power", "document_type": "docx", "topic": "Solar power",
+        "sections": [{"title": "Introduction", "order": 0}, {"title": "Outlook", "order": 1}]
+    }).json()
+    for section in project["sections"]:
+        client.post(f"/api/sections/{section['id']}/generate")
+    return project["id"]
+
+
+def test_export_rerenders_an_entry_evicted_after_lookup(client, project_id, monkeypatch):
+    rendered = client.get(f"/api/export/{project_id}").content
+    lookup = export_cache.get
+
+    async def get_then_evict(digest, extension):
+        path = await lookup(digest, extension)
+        os.unlink(path)
+        return path
+
+    monkeypatch.setattr(export_cache, "get", get_then_evict)
+    response = client.get(f"/api/export/{project_id}")
+
+    assert response.status_code == 200
+    assert response.content == rendered
+
+
+def test_cached_export_survives_eviction_once_opened(client, project_id, monkeypatch):
+    rendered = client.get(f"/api/export/{project_id}").content
+    respond = export._export_response
+
+    def evict_then_respond(file_stream, *args, **kwargs):
+        os.unlink(file_stream.name)
+        return respond(file_stream, *args, **kwargs)
+
+    monkeypatch.setattr(export, "_export_response", evict_then_respond)
+    response = client.get(f"/api/export/{project_id}")
+
+    assert response.status_code == 200
+    assert response.content == rendered
+    assert response.headers["Content-Length"] == str(len(rendered))
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from app.services.gemini_service import GeminiService
+from app.services.llm_providers.base import LLMResponse
+from app.services.llm_providers.fake import FakeProvider
+
+PARAGRAPHS = [f"Paragraph {index} " + " ".join(["text"] * 60) for index in range(6)]
+
+
+class ScriptedProvider(FakeProvider):
+    """Answers paragraph refinements with ``paragraph_reply`` and refines plain prompts by tagging them."""
+
+    def __init__(self, paragraph_reply):
+        super().__init__(latency_seconds=0, chunk_delay_seconds=0)
+        self.paragraph_reply = paragraph_reply
+        self.prompts = []
+
+    async def generate(self, prompt: str) -> LLMResponse:
+        self.prompts.append(prompt)
+        if '{"paragraphs"' in prompt:
+            items = re.findall(r"^(\d+)\. (.+)$", prompt, flags=re.MULTILINE)
+            return LLMResponse(self.paragraph_reply(items))
+        content = prompt.split("Current content:\n", 1)[1].split("\n\nUser's refinement request:", 1)[0]
+        return LLMResponse(content.replace("Paragraph", "Refined"))
+
+
+def refine(paragraph_reply):
+    provider = ScriptedProvider(paragraph_reply)
+    service = GeminiService(provider=provider)
+    service.cache = None
+    service.refine_max_tokens = 520
+    refined = asyncio.run(service.refine_content("\n\n".join(PARAGRAPHS), "Make it formal", "Intro"))
+    return refined, provider.prompts
+
+
+@pytest.mark.parametrize("paragraph_reply", [
+    lambda items: "Sorry, here is the text: {not json",
+    lambda items: json.dumps({"paragraphs": [
+        {"index": int(number), "content": text.replace("Paragraph", "Refined")} for number, text in items[:-1]
+    ]}),
+], ids=["malformed", "incomplete"])
+def test_windowed_refine_falls_back_when_a_reply_is_unusable(paragraph_reply):
+    refined, prompts = refine(paragraph_reply)
+
+    assert refined == "\n\n".join(PARAGRAPHS).replace("Paragraph", "Refined")
+    windows = [prompt for prompt in prompts if '{"paragraphs"' in prompt]
+    assert len(windows) > 1
+    # One plain refine per window that could not be used
+    assert len(prompts) == 2 * len(windows)
+
+
+def test_windowed_refine_splices_parsed_paragraphs():
+    refined, prompts = refine(lambda items: json.dumps({"paragraphs": [
+        {"index": int(number), "content": text.replace("Paragraph", "Refined")} for number, text in items
+    ]}))
+
+    assert refined.split("\n\n") == [paragraph.replace("Paragraph", "Refined") for paragraph in PARAGRAPHS]
+    assert all('{"paragraphs"' in prompt for prompt in prompts)
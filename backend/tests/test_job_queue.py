@@ -0,0 +1,69 @@
+import asyncio
+
+from app.database.session import async_session_maker
+from app.models.job import Job, JobKind, JobStatus
+from app.models.user import User
+from app.services.job_queue import JobQueue
+
+
+def make_queue() -> JobQueue:
+    return JobQueue(
+        concurrency=1,
+        max_attempts=3,
+        lease_seconds=30,
+        retry_backoff_seconds=0,
+        poll_interval_seconds=0.05,
+    )
+
+
+async def wait_for_status(job_id: int, expected: JobStatus, timeout: float = 5.0) -> Job:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        async with async_session_maker() as session:
+            job = await session.get(Job, job_id)
+        if job.status == expected or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.05)
+
+
+def test_worker_survives_a_failing_run(run):
+    async def scenario():
+        queue = make_queue()
+
+        @queue.register(JobKind.OUTLINE)
+        async def handler(session, payload, user_id):
+            return {"topic": payload["topic"]}
+
+        run_job = queue._run
+        failures = []
+
+        async def flaky_run(job_id, attempts):
+            if not failures:
+                failures.append(job_id)
+                raise RuntimeError("database is locked")
+            await run_job(job_id, attempts)
+
+        queue._run = flaky_run
+        async with async_session_maker() as session:
+            user = User(email="user@example.com", username="user", hashed_password="x")
+            session.add(user)
+            await session.commit()
+            first = await queue.enqueue(session, user.id, JobKind.OUTLINE, {"topic": "first"})
+            second = await queue.enqueue(session, user.id, JobKind.OUTLINE, {"topic": "second"})
+
+        await queue.start()
+        try:
+            second_job = await wait_for_status(second.id, JobStatus.SUCCEEDED)
+            first_job = await wait_for_status(first.id, JobStatus.RUNNING)
+            alive = all(not worker.done() for worker in queue._workers)
+        finally:
+            await queue.stop()
+        return failures, first_job, second_job, alive
+
+    failures, first_job, second_job, alive = run(scenario())
+    assert failures == [first_job.id]
+    assert second_job.status == JobStatus.SUCCEEDED
+    assert second_job.result == '{"topic": "second"}'
+    # The failed run's claim is left to expire and be retried
+    assert first_job.status == JobStatus.RUNNING
+    assert alive
@@ -0,0 +1,12 @@
+import pytest
+
+from app.services.llm_providers.base import LLMProvider, LLMResponse
+
+
+def test_incomplete_provider_fails_when_created():
+    class GenerateOnly(LLMProvider):
+        async def generate(self, prompt: str) -> LLMResponse:
+            return LLMResponse(prompt)
+
+    with pytest.raises(TypeError, match="stream"):
+        GenerateOnly()
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.gemini_service import gemini_service
+from app.services.scheduler import SchedulerOverloadedError
+from app.services.speculation import speculative_generator
+
+
+def sse_events(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    """Prompts sent to the model during the test."""
+    sent = []
+    generate = gemini_service.provider.generate
+
+    async def recording_generate(prompt):
+        sent.append(prompt)
+        return await generate(prompt)
+
+    monkeypatch.setattr(gemini_service.provider, "generate", recording_generate)
+    return sent
+
+
+def test_draft_defaults_missing_section_count(client, prompts):
+    response = client.post("/api/projects/draft", json={
+        "topic": "Solar power", "document_type": "docx", "num_sections": None
+    })
+
+    events = sse_events(response.text)
+    assert [name for name, _ in events][-1] == "done"
+    assert "Generate 5 section headers" in prompts[0]
+
+
+@pytest.mark.parametrize("num_sections", [0, -3, 10_000])
+@pytest.mark.parametrize("path, body", [
+    ("/api/projects/draft", {"topic": "Solar power", "document_type": "docx"}),
+    ("/api/projects/generate-outline", {"topic": "Solar power", "document_type": "docx"}),
+    ("/api/jobs", {"kind": "outline", "topic": "Solar power", "document_type": "docx"}),
+], ids=["draft", "generate-outline", "jobs"])
+def test_out_of_range_section_counts_are_rejected(client, prompts, path, body, num_sections):
+    response = client.post(path, json={**body, "num_sections": num_sections})
+
+    assert response.status_code == 422
+    assert prompts == []
+
+
+def test_failed_generate_all_resumes_speculation(client, monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_GENERATION_ENABLED", True)
+    generate_sections = gemini_service.generate_sections
+    calls = []
+
+    async def scripted_generate_sections(**kwargs):
+        if not kwargs["section_titles"]:
+            return []
+        calls.append(kwargs["section_titles"])
+        if len(calls) == 1:
+            # Speculation is still running when generate-all arrives
+            await asyncio.sleep(0.5)
+        elif len(calls) == 2:
+            raise SchedulerOverloadedError(retry_after=1)
+        return await generate_sections(**kwargs)
+
+    monkeypatch.setattr(gemini_service, "generate_sections", scripted_generate_sections)
+    project = client.post("/api/projects", json={
+        "title": "Solar power", "document_type": "docx", "topic": "Solar power", "speculate": True,
+        "sections": [{"title": "Introduction", "order": 0}, {"title": "Outlook", "order": 1}]
+    }).json()
+
+    assert client.post(f"/api/projects/{project['id']}/generate-all").status_code == 429
+    deadline = time.monotonic() + 5
+    while speculative_generator.running and time.monotonic() < deadline:
+        time.sleep(0.05)
+    model_calls = len(calls)
+    response = client.post(f"/api/projects/{project['id']}/generate-all")
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == ["generated", "generated"]
+    # Served from the drafts speculation finished after the failure
+    assert len(calls) == model_calls == 3
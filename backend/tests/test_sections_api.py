@@ -0,0 +1,48 @@
+import pytest
+
+from app.models.project import Refinement, RefinementTextsNotLoaded
+
+
+@pytest.fixture
+def refined_section(client):
+    project = client.post("/api/projects", json={
+        "title": "Solar power", "document_type": "docx", "topic": "Solar power",
+        "sections": [{"title": "Introduction", "order": 0}]
+    }).json()
+    section_id = project["sections"][0]["id"]
+    generated = client.post(f"/api/sections/{section_id}/generate").json()
+    refinement = client.post(f"/api/sections/{section_id}/refine", json={"prompt": "Make it shorter"}).json()
+    return section_id, generated, refinement
+
+
+def test_feedback_returns_refinement_texts(client, refined_section):
+    section_id, generated, refinement = refined_section
+
+    response = client.patch(f"/api/sections/refinements/{refinement['id']}/feedback", json={"feedback": "like"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["feedback"] == "like"
+    assert body["previous_content"] == generated["content"]
+    assert body["refined_content"] == refinement["refined_content"]
+
+
+def test_refinement_list_leaves_texts_out_unless_asked(client, refined_section):
+    section_id, generated, refinement = refined_section
+
+    summaries = client.get(f"/api/sections/{section_id}/refinements").json()
+    full = client.get(f"/api/sections/{section_id}/refinements", params={"include": "content"}).json()
+
+    assert [item["refined_content"] for item in summaries] == [None, None]
+    assert full[0]["refined_content"] == refinement["refined_content"]
+
+
+def test_unmaterialized_texts_cannot_be_read():
+    refinement = Refinement(id=1, section_id=1, prompt="Make it shorter")
+
+    with pytest.raises(RefinementTextsNotLoaded):
+        refinement.refined_content
+    refinement.omit_texts()
+    assert refinement.refined_content is None
+    refinement.set_texts("refined", "previous")
+    assert (refinement.refined_content, refinement.previous_content) == ("refined", "previous")
@@ -38,6 +38,44 @@ api.interceptors.response.use(
   }
 )
 
+// POST a request and dispatch its Server-Sent Events to onEvent(event, data).
+// EventSource only supports GET without headers, so the stream is read with fetch.
+export const streamEvents = async (path, body, onEvent) => {
+  const token = localStorage.getItem('token')
+  const response = await fetch(`${API_BASE_URL}${path}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: body ? JSON.stringify(body) : undefined,
+  })
+  if (!response.ok) {
+    throw new Error(`Request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      let data = ''
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
+      }
+      onEvent(event, data ? JSON.parse(data) : null)
+    }
+  }
+}
+
 // Auth endpoints
 export const authAPI = {
   register: (data) => api.post('/api/auth/register', data),
@@ -48,18 +86,25 @@ export const authAPI = {
 // Project endpoints
 export const projectAPI = {
   create: (data) => api.post('/api/projects', data),
-  getAll: () => api.get('/api/projects'),
+  // Summaries without section content; pass { cursor } for the next page
+  getAll: (params) => api.get('/api/projects', { params }),
   getById: (id) => api.get(`/api/projects/${id}`),
+  // Latest refinement's feedback for every section
+  getFeedback: (id) => api.get(`/api/projects/${id}/feedback`),
   update: (id, data) => api.put(`/api/projects/${id}`, data),
   delete: (id) => api.delete(`/api/projects/${id}`),
   generateOutline: (data) => api.post('/api/projects/generate-outline', data),
+  generateAll: (id) => api.post(`/api/projects/${id}/generate-all`),
+  draft: (data, onEvent) => streamEvents('/api/projects/draft', data, onEvent),
 }
 
 // Section endpoints
 export const sectionAPI = {
   generate: (id) => api.post(`/api/sections/${id}/generate`),
+  generateStream: (id, onEvent) => streamEvents(`/api/sections/${id}/generate/stream`, null, onEvent),
   update: (id, data) => api.put(`/api/sections/${id}`, data),
   refine: (id, data) => api.post(`/api/sections/${id}/refine`, data),
+  refineStream: (id, data, onEvent) => streamEvents(`/api/sections/${id}/refine/stream`, data, onEvent),
   getRefinements: (id) => api.get(`/api/sections/${id}/refinements`),
   updateFeedback: (id, data) => api.patch(`/api/sections/refinements/${id}/feedback`, data),
 }
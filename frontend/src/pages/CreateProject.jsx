@@ -19,6 +19,9 @@ export default function CreateProject() {
   const [sections, setSections] = useState([{ title: '', order: 0 }])
   const [loading, setLoading] = useState(false)
   const [generating, setGenerating] = useState(false)
+  const [lastOutlineRequest, setLastOutlineRequest] = useState(null)
+  const [speculate, setSpeculate] = useState(false)
+  const [draftProgress, setDraftProgress] = useState(null)
   const navigate = useNavigate()
 
   const handleChange = (e) => {
@@ -48,15 +51,25 @@ export default function CreateProject() {
       return
     }
 
+    // Asking again for the same outline means the user wants a fresh one
+    const outlineRequest = `${formData.topic}|${formData.document_type}|${numSections}`
+
     setGenerating(true)
     try {
       const { data } = await projectAPI.generateOutline({
         topic: formData.topic,
         document_type: formData.document_type,
         num_sections: numSections,
+        regenerate: outlineRequest === lastOutlineRequest,
       })
       setSections(data.sections.map((title, index) => ({ title, order: index })))
-      toast.success('Outline generated successfully!')
+      setLastOutlineRequest(outlineRequest)
+      if (data.reused) {
+        // Generate again to ask the model for a fresh outline
+        toast.success(`Reused the outline for "${data.reused_topic}". Generate again for a new one.`)
+      } else {
+        toast.success('Outline generated successfully!')
+      }
     } catch (error) {
       toast.error('Failed to generate outline')
     } finally {
@@ -64,6 +77,51 @@ export default function CreateProject() {
     }
   }
 
+  // Outline and content for the whole document in one streamed request
+  const draftProject = async () => {
+    if (!formData.topic) {
+      toast.error('Please enter a topic first')
+      return
+    }
+
+    let projectId = null
+    let failed = 0
+    setDraftProgress({ done: 0, total: numSections })
+    try {
+      await projectAPI.draft(
+        {
+          ...formData,
+          title: formData.title || null,
+          num_sections: numSections,
+        },
+        (event, data) => {
+          if (event === 'outline') {
+            setSections(data.sections.map((title, index) => ({ title, order: index })))
+            setDraftProgress({ done: 0, total: data.sections.length })
+          } else if (event === 'project') {
+            projectId = data.id
+          } else if (event === 'section' || event === 'section_error') {
+            if (event === 'section_error') failed += 1
+            setDraftProgress(prev => ({ ...prev, done: prev.done + 1 }))
+          } else if (event === 'error') {
+            throw new Error(data.detail)
+          }
+        }
+      )
+      if (failed) {
+        toast.error(`Draft created, but ${failed} section(s) failed to generate`)
+      } else {
+        toast.success('Draft created successfully!')
+      }
+      navigate(`/project/${projectId}`)
+    } catch (error) {
+      toast.error(error.message || 'Failed to draft project')
+      if (projectId) navigate(`/project/${projectId}`)
+    } finally {
+      setDraftProgress(null)
+    }
+  }
+
   const handleSubmit = async (e) => {
     e.preventDefault()
 
@@ -77,6 +135,7 @@ export default function CreateProject() {
       const { data } = await projectAPI.create({
         ...formData,
         sections,
+        speculate,
       })
       toast.success('Project created successfully!')
       navigate(`/project/${data.id}`)
@@ -237,10 +296,34 @@ export default function CreateProject() {
             </Button>
           </div>
 
+          <label className="flex items-center space-x-2 text-sm text-gray-700 dark:text-gray-300">
+            <input
+              type="checkbox"
+              checked={speculate}
+              onChange={(e) => setSpeculate(e.target.checked)}
+              className="rounded border-purple-300 text-purple-600 focus:ring-purple-500"
+            />
+            <span>
+              Pre-generate {formData.document_type === 'docx' ? 'section' : 'slide'} content in the background
+            </span>
+          </label>
+
           <div className="flex space-x-4 pt-4">
             <Button type="submit" loading={loading} className="flex-1" size="lg">
               Create Project
             </Button>
+            <Button
+              type="button"
+              onClick={draftProject}
+              disabled={draftProgress !== null}
+              variant="outline"
+              size="lg"
+            >
+              <FiZap className="mr-2" />
+              {draftProgress
+                ? `Drafting ${draftProgress.done}/${draftProgress.total}`
+                : 'Draft Full Document'}
+            </Button>
             <Button
               type="button"
               onClick={() => navigate('/dashboard')}
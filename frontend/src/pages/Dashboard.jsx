@@ -11,23 +11,31 @@ const formatDate = (dateString) => {
   return date.toLocaleDateString('en-US', { month: 'short', day: 'numeric', year: 'numeric' })
 }
 
+const PAGE_SIZE = 30
+
 export default function Dashboard() {
   const [projects, setProjects] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const navigate = useNavigate()
 
   useEffect(() => {
     fetchProjects()
   }, [])
 
-  const fetchProjects = async () => {
+  // Without a cursor the list is reloaded from the first page
+  const fetchProjects = async (cursor = null) => {
+    if (cursor) setLoadingMore(true)
     try {
-      const { data } = await projectAPI.getAll()
-      setProjects(data)
+      const { data } = await projectAPI.getAll({ limit: PAGE_SIZE, ...(cursor && { cursor }) })
+      setProjects((current) => (cursor ? [...current, ...data.items] : data.items))
+      setNextCursor(data.next_cursor)
     } catch (error) {
       toast.error('Failed to fetch projects')
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -145,7 +153,7 @@ export default function Dashboard() {
                   </p>
                   <p className="text-sm">
                     <span className="font-semibold text-purple-700 dark:text-orange-400">📄 Sections:</span>
-                    <span className="text-gray-700 dark:text-gray-300 ml-1">{project.sections.length}</span>
+                    <span className="text-gray-700 dark:text-gray-300 ml-1">{project.section_count}</span>
                   </p>
                   <p className="text-xs text-gray-500 dark:text-gray-400">
                     🕒 Updated: {formatDate(project.updated_at)}
@@ -175,6 +183,14 @@ export default function Dashboard() {
           ))}
         </div>
       )}
+
+      {nextCursor && (
+        <div className="flex justify-center mt-8">
+          <Button onClick={() => fetchProjects(nextCursor)} variant="outline" loading={loadingMore}>
+            Load More
+          </Button>
+        </div>
+      )}
     </div>
   )
 }
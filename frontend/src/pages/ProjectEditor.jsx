@@ -23,6 +23,7 @@ export default function ProjectEditor() {
   const [loading, setLoading] = useState(true)
   const [generatingAll, setGeneratingAll] = useState(false)
   const [generatingSections, setGeneratingSections] = useState(new Set())
+  const [streamingContent, setStreamingContent] = useState({})
   const [activeSection, setActiveSection] = useState(null)
   const [refinementPrompt, setRefinementPrompt] = useState('')
   const [refinementModal, setRefinementModal] = useState(false)
@@ -58,32 +59,33 @@ export default function ProjectEditor() {
 
   const loadFeedback = async () => {
     const feedback = {}
-    for (const section of project.sections) {
-      try {
-        const { data: refinements } = await sectionAPI.getRefinements(section.id)
-        if (refinements.length > 0 && refinements[0].feedback) {
-          feedback[section.id] = {
-            type: refinements[0].feedback,
-            comment: refinements[0].comment
+    try {
+      const { data: latest } = await projectAPI.getFeedback(project.id)
+      for (const refinement of latest) {
+        if (refinement.feedback) {
+          feedback[refinement.section_id] = {
+            type: refinement.feedback,
+            comment: refinement.comment
           }
         }
-      } catch (error) {
-        // Silently ignore - section might not have refinements
       }
+    } catch (error) {
+      // Silently ignore - feedback is optional
     }
     setSectionFeedback(feedback)
   }
 
   const generateAllSections = async () => {
     setGeneratingAll(true)
-    const promises = project.sections.map((section) =>
-      sectionAPI.generate(section.id).catch(() => null)
-    )
-
     try {
-      await Promise.all(promises)
-      await fetchProject()
-      toast.success('All content generated!')
+      const { data } = await projectAPI.generateAll(id)
+      setProject(data.project)
+      const failed = data.results.filter((result) => result.status === 'failed')
+      if (failed.length > 0) {
+        toast.error(`${failed.length} section(s) failed to generate`)
+      } else {
+        toast.success('All content generated!')
+      }
     } catch (error) {
       toast.error('Some sections failed to generate')
     } finally {
@@ -91,15 +93,37 @@ export default function ProjectEditor() {
     }
   }
 
-  const generateSection = async (sectionId) => {
+  const setSectionContent = (sectionId, content) => {
+    setProject(prev => ({
+      ...prev,
+      sections: prev.sections.map((s) =>
+        s.id === sectionId ? { ...s, content } : s
+      ),
+    }))
+  }
+
+  // Show partial text as it streams in, then apply the saved result
+  const streamSection = async (sectionId, startStream, onDone) => {
     setGeneratingSections(prev => new Set(prev).add(sectionId))
     try {
-      await sectionAPI.generate(sectionId)
-      await fetchProject()
-      toast.success('Content generated!')
-    } catch (error) {
-      toast.error('Failed to generate content')
+      await startStream((event, data) => {
+        if (event === 'chunk') {
+          setStreamingContent(prev => ({
+            ...prev,
+            [sectionId]: (prev[sectionId] || '') + data.text,
+          }))
+        } else if (event === 'done') {
+          onDone(data)
+        } else if (event === 'error') {
+          throw new Error(data.detail)
+        }
+      })
     } finally {
+      setStreamingContent(prev => {
+        const next = { ...prev }
+        delete next[sectionId]
+        return next
+      })
       setGeneratingSections(prev => {
         const next = new Set(prev)
         next.delete(sectionId)
@@ -108,6 +132,19 @@ export default function ProjectEditor() {
     }
   }
 
+  const generateSection = async (sectionId) => {
+    try {
+      await streamSection(
+        sectionId,
+        (onEvent) => sectionAPI.generateStream(sectionId, onEvent),
+        (section) => setSectionContent(sectionId, section.content)
+      )
+      toast.success('Content generated!')
+    } catch (error) {
+      toast.error('Failed to generate content')
+    }
+  }
+
   const openRefinementModal = (section) => {
     if (!section.content) {
       toast.error('Generate content first')
@@ -124,10 +161,14 @@ export default function ProjectEditor() {
       return
     }
 
+    const sectionId = activeSection.id
+    setRefinementModal(false)
     try {
-      await sectionAPI.refine(activeSection.id, { prompt: refinementPrompt })
-      await fetchProject()
-      setRefinementModal(false)
+      await streamSection(
+        sectionId,
+        (onEvent) => sectionAPI.refineStream(sectionId, { prompt: refinementPrompt }, onEvent),
+        (refinement) => setSectionContent(sectionId, refinement.refined_content)
+      )
       toast.success('Content refined!')
     } catch (error) {
       toast.error('Failed to refine content')
@@ -357,7 +398,13 @@ export default function ProjectEditor() {
                 </div>
               </div>
 
-              {generatingSections.has(section.id) ? (
+              {streamingContent[section.id] ? (
+                <div className="bg-gray-50 dark:bg-gray-800 p-4 rounded-lg">
+                  <div className="w-full min-h-[200px] p-3 whitespace-pre-wrap border border-gray-300 dark:border-gray-600 dark:bg-gray-700 dark:text-white rounded-lg">
+                    {streamingContent[section.id]}
+                  </div>
+                </div>
+              ) : generatingSections.has(section.id) ? (
                 <div className="bg-gradient-to-r from-blue-50 to-purple-50 dark:from-gray-900 dark:to-black p-8 rounded-lg border-2 border-dashed border-blue-300 dark:border-orange-700">
                   <div className="flex flex-col items-center justify-center space-y-4">
                     <div className="relative">